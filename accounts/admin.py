@@ -2,7 +2,7 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from .models import User
-from .models import Notification, Message
+from .models import AccountErasure, Notification, Message
 
 @admin.register(User)
 class UserAdmin(BaseUserAdmin):
@@ -24,3 +24,10 @@ class MessageAdmin(admin.ModelAdmin):
     list_display = ("sender", "recipient", "subject", "is_read", "sent_at")
     list_filter  = ("is_read",)
     search_fields = ("subject", "body", "sender__username", "recipient__username")
+
+
+@admin.register(AccountErasure)
+class AccountErasureAdmin(admin.ModelAdmin):
+    list_display = ("user", "status", "deleted", "created_at", "finished_at")
+    list_filter  = ("status",)
+    readonly_fields = ("user", "status", "deleted", "error", "created_at", "finished_at")
@@ -8,6 +8,8 @@ class AccountsConfig(AppConfig):
     name = 'accounts'# accounts/apps.py
 
     def ready(self):
+        from . import signals  # noqa: F401
+
         # Only on production (DEBUG=False)
         if os.getenv("DJANGO_DEBUG", "False") == "True":
             return
@@ -1,12 +1,14 @@
 # auth_backends.py
 from django.contrib.auth.backends import ModelBackend
-from django.contrib.auth import get_user_model
 
-User = get_user_model()
+from . import login
+
 
 class EmailOrUsernameBackend(ModelBackend):
     """
     Custom backend that allows authentication via either email or username.
+    The only backend configured: it resolves the user in one query (see
+    accounts/login.py) and keeps ModelBackend's permission checks.
     """
 
     def authenticate(self, request, username=None, password=None, **kwargs):
@@ -18,19 +20,12 @@ class EmailOrUsernameBackend(ModelBackend):
         if not username or not password:
             return None
 
-        # At this point, 'username' is a non‐empty string. Check if it contains '@'.
-        if "@" in username:
-            lookup_field = "email"
-        else:
-            lookup_field = "username"
-
-        try:
-            user_obj = User.objects.get(**{lookup_field: username})
-        except User.DoesNotExist:
+        user_obj = login.find_user(username)
+        matches, new_hash = login.verify_password(user_obj, password)
+        if not matches:
             return None
+        if new_hash:
+            login.store_rehash(user_obj, new_hash)
 
-        # Verify password and that the user is not inactive
-        if user_obj.check_password(password) and self.user_can_authenticate(user_obj):
-            return user_obj
-
-        return None
+        # Verify that the user is not inactive
+        return user_obj if self.user_can_authenticate(user_obj) else None
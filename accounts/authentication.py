@@ -0,0 +1,76 @@
+# accounts/authentication.py
+"""
+Stateless JWT authentication: no user query per request.
+
+The request user is rebuilt from the access token's claims
+(accounts/tokens.py) as a User instance whose other columns are deferred.
+Checks on is_staff / is_instructor / is_active, filters and foreign keys
+(which only need the pk) never touch the users table; the first read of
+any other column (username, email, …) loads them all in one query.
+
+Revocation: User.save() bumps token_version on a password change or a
+change to one of the claim fields, which invalidates every token issued
+before. The current version is read from the TOKEN_VERSIONS cache
+namespace, dropped whenever the user is saved (accounts/signals.py). That
+namespace lives in L2 only (no per-worker copy, no stale fallback), so a
+logout, password change or deactivation revokes the token on every worker
+with the next request.
+"""
+from django.contrib.auth import get_user_model
+from django.db import router
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from edenites_be import cache
+from .tokens import VERSION_CLAIM
+
+User = get_user_model()
+
+
+def token_version(user_id):
+    """
+    The user's current token_version (cached), or None if there is no such user.
+    """
+    return cache.TOKEN_VERSIONS.get_or_set(
+        user_id,
+        lambda: User.objects.filter(pk=user_id).values_list("token_version", flat=True).first(),
+    )
+
+
+def user_from_claims(user_id, version, claims):
+    """
+    A User with only the pk, token_version and claim fields loaded.
+    """
+    loaded = {"id": user_id, "token_version": version, **claims}
+    names = [f.attname for f in User._meta.concrete_fields if f.attname in loaded]
+    user = User.from_db(router.db_for_read(User), names, [loaded[name] for name in names])
+    user._from_token = True
+    return user
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that trusts the token's claims instead of loading
+    the user; see the module docstring.
+    """
+
+    def get_user(self, validated_token):
+        if VERSION_CLAIM not in validated_token:
+            # Issued before tokens carried claims: look the user up.
+            return super().get_user(validated_token)
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+            claims = {name: validated_token[name] for name in User.CLAIM_FIELDS}
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        version = token_version(user_id)
+        if version is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        if validated_token[VERSION_CLAIM] != version:
+            raise AuthenticationFailed(_("Token has been revoked."), code="token_revoked")
+        if not claims["is_active"]:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        return user_from_claims(user_id, version, claims)
@@ -0,0 +1,149 @@
+# accounts/blacklist.py
+"""
+Bloom filter in front of simplejwt's refresh-token blacklist.
+
+With ROTATE_REFRESH_TOKENS + BLACKLIST_AFTER_ROTATION every refresh
+checks `token_blacklist_blacklistedtoken`, and almost every check misses.
+Each worker keeps a Bloom filter of the JTIs blacklisted and not yet
+expired; only a possible hit goes to the database.
+
+  • The filter is rebuilt from the table every TOKEN_BLACKLIST_BLOOM_SECONDS
+    (lazily, by the first check after that), sized for twice the current
+    rows at TOKEN_BLACKLIST_BLOOM_ERROR_RATE false positives.
+  • Between rebuilds it catches up with rows blacklisted elsewhere every
+    sync_seconds(): one primary-key range read (id > last seen id).
+  • add() — called when a token is blacklisted (logout, rotation) — sets
+    the bits locally and marks the JTI in the shared cache, so other
+    workers usually see it at once: a miss in the local filter costs one
+    cache lookup, not a query.
+  • Expired tokens are left out; they fail verification on `exp` anyway.
+
+The table is the source of truth; the cache mark is only a shortcut and
+may be evicted. Then another worker accepts the blacklisted token until
+its next sync, so the window is sync_seconds(): at most
+TOKEN_BLACKLIST_BLOOM_SYNC_SECONDS and never more than a tenth of
+ACCESS_TOKEN_LIFETIME (which a revoked session keeps its access token
+for anyway).
+"""
+import hashlib
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Max
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+MIN_CAPACITY = 1024
+
+
+def rebuild_seconds():
+    return getattr(settings, "TOKEN_BLACKLIST_BLOOM_SECONDS", 60 * 5)
+
+
+def sync_seconds():
+    configured = getattr(settings, "TOKEN_BLACKLIST_BLOOM_SYNC_SECONDS", 10)
+    return min(configured, api_settings.ACCESS_TOKEN_LIFETIME.total_seconds() / 10)
+
+
+def error_rate():
+    return getattr(settings, "TOKEN_BLACKLIST_BLOOM_ERROR_RATE", 0.001)
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over strings (double hashing on one blake2b digest).
+    """
+
+    def __init__(self, capacity, error_rate):
+        capacity = max(capacity, 1)
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return ((first + i * second) % self.size for i in range(self.hashes))
+
+    def add(self, item):
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+_filter = None
+_built_at = 0.0
+_synced_at = 0.0
+_last_pk = 0
+_lock = threading.Lock()
+
+
+def _recent_key(jti):
+    return f"blacklisted-jti:{jti}"
+
+
+def _build():
+    """
+    (filter, highest row id it covers); rows added while it is being read
+    are picked up again by the next sync.
+    """
+    last_pk = BlacklistedToken.objects.aggregate(last=Max("pk"))["last"] or 0
+    live = BlacklistedToken.objects.filter(token__expires_at__gt=timezone.now())
+    bloom = BloomFilter(max(2 * live.count(), MIN_CAPACITY), error_rate())
+    for jti in live.values_list("token__jti", flat=True).iterator():
+        bloom.add(jti)
+    return bloom, last_pk
+
+
+def _sync():
+    # Called with _lock held.
+    global _synced_at, _last_pk
+    rows = BlacklistedToken.objects.filter(pk__gt=_last_pk).order_by("pk").values_list("pk", "token__jti")
+    for pk, jti in rows:
+        _filter.add(jti)
+        _last_pk = pk
+    _synced_at = time.monotonic()
+
+
+def _current():
+    global _filter, _built_at, _synced_at, _last_pk
+    if _filter is None or time.monotonic() - _built_at > rebuild_seconds():
+        with _lock:
+            if _filter is None or time.monotonic() - _built_at > rebuild_seconds():
+                (_filter, _last_pk), _built_at = _build(), time.monotonic()
+                _synced_at = _built_at
+    elif time.monotonic() - _synced_at > sync_seconds() and _lock.acquire(blocking=False):
+        # Whoever finds the lock taken goes on with the filter as it is.
+        try:
+            _sync()
+        finally:
+            _lock.release()
+    return _filter
+
+
+def might_contain(jti):
+    """
+    False only if `jti` is certainly not blacklisted.
+    """
+    return jti in _current() or cache.get(_recent_key(jti)) is not None
+
+
+def add(jti):
+    _current().add(jti)
+    cache.set(_recent_key(jti), 1, 2 * rebuild_seconds())
+
+
+def reset():
+    """
+    Drop this worker's filter; the next check rebuilds it (tests, pruning).
+    """
+    global _filter
+    with _lock:
+        _filter = None
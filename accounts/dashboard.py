@@ -0,0 +1,253 @@
+# accounts/dashboard.py
+"""
+GET /api/auth/dashboard/ payloads, built from grouped queries and cached.
+
+Every figure comes from a fixed number of aggregate queries, whatever the
+number of courses, students or lessons:
+
+  student     1. enrollments (with their course) and completed/total
+                 lesson counts (subqueries)
+              2. latest lesson completions
+              3-5. profile + unread counts (notifications:
+                 NotificationCounter), latest unread notifications and
+                 messages
+
+  instructor  1. own courses (category, instructor) with students, lessons,
+                 completed sales, revenue and completed lessons (subqueries)
+              2. latest enrollments in those courses
+              3. latest completed sales
+              4-6. as the student's 3-5
+
+The keys the front end has always read keep their shapes: `enrollments`
+(EnrollmentSerializer, all of them), `courses` (CourseSerializer, all of
+them), `enrollment_stats`, `progress_summary`, `user`, and the
+`notifications` / `inbox` lists. Everything else is an added field; its
+lists (enrollment_progress, course_stats, recent_activity, notifications,
+inbox) are capped at DASHBOARD_ITEMS. Students are counted from
+enrollments and revenue from COMPLETED orders only.
+
+Payloads are cached per user in the DASHBOARDS namespace under a
+per-user generation number read from L2 on every request, so a bump
+(accounts/signals.py: enrollments, progress, orders, notifications,
+messages, the user's profile) is seen by every worker at once. A change bumps its student and the
+course's instructor, looked up by course_id (one primary-key read) when
+the course isn't loaded. Course and lesson edits invalidate the whole
+namespace through the model signals.
+"""
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache as l2
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+from rest_framework import serializers
+
+from courses.models import Course, Lesson, Order
+from courses.serializers import CourseSerializer
+from edenites_be.cache import DASHBOARDS
+from enrollments.models import Enrollment, LessonProgress
+from enrollments.serializers import EnrollmentSerializer
+from .models import Message, Notification
+from .serializers import MessageSerializer, NotificationSerializer
+
+User = get_user_model()
+
+_datetime = serializers.DateTimeField()
+
+
+def items():
+    return getattr(settings, "DASHBOARD_ITEMS", 10)
+
+
+def _generation_key(user_id):
+    return f"dashboard-generation:{user_id}"
+
+
+def invalidate(*user_ids):
+    for user_id in user_ids:
+        if user_id is None:
+            continue
+        try:
+            l2.incr(_generation_key(user_id))
+        except ValueError:
+            # Missing (never bumped, or evicted): restart from the clock so
+            # no earlier generation can come back.
+            l2.set(_generation_key(user_id), time.time_ns() // 1000, None)
+
+
+def invalidate_many(user_ids):
+    """
+    invalidate() for a batch of users in one cache round trip.
+    """
+    generation = time.time_ns() // 1000
+    l2.set_many({_generation_key(user_id): generation for user_id in user_ids}, None)
+
+
+def _count(queryset, group):
+    """
+    Correlated COUNT(*) of `queryset` rows per `group`, 0 when none.
+    """
+    counted = queryset.order_by().values(group).annotate(n=Count("pk")).values("n")
+    return Coalesce(Subquery(counted, output_field=IntegerField()), 0)
+
+
+def _percent(part, whole):
+    return round(part / whole * 100, 1) if whole else 0.0
+
+
+def _money(value):
+    return f"{value:.2f}"
+
+
+def _profile(user_id):
+    """
+    The user's name, their latest unread notifications and messages, and
+    both unread counts.
+    """
+    row = (
+        User.objects.filter(pk=user_id)
+        .annotate(
+            unread_notifications=Coalesce("notification_counter__unread", 0, output_field=IntegerField()),
+            unread_messages=_count(Message.objects.filter(recipient=OuterRef("pk"), is_read=False), "recipient"),
+        )
+        .values("first_name", "last_name", "email", "unread_notifications", "unread_messages")
+        .get()
+    )
+    notifications = Notification.objects.filter(user_id=user_id, is_read=False).order_by("-created_at", "-id")
+    inbox = (
+        Message.objects.filter(recipient_id=user_id, is_read=False)
+        .select_related("sender", "recipient")
+        .order_by("-sent_at", "-id")
+    )
+    return {
+        "user": {"first_name": row["first_name"], "last_name": row["last_name"], "email": row["email"]},
+        "notifications": NotificationSerializer(notifications[: items()], many=True).data,
+        "inbox": MessageSerializer(inbox[: items()], many=True).data,
+        "unread_notifications": row["unread_notifications"],
+        "unread_messages": row["unread_messages"],
+    }
+
+
+def student_dashboard(user_id):
+    enrollments = list(
+        Enrollment.objects.filter(student_id=user_id)
+        .select_related("course")
+        .annotate(
+            completed_lessons=_count(
+                LessonProgress.objects.filter(enrollment=OuterRef("pk"), completed=True), "enrollment"
+            ),
+            total_lessons=_count(Lesson.objects.filter(course=OuterRef("course")), "course"),
+        )
+        .order_by("-enrolled_at", "-id")
+    )
+    completions = (
+        LessonProgress.objects.filter(enrollment__student_id=user_id, completed=True)
+        .order_by("-id")  # no timestamp on progress rows; ids grow with time
+        .values("lesson_id", "lesson__title", "enrollment__course_id")[: items()]
+    )
+    return {
+        "role": "student",
+        "enrollments": EnrollmentSerializer(enrollments, many=True).data,
+        "enrollment_count": len(enrollments),
+        "completed_courses": sum(
+            1 for e in enrollments if e.total_lessons and e.completed_lessons >= e.total_lessons
+        ),
+        "enrollment_progress": [
+            {
+                "id": e.pk,
+                "course": e.course_id,
+                "course_title": e.course.title,
+                "completed_lessons": e.completed_lessons,
+                "total_lessons": e.total_lessons,
+                "completion_percent": _percent(e.completed_lessons, e.total_lessons),
+            }
+            for e in enrollments[: items()]
+        ],
+        "progress_summary": {e.course_id: e.completed_lessons for e in enrollments},
+        "recent_activity": [
+            {
+                "type": "lesson_completed",
+                "lesson": row["lesson_id"],
+                "lesson_title": row["lesson__title"],
+                "course": row["enrollment__course_id"],
+            }
+            for row in completions
+        ],
+        **_profile(user_id),
+    }
+
+
+def instructor_dashboard(user_id):
+    completed = Order.objects.filter(course=OuterRef("pk"), status=Order.COMPLETED)
+    revenue = completed.order_by().values("course").annotate(total=Sum("amount")).values("total")
+    courses = list(
+        Course.objects.filter(instructor_id=user_id)
+        .select_related("category", "instructor")
+        .annotate(
+            students=_count(Enrollment.objects.filter(course=OuterRef("pk")), "course"),
+            lesson_count=_count(Lesson.objects.filter(course=OuterRef("pk")), "course"),
+            sales=_count(completed, "course"),
+            revenue=Subquery(revenue),
+            completed_lessons=_count(
+                LessonProgress.objects.filter(enrollment__course=OuterRef("pk"), completed=True),
+                "enrollment__course",
+            ),
+        )
+        .order_by("-created_at", "-id")
+    )
+    enrollments = (
+        Enrollment.objects.filter(course__instructor_id=user_id)
+        .order_by("-enrolled_at", "-id")
+        .values("course_id", "course__title", "enrolled_at")[: items()]
+    )
+    sales = (
+        Order.objects.filter(course__instructor_id=user_id, status=Order.COMPLETED)
+        .order_by("-created_at", "-id")
+        .values("course_id", "course__title", "amount", "created_at")[: items()]
+    )
+    activity = [
+        {"type": "enrollment", "course": row["course_id"], "course_title": row["course__title"],
+         "at": row["enrolled_at"]}
+        for row in enrollments
+    ] + [
+        {"type": "sale", "course": row["course_id"], "course_title": row["course__title"],
+         "amount": _money(row["amount"]), "at": row["created_at"]}
+        for row in sales if row["created_at"] is not None
+    ]
+    activity.sort(key=lambda entry: entry["at"], reverse=True)
+    for entry in activity:
+        entry["at"] = _datetime.to_representation(entry["at"])
+
+    total_revenue = sum(course.revenue or 0 for course in courses)
+    return {
+        "role": "instructor",
+        "courses": CourseSerializer(courses, many=True).data,
+        "enrollment_stats": {course.pk: course.students for course in courses},
+        "course_count": len(courses),
+        "course_stats": [
+            {
+                "id": course.pk,
+                "title": course.title,
+                "students": course.students,
+                "lessons": course.lesson_count,
+                "sales": course.sales,
+                "revenue": _money(course.revenue or 0),
+                "completion_percent": _percent(course.completed_lessons, course.students * course.lesson_count),
+            }
+            for course in courses[: items()]
+        ],
+        "revenue": {"total": _money(total_revenue), "sales": sum(course.sales for course in courses)},
+        "recent_activity": activity[: items()],
+        **_profile(user_id),
+    }
+
+
+def dashboard(user):
+    """
+    The cached dashboard of `user` (a request user; only pk and
+    is_instructor are read, so token-built users cost no query).
+    """
+    generation = l2.get(_generation_key(user.pk), 0)
+    build = instructor_dashboard if user.is_instructor else student_dashboard
+    return DASHBOARDS.get_or_set((user.pk, user.is_instructor, generation), lambda: build(user.pk))
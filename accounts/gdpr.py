@@ -0,0 +1,264 @@
+# accounts/gdpr.py
+"""
+GDPR personal-data export and account erasure as background jobs.
+
+POST /api/auth/gdpr/export/ creates a DataExport and enqueues
+build_export() (edenites_be/jobs.py). The job streams each section
+straight from a server-side cursor (.iterator()) through its serializer,
+one row at a time, into a deflated ZIP of NDJSON files under
+GDPR_EXPORT_DIR, so memory stays flat however much history the user has.
+The archive is written to a private part file and renamed into place
+when complete. The user polls the export and downloads the file as a
+streamed response.
+
+Finished exports (and their files) are removed after GDPR_EXPORT_TTL by
+`manage.py run_pending_jobs` (the Procfile worker), which also restarts
+interrupted jobs: queued ones, and running ones whose lease (heartbeat,
+see edenites_be/jobs.py) has expired.
+
+DELETE /api/auth/gdpr/delete/ anonymizes and deactivates the user at once
+and queues erase_account(), which removes their answers, lesson progress
+and enrollments (children before parents) in batches of
+GDPR_ERASE_BATCH_SIZE: each batch is one short transaction running a plain
+DELETE … WHERE id IN (…), so no cascade collector loads rows into memory
+and no table stays locked for long. The running totals are saved on the
+AccountErasure with every batch. Row signals don't fire for these
+deletes, so the job drops the caches they would have (entitlements,
+dashboards) itself; co-enrollment scores catch up at the next
+`manage.py build_related_courses`.
+"""
+import logging
+import os
+import uuid
+import zipfile
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+from rest_framework.utils.encoders import JSONEncoder
+
+from courses.models import Course
+from courses.serializers import CourseSerializer
+from edenites_be import jobs
+from enrollments import entitlements
+from enrollments.models import Answer, Enrollment, LessonProgress
+from enrollments.serializers import AnswerSerializer, EnrollmentSerializer, LessonProgressSerializer
+from . import dashboard
+from .models import AccountErasure, DataExport, Message, Notification, User
+from .serializers import MessageSerializer, NotificationSerializer, UserDataExportSerializer
+
+logger = logging.getLogger(__name__)
+
+ITERATOR_CHUNK_SIZE = 1000
+
+# (file in the archive, rows of one user, serializer)
+SECTIONS = (
+    ("profile.ndjson", lambda user_id: User.objects.filter(pk=user_id), UserDataExportSerializer),
+    ("courses.ndjson",
+     lambda user_id: Course.objects.filter(instructor_id=user_id).select_related("category", "instructor").order_by("pk"),
+     CourseSerializer),
+    ("enrollments.ndjson", lambda user_id: Enrollment.objects.filter(student_id=user_id).order_by("pk"),
+     EnrollmentSerializer),
+    ("progress.ndjson", lambda user_id: LessonProgress.objects.filter(enrollment__student_id=user_id).order_by("pk"),
+     LessonProgressSerializer),
+    ("answers.ndjson", lambda user_id: Answer.objects.filter(student_id=user_id).order_by("pk"), AnswerSerializer),
+    ("notifications.ndjson", lambda user_id: Notification.objects.filter(user_id=user_id).order_by("pk"),
+     NotificationSerializer),
+    ("messages_sent.ndjson",
+     lambda user_id: Message.objects.filter(sender_id=user_id).select_related("sender", "recipient").order_by("pk"),
+     MessageSerializer),
+    ("messages_received.ndjson",
+     lambda user_id: Message.objects.filter(recipient_id=user_id).select_related("sender", "recipient").order_by("pk"),
+     MessageSerializer),
+)
+
+
+def export_dir():
+    return Path(getattr(settings, "GDPR_EXPORT_DIR", settings.BASE_DIR / "exports"))
+
+
+def export_ttl():
+    return getattr(settings, "GDPR_EXPORT_TTL", timedelta(days=7))
+
+
+def export_path(export):
+    return export_dir() / export.file_name
+
+
+def request_export(user):
+    """
+    (export, created): the user's export in progress, or a new one queued.
+    """
+    active = DataExport.objects.filter(
+        user_id=user.pk, status__in=(DataExport.PENDING, DataExport.RUNNING)
+    ).order_by("-created_at").first()
+    if active is not None:
+        return active, False
+    export = DataExport.objects.create(user_id=user.pk)
+    jobs.enqueue(build_export, export.pk)
+    return export, True
+
+
+def write_archive(user_id, path, heartbeat=lambda: None):
+    encoder = JSONEncoder(ensure_ascii=False)
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, rows, serializer_class in SECTIONS:
+            with archive.open(name, "w", force_zip64=True) as out:
+                for n, obj in enumerate(rows(user_id).iterator(chunk_size=ITERATOR_CHUNK_SIZE), 1):
+                    out.write(encoder.encode(serializer_class(obj).data).encode() + b"\n")
+                    if n % ITERATOR_CHUNK_SIZE == 0:
+                        heartbeat()
+            heartbeat()
+
+
+def build_export(export_id):
+    """
+    The job: write the archive, then mark the export READY (or FAILED).
+    """
+    lease = jobs.claim(DataExport, export_id)
+    if lease is None:
+        return
+    export = DataExport.objects.get(pk=export_id)
+    directory = export_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    file_name = f"{export.pk}.zip"
+    part = directory / f"{file_name}.{uuid.uuid4().hex}.part"
+    try:
+        write_archive(export.user_id, part, lease.renew)
+        lease.renew(force=True)
+        os.replace(part, directory / file_name)
+    except jobs.LeaseLost:
+        part.unlink(missing_ok=True)
+        logger.warning("Export %s was taken over by another run", export_id)
+        return
+    except Exception as exc:
+        part.unlink(missing_ok=True)
+        DataExport.objects.filter(pk=export_id).update(
+            status=DataExport.FAILED, error=str(exc)[:1000], finished_at=timezone.now()
+        )
+        raise
+    DataExport.objects.filter(pk=export_id).update(
+        status=DataExport.READY,
+        file_name=file_name,
+        size=(directory / file_name).stat().st_size,
+        finished_at=timezone.now(),
+    )
+
+
+def remove_file(export):
+    if export.file_name:
+        export_path(export).unlink(missing_ok=True)
+
+
+def purge_expired():
+    """
+    Delete exports (and files) finished more than GDPR_EXPORT_TTL ago.
+    """
+    expired = DataExport.objects.filter(finished_at__lt=timezone.now() - export_ttl())
+    count = 0
+    for export in expired.iterator():
+        export.delete()  # the post_delete signal removes the file
+        count += 1
+    return count
+
+
+#
+# ─── Account erasure ─────────────────────────────────────────────────────────────
+#
+# (counter, rows of one user) in deletion order: progress before the
+# enrollments it belongs to.
+ERASURE_STEPS = (
+    ("answers", lambda user_id: Answer.objects.filter(student_id=user_id)),
+    ("progress", lambda user_id: LessonProgress.objects.filter(enrollment__student_id=user_id)),
+    ("enrollments", lambda user_id: Enrollment.objects.filter(student_id=user_id)),
+)
+
+
+def erase_batch_size():
+    return getattr(settings, "GDPR_ERASE_BATCH_SIZE", 500)
+
+
+def anonymize(user):
+    user.username = f"deleted_user_{user.pk}"
+    user.email = ""
+    user.first_name = ""
+    user.last_name = ""
+    user.set_unusable_password()
+    user.is_active = False  # also revokes their tokens (token_version)
+    user.save()
+
+
+def request_erasure(user):
+    """
+    Anonymize and deactivate `user` now; queue the removal of their records.
+    """
+    with transaction.atomic():
+        anonymize(user)
+        erasure = AccountErasure.objects.create(user_id=user.pk)
+        jobs.enqueue(erase_account, erasure.pk)
+    return erasure
+
+
+def _delete_where(model, field, values):
+    """
+    DELETE FROM <model> WHERE <field> IN (values): no collector, no signals.
+    """
+    quote = connection.ops.quote_name
+    column = model._meta.get_field(field).column
+    placeholders = ", ".join(["%s"] * len(values))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {quote(model._meta.db_table)} WHERE {quote(column)} IN ({placeholders})", values
+        )
+        return cursor.rowcount
+
+
+def erase_account(erasure_id):
+    """
+    The job: delete the user's rows batch by batch, then mark it DONE.
+    Safe to re-run; it carries on from whatever is left.
+    """
+    lease = jobs.claim(AccountErasure, erasure_id)
+    if lease is None:
+        return
+    erasure = AccountErasure.objects.get(pk=erasure_id)
+    user_id, deleted, size = erasure.user_id, dict(erasure.deleted), erase_batch_size()
+    instructors = set(
+        Course.objects.filter(enrollment__student_id=user_id).values_list("instructor_id", flat=True)
+    )
+    try:
+        for name, rows in ERASURE_STEPS:
+            pending = rows(user_id).order_by("pk").values_list("pk", flat=True)
+            while True:
+                lease.renew()
+                ids = list(pending[:size])
+                if not ids:
+                    break
+                with transaction.atomic():
+                    if name == "enrollments":
+                        # progress recorded since its own step ran
+                        deleted["progress"] = deleted.get("progress", 0) + _delete_where(
+                            LessonProgress, "enrollment", ids
+                        )
+                    deleted[name] = deleted.get(name, 0) + _delete_where(pending.model, "id", ids)
+                    AccountErasure.objects.filter(pk=erasure_id).update(deleted=deleted)
+                logger.info("Erasure %s: deleted %s", erasure_id, deleted)
+        for export in DataExport.objects.filter(user_id=user_id):
+            export.delete()
+        lease.renew(force=True)
+    except jobs.LeaseLost:
+        logger.warning("Erasure %s was taken over by another run", erasure_id)
+        return
+    except Exception as exc:
+        AccountErasure.objects.filter(pk=erasure_id).update(
+            status=AccountErasure.FAILED, error=str(exc)[:1000], finished_at=timezone.now()
+        )
+        raise
+    finally:
+        entitlements.invalidate(user_id)
+        dashboard.invalidate(user_id, *instructors)
+    AccountErasure.objects.filter(pk=erasure_id).update(
+        status=AccountErasure.DONE, deleted=deleted, finished_at=timezone.now()
+    )
@@ -0,0 +1,109 @@
+# accounts/login.py
+"""
+Login pipeline used by POST /api/auth/login/ and EmailOrUsernameBackend.
+
+  • throttle_wait() applies THROTTLE_RATES["login"] per IP and then
+    ["login_account"] per email/username before anything else runs.
+  • find_user() resolves "email or username" with one indexed query:
+    emails case-insensitively through the Lower("email") index, usernames
+    through their unique index.
+  • Password hashing (PBKDF2 by default, tens of ms of CPU) needs one of
+    LOGIN_HASHER_THREADS slots per process (hasher_slot()). When they are
+    all taken the view answers 503 with Retry-After at once rather than
+    queueing, so a login storm holds at most that many request threads of
+    each worker and the rest keep serving other endpoints. Unknown users
+    get a dummy hash of the same cost, as in ModelBackend.
+  • When the stored hash uses an outdated hasher or iteration count, the
+    password is rehashed in the pool and written with a plain UPDATE —
+    not User.save(), which would treat it as a password change and revoke
+    the user's tokens.
+"""
+import hashlib
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import check_password, make_password
+from django.db.models.functions import Lower
+from rest_framework.throttling import BaseThrottle
+
+from edenites_be import throttling
+
+User = get_user_model()
+
+# Seconds a client is asked to wait when every hasher slot is busy.
+BUSY_RETRY_AFTER = 1
+
+_slots = None
+_slots_lock = threading.Lock()
+
+
+def hasher_threads():
+    return getattr(settings, "LOGIN_HASHER_THREADS", 2)
+
+
+def hasher_slots():
+    global _slots
+    if _slots is None:
+        with _slots_lock:
+            if _slots is None:
+                _slots = threading.BoundedSemaphore(hasher_threads())
+    return _slots
+
+
+@contextmanager
+def hasher_slot():
+    """
+    True while holding one of the process's hasher slots; False, without
+    waiting, when they are all in use.
+    """
+    slots = hasher_slots()
+    if not slots.acquire(blocking=False):
+        yield False
+        return
+    try:
+        yield True
+    finally:
+        slots.release()
+
+
+def throttle_wait(request, identifier):
+    """
+    Seconds before this client may try to log in again; 0 to go ahead.
+    """
+    ip = BaseThrottle().get_ident(request)
+    account = hashlib.md5(identifier.lower().encode()).hexdigest()
+    return throttling.throttle("login", f"ip:{ip}") or throttling.throttle("login_account", account)
+
+
+def find_user(identifier):
+    """
+    The user an email (any case) or username refers to, in one query.
+    """
+    if "@" in identifier:
+        candidates = list(
+            User.objects.alias(email_lower=Lower("email")).filter(email_lower=identifier.lower())[:2]
+        )
+        if len(candidates) > 1:
+            # Emails that differ only in case predate the index: exact match only.
+            candidates = [user for user in candidates if user.email == identifier]
+        return candidates[0] if len(candidates) == 1 else None
+    return User.objects.filter(username=identifier).first()
+
+
+def verify_password(user, password):
+    """
+    (matches, new_hash): new_hash is set when the stored hash needs upgrading.
+    """
+    if user is None:
+        make_password(password)  # same cost as a real check
+        return False, None
+    rehashed = []
+    matches = check_password(password, user.password, setter=lambda raw: rehashed.append(make_password(raw)))
+    return matches, (rehashed[0] if rehashed else None)
+
+
+def store_rehash(user, new_hash):
+    old_hash, user.password = user.password, new_hash
+    User.objects.filter(pk=user.pk, password=old_hash).update(password=new_hash)
@@ -0,0 +1,66 @@
+# accounts/management/commands/benchmark_throttle.py
+
+import time
+
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management.base import BaseCommand
+from rest_framework.throttling import SimpleRateThrottle
+
+from edenites_be import throttling
+
+
+class HistoryThrottle(SimpleRateThrottle):
+    """
+    DRF's throttle: one list of request timestamps per client.
+    """
+
+    def __init__(self, cache, limit):
+        self.cache = cache
+        self.rate = f"{limit}/day"
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+
+    def get_cache_key(self, request, view):
+        return "benchmark:drf"
+
+
+class Command(BaseCommand):
+    help = (
+        "Per-request cost of the sliding-window throttle next to DRF's timestamp-list "
+        "throttle, by how many requests the client has already made. Runs on a private "
+        "in-process cache, so it measures the algorithms rather than the network."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--checks", type=int, default=2000, help="Timed checks per run (default 2000).")
+        parser.add_argument(
+            "--history", type=int, nargs="+", default=[10, 1000, 10000],
+            help="Earlier requests by the same client (default 10 1000 10000).",
+        )
+
+    def handle(self, *args, **options):
+        checks = options["checks"]
+        original = throttling.l2
+        try:
+            for history in options["history"]:
+                limit = history + checks + 1
+                backend = LocMemCache("benchmark-throttle", {"OPTIONS": {"MAX_ENTRIES": 100_000}})
+                backend.clear()
+                throttling.l2 = backend
+                sliding = self._time(lambda: throttling.hit("benchmark", limit, 86400), history, checks)
+                drf = HistoryThrottle(backend, limit)
+                listed = self._time(lambda: drf.allow_request(None, None), history, checks)
+                self.stdout.write(
+                    f"after {history:>6} requests   sliding window {sliding:7.1f} µs/check   "
+                    f"DRF timestamp list {listed:9.1f} µs/check"
+                )
+        finally:
+            throttling.l2 = original
+
+    @staticmethod
+    def _time(check, history, checks):
+        for _ in range(history):
+            check()
+        started = time.perf_counter()
+        for _ in range(checks):
+            check()
+        return (time.perf_counter() - started) / checks * 1e6
@@ -0,0 +1,41 @@
+# accounts/management/commands/prune_tokens.py
+
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.utils import aware_utcnow
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete expired outstanding/blacklisted refresh tokens in small batches, "
+        "each in its own short transaction."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000, help="Tokens per batch (default 1000).")
+        parser.add_argument(
+            "--sleep", type=float, default=0.0,
+            help="Seconds to pause between batches, to leave room for other writers.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size, pause = options["batch_size"], options["sleep"]
+        expired = OutstandingToken.objects.filter(expires_at__lte=aware_utcnow()).order_by("pk")
+        tokens = blacklisted = 0
+        last_pk = 0
+        while True:
+            ids = list(expired.filter(pk__gt=last_pk).values_list("pk", flat=True)[:batch_size])
+            if not ids:
+                break
+            with transaction.atomic():
+                blacklisted += BlacklistedToken.objects.filter(token_id__in=ids).delete()[0]
+                tokens += OutstandingToken.objects.filter(pk__in=ids).delete()[0]
+            last_pk = ids[-1]
+            if pause:
+                time.sleep(pause)
+        self.stdout.write(self.style.SUCCESS(
+            f"Deleted {tokens} expired token(s), {blacklisted} of them blacklisted."
+        ))
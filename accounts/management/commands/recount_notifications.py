@@ -0,0 +1,34 @@
+# accounts/management/commands/recount_notifications.py
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from accounts import notifications
+from accounts.models import NotificationCounter
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute every user's unread-notification counter from their notifications, "
+        "in batches of users, each in its own short transaction. Safe to run any time."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000, help="Users per batch (default 1000).")
+
+    def handle(self, *args, **options):
+        users = get_user_model().objects.order_by("pk")
+        last_pk, total = 0, 0
+        while True:
+            ids = list(users.filter(pk__gt=last_pk).values_list("pk", flat=True)[: options["batch_size"]])
+            if not ids:
+                break
+            with transaction.atomic():
+                NotificationCounter.objects.bulk_create(
+                    [NotificationCounter(user_id=user_id) for user_id in ids], ignore_conflicts=True
+                )
+                notifications.recount(ids)
+            total += len(ids)
+            last_pk = ids[-1]
+        self.stdout.write(self.style.SUCCESS(f"Recounted unread notifications of {total} user(s)."))
@@ -0,0 +1,60 @@
+# accounts/management/commands/run_pending_jobs.py
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.db.models import Q
+from django.utils import timezone
+
+from accounts import gdpr
+from accounts.models import AccountErasure, DataExport
+from edenites_be import jobs
+
+
+class Command(BaseCommand):
+    help = (
+        "Run background jobs that a restart interrupted (GDPR exports and account erasures "
+        "queued more than --stale-minutes ago, or running with an expired lease) and delete "
+        "exports older than GDPR_EXPORT_TTL. "
+        "With --every it keeps doing so (the Procfile `worker` process)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--stale-minutes", type=int, default=10,
+            help="Start jobs still queued this long after they were created (default 10).",
+        )
+        parser.add_argument(
+            "--every", type=int, default=None, metavar="SECONDS",
+            help="Run forever, one pass every SECONDS (default: a single pass).",
+        )
+
+    def handle(self, *args, **options):
+        if options["every"] is None:
+            self.run_once(options["stale_minutes"])
+            return
+        while True:
+            close_old_connections()
+            try:
+                self.run_once(options["stale_minutes"])
+            except Exception as exc:  # keep the worker alive; the next pass retries
+                self.stderr.write(f"run_pending_jobs pass failed: {exc!r}")
+            time.sleep(options["every"])
+
+    def run_once(self, stale_minutes):
+        now = timezone.now()
+        cutoff = now - timedelta(minutes=stale_minutes)
+        resumed = 0
+        for model, job in ((DataExport, gdpr.build_export), (AccountErasure, gdpr.erase_account)):
+            # A running job is only taken over once its heartbeat stops;
+            # the job's own claim re-checks this atomically.
+            stale = model.objects.filter(
+                Q(status=model.PENDING, created_at__lt=cutoff)
+                | Q(status=model.RUNNING) & (Q(lease_expires_at__isnull=True) | Q(lease_expires_at__lt=now))
+            ).values_list("pk", flat=True)
+            for job_id in list(stale):
+                jobs.run(job, job_id)
+                resumed += 1
+        purged = gdpr.purge_expired()
+        self.stdout.write(self.style.SUCCESS(f"Resumed {resumed} job(s); purged {purged} expired export(s)."))
@@ -0,0 +1,44 @@
+# Generated by Django 4.2.20 on 2026-10-19 02:10
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def count_unread_notifications(apps, schema_editor):
+    """
+    Start every counter from the user's current unread notifications.
+    """
+    Notification = apps.get_model("accounts", "Notification")
+    NotificationCounter = apps.get_model("accounts", "NotificationCounter")
+    unread = (
+        Notification.objects.filter(is_read=False)
+        .values_list("user_id")
+        .annotate(n=models.Count("id"))
+        .order_by()
+    )
+    NotificationCounter.objects.bulk_create(
+        [NotificationCounter(user_id=user_id, unread=n) for user_id, n in unread], batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0007_account_erasure'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationCounter',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='notification_counter', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('unread', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['user', 'is_read', '-created_at'], name='notif_user_read_created_idx'),
+        ),
+        migrations.RunPython(count_unread_notifications, migrations.RunPython.noop),
+    ]
@@ -1,7 +1,10 @@
 # accounts.models
+import uuid
+
 from django.conf import settings
 from django.db import models
 from django.contrib.auth.models import AbstractUser
+from django.db.models.functions import Lower
 from django_cryptography.fields import encrypt
 
 # Create your models here.
@@ -9,6 +12,49 @@ from django_cryptography.fields import encrypt
 class User(AbstractUser):
     is_instructor = models.BooleanField(default=False)
     email = models.EmailField(unique=True)
+    # Embedded in every JWT (accounts/tokens.py); bumping it revokes them all.
+    token_version = models.PositiveIntegerField(default=0)
+
+    # Columns copied into tokens as claims: changing one revokes the tokens
+    # that carry the old value.
+    CLAIM_FIELDS = ("is_active", "is_staff", "is_instructor")
+
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # Case-insensitive email lookups at login (accounts/login.py).
+            models.Index(Lower("email"), name="user_email_lower_idx"),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        user = super().from_db(db, field_names, values)
+        user._claims = user._current_claims()
+        return user
+
+    def _current_claims(self):
+        return {name: self.__dict__[name] for name in self.CLAIM_FIELDS if name in self.__dict__}
+
+    def _tokens_outdated(self):
+        if self._password is not None:  # set_password() since the last save
+            return True
+        claims = getattr(self, "_claims", {})
+        return any(self.__dict__.get(name, value) != value for name, value in claims.items())
+
+    def save(self, *args, **kwargs):
+        if self.pk is not None and self._tokens_outdated():
+            self.token_version += 1
+            if kwargs.get("update_fields") is not None:
+                kwargs["update_fields"] = {*kwargs["update_fields"], "token_version"}
+        super().save(*args, **kwargs)
+        self._claims = self._current_claims()
+
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        # A user built from token claims (accounts/authentication.py) loads
+        # all its deferred columns the first time any of them is read.
+        if fields is not None and getattr(self, "_from_token", False):
+            self._from_token = False
+            fields = {*fields, *self.get_deferred_fields()}
+        super().refresh_from_db(using, fields, **kwargs)
 
 class Notification(models.Model):
     """
@@ -19,9 +65,37 @@ class Notification(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     is_read   = models.BooleanField(default=False)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "-created_at", "-id"], name="notif_user_created_idx"),
+            # Unread lists (?is_read=false) and mark-all-read.
+            models.Index(fields=["user", "is_read", "-created_at"], name="notif_user_read_created_idx"),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        notification = super().from_db(db, field_names, values)
+        # is_read as loaded: a save that changes it recounts (accounts/signals.py).
+        notification._saved_is_read = notification.__dict__.get("is_read")
+        return notification
+
     def __str__(self):
         return f"{self.user.username}: {self.verb[:20]}…"
 
+
+class NotificationCounter(models.Model):
+    """
+    A user's number of unread notifications, kept in step with their
+    Notification rows by accounts/notifications.py.
+    """
+    user   = models.OneToOneField(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, primary_key=True, related_name="notification_counter"
+    )
+    unread = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.user_id}: {self.unread} unread"
+
 class Message(models.Model):
     """
     A two‑way message between users (e.g. student ⇄ instructor).
@@ -33,5 +107,77 @@ class Message(models.Model):
     sent_at   = models.DateTimeField(auto_now_add=True)
     is_read   = models.BooleanField(default=False)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["recipient", "-sent_at", "-id"], name="message_recipient_sent_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.sender.username} → {self.recipient.username}: {self.subject}"
+
+
+class DataExport(models.Model):
+    """
+    A user's personal-data export, built in the background into a ZIP of
+    NDJSON files (accounts/gdpr.py).
+    """
+    PENDING = "PENDING"
+    RUNNING = "RUNNING"
+    READY   = "READY"
+    FAILED  = "FAILED"
+    STATUS_CHOICES = [
+        (PENDING, "Pending"),
+        (RUNNING, "Running"),
+        (READY,   "Ready"),
+        (FAILED,  "Failed"),
+    ]
+
+    id          = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user        = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="data_exports")
+    status      = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    file_name   = models.CharField(max_length=255, blank=True)
+    size        = models.BigIntegerField(null=True, blank=True)
+    error       = models.TextField(blank=True)
+    created_at  = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    # heartbeat of the run holding the job (edenites_be/jobs.py)
+    lease_expires_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "-created_at"], name="export_user_created_idx"),
+        ]
+
+    def __str__(self):
+        return f"Export {self.pk} for user {self.user_id} ({self.status})"
+
+
+class AccountErasure(models.Model):
+    """
+    Background removal of a deactivated user's learning records, in
+    bounded batches (accounts/gdpr.py). `deleted` counts the rows removed
+    so far per table.
+    """
+    PENDING = "PENDING"
+    RUNNING = "RUNNING"
+    DONE    = "DONE"
+    FAILED  = "FAILED"
+    STATUS_CHOICES = [
+        (PENDING, "Pending"),
+        (RUNNING, "Running"),
+        (DONE,    "Done"),
+        (FAILED,  "Failed"),
+    ]
+
+    id          = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user        = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="erasures")
+    status      = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    deleted     = models.JSONField(default=dict, blank=True)
+    error       = models.TextField(blank=True)
+    created_at  = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    # heartbeat of the run holding the job (edenites_be/jobs.py)
+    lease_expires_at = models.DateTimeField(null=True, blank=True)
+
     def __str__(self):
-        return f"{self.sender.username} → {self.recipient.username}: {self.subject}"
\ No newline at end of file
+        return f"Erasure {self.pk} for user {self.user_id} ({self.status})"
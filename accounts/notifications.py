@@ -0,0 +1,147 @@
+# accounts/notifications.py
+"""
+Notification fan-out and per-user unread counters.
+
+notify() creates one notification per user with bulk_create, in batches
+of NOTIFICATION_BATCH_SIZE, each batch in its own short transaction;
+notify_course_students() does it for everyone enrolled in a course and
+runs as a background job when a lesson is added (accounts/signals.py).
+
+Each user's unread total lives in one NotificationCounter row, so
+GET /api/auth/notifications/unread-count/ is a primary-key read instead
+of a COUNT over their notifications. Counters move by the number of rows
+an UPDATE actually changed, through UPDATE … SET unread = unread ± n
+(adjust()), so concurrent changes neither lose nor double-count each
+other:
+
+  notify()             +1 per recipient, one UPDATE per batch
+  mark_all_read()      UPDATE … WHERE is_read = false, then -rows changed
+  set_read()           the same for one notification (PATCH)
+  other saves/deletes  the Notification signals: +1 for a new unread one;
+                       an is_read change or a delete recounts the user
+
+`manage.py recount_notifications` recomputes every counter from the rows,
+for anything that still slips through (raw SQL, restored backups).
+"""
+from itertools import islice
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Greatest
+
+from courses.models import Lesson
+from enrollments.models import Enrollment
+from . import dashboard
+from .models import Notification, NotificationCounter
+
+VERB_MAX_LENGTH = Notification._meta.get_field("verb").max_length
+
+
+def batch_size():
+    return getattr(settings, "NOTIFICATION_BATCH_SIZE", 1000)
+
+
+def _batches(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def adjust(user_ids, delta):
+    """
+    Add `delta` to the unread counters of `user_ids`, creating missing ones.
+    """
+    NotificationCounter.objects.bulk_create(
+        [NotificationCounter(user_id=user_id) for user_id in user_ids], ignore_conflicts=True
+    )
+    NotificationCounter.objects.filter(user_id__in=user_ids).update(unread=Greatest(F("unread") + delta, 0))
+
+
+def recount(user_ids):
+    """
+    Set the (existing) counters of `user_ids` to their real unread totals.
+    """
+    unread = (
+        Notification.objects.filter(user=OuterRef("user_id"), is_read=False)
+        .order_by().values("user").annotate(n=Count("pk")).values("n")
+    )
+    NotificationCounter.objects.filter(user_id__in=user_ids).update(unread=Coalesce(Subquery(unread), 0))
+
+
+def unread_count(user_id):
+    return NotificationCounter.objects.filter(user_id=user_id).values_list("unread", flat=True).first() or 0
+
+
+def notify(user_ids, verb):
+    """
+    One unread notification `verb` for each of the (distinct) `user_ids`;
+    returns how many were created.
+    """
+    verb = verb[:VERB_MAX_LENGTH]
+    created = 0
+    for batch in _batches(user_ids, batch_size()):
+        with transaction.atomic():
+            Notification.objects.bulk_create([Notification(user_id=user_id, verb=verb) for user_id in batch])
+            adjust(batch, 1)
+        dashboard.invalidate_many(batch)
+        created += len(batch)
+    return created
+
+
+def notify_course_students(course_id, verb):
+    """
+    notify() every student enrolled in the course, reading the
+    enrollments in keyset batches.
+    """
+    enrollments = Enrollment.objects.filter(course_id=course_id).order_by("pk")
+    created, last_pk = 0, 0
+    while True:
+        rows = list(enrollments.filter(pk__gt=last_pk).values_list("pk", "student_id")[: batch_size()])
+        if not rows:
+            return created
+        created += notify([student_id for _, student_id in rows], verb)
+        last_pk = rows[-1][0]
+
+
+def notify_new_lesson(lesson_id):
+    """
+    The job queued when a lesson is added.
+    """
+    lesson = Lesson.objects.filter(pk=lesson_id).values("title", "course_id", "course__title").first()
+    if lesson is None:
+        return 0
+    verb = f"New lesson in {lesson['course__title']}: {lesson['title']}"
+    return notify_course_students(lesson["course_id"], verb)
+
+
+def set_read(notification_id, user_id, is_read=True):
+    """
+    Mark one of the user's notifications read (or unread); the counter
+    moves only if this call changed the row. Returns whether it did.
+    """
+    with transaction.atomic():
+        changed = Notification.objects.filter(
+            pk=notification_id, user_id=user_id, is_read=not is_read
+        ).update(is_read=is_read)
+        if changed:
+            adjust([user_id], -changed if is_read else changed)
+    if changed:
+        dashboard.invalidate(user_id)
+    return bool(changed)
+
+
+def mark_all_read(user_id):
+    """
+    Mark every unread notification of the user read; returns how many.
+    """
+    with transaction.atomic():
+        marked = Notification.objects.filter(user_id=user_id, is_read=False).update(is_read=True)
+        if marked:
+            adjust([user_id], -marked)
+    if marked:
+        dashboard.invalidate(user_id)
+    return marked
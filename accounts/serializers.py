@@ -1,17 +1,15 @@
 # serializers.py
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
-from rest_framework_simplejwt.exceptions import AuthenticationFailed
-from rest_framework_simplejwt.tokens import RefreshToken
-
-from .auth_backends import EmailOrUsernameBackend
-from courses.serializers import CourseSerializer
-from enrollments.serializers import (
-    EnrollmentSerializer,
-    LessonProgressSerializer,
-    AnswerSerializer,
-)
-from .models import Notification, Message
+from django.db.models.functions import Lower
+from django.urls import reverse
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+
+from .authentication import token_version
+from .tokens import VERSION_CLAIM, ClaimsRefreshToken
+from .models import DataExport, Notification, Message
 
 User = get_user_model()
 
@@ -28,8 +26,8 @@ class RegisterSerializer(serializers.Serializer):
     is_instructor   = serializers.BooleanField(default=False)
 
     def validate_email(self, email):
-        # Check if any user already has this email
-        if User.objects.filter(email=email).exists():
+        # Check if any user already has this email (in any letter case)
+        if User.objects.alias(email_lower=Lower("email")).filter(email_lower=email.lower()).exists():
             raise serializers.ValidationError("A user with that email already exists.")
         return email
 
@@ -72,29 +70,33 @@ class UserDataExportSerializer(serializers.ModelSerializer):
         fields = ["id", "username", "email", "first_name", "last_name", "is_instructor"]
 
 
-class FullDataExportSerializer(serializers.Serializer):
+class DataExportSerializer(serializers.ModelSerializer):
     """
-    Bundles together all the user’s related data for GDPR export.
+    A GDPR export job; download_url is set once the archive is ready.
     """
-    user = UserDataExportSerializer()
-    courses = CourseSerializer(many=True)          # courses they created (if instructor)
-    enrollments = EnrollmentSerializer(many=True)  # courses they’re enrolled in
-    progress = LessonProgressSerializer(many=True) # lesson progress records
-    answers = AnswerSerializer(many=True)          # their quiz answers
+    download_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = DataExport
+        fields = ["id", "status", "size", "error", "created_at", "finished_at", "download_url"]
+
+    def get_download_url(self, obj):
+        if obj.status != DataExport.READY:
+            return None
+        url = reverse("gdpr-export-download", args=[obj.pk])
+        request = self.context.get("request")
+        return request.build_absolute_uri(url) if request else url
 
 
 class MyTokenObtainPairSerializer(serializers.Serializer):
     """
-    Custom “login” serializer that accepts either 'email' or 'username' + 'password'.
-    Returns 'access' + 'refresh' tokens on success.
+    Custom “login” input: either 'email' or 'username' + 'password'.
+    Credentials are checked by MyTokenObtainPairView (accounts/login.py).
     """
     username = serializers.CharField(required=False, write_only=True)
     email    = serializers.EmailField(required=False, write_only=True)
     password = serializers.CharField(write_only=True)
 
-    access  = serializers.CharField(read_only=True)
-    refresh = serializers.CharField(read_only=True)
-
     def validate(self, attrs):
         raw_username = attrs.get("username")
         raw_email    = attrs.get("email")
@@ -112,27 +114,23 @@ class MyTokenObtainPairSerializer(serializers.Serializer):
                 {"detail": "Must include either 'email' or 'username' and 'password'."}
             )
 
-        # Call our custom backend
-        user = EmailOrUsernameBackend().authenticate(
-            request=self.context.get("request"),
-            username=lookup_value,
-            password=raw_password,
-        )
+        return {"identifier": lookup_value, "password": raw_password}
 
-        if user is None:
-            raise AuthenticationFailed(
-                {"detail": "No active user found with the given credentials."}
-            )
 
-        # Generate tokens
-        refresh_token_obj = RefreshToken.for_user(user)
-        access_token_str  = str(refresh_token_obj.access_token)
-        refresh_token_str = str(refresh_token_obj)
+class VersionedTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    POST /api/auth/token/refresh/ — refuses refresh tokens whose token
+    version has since been bumped (password or role change, deactivation).
+    """
+    token_class = ClaimsRefreshToken
 
-        return {
-            "refresh": refresh_token_str,
-            "access":  access_token_str,
-        }
+    def validate(self, attrs):
+        refresh = self.token_class(attrs["refresh"])
+        if VERSION_CLAIM in refresh:
+            current = token_version(refresh[api_settings.USER_ID_CLAIM])
+            if refresh[VERSION_CLAIM] != current:
+                raise InvalidToken("Token has been revoked.")
+        return super().validate(attrs)
 
 
 class NotificationSerializer(serializers.ModelSerializer):
@@ -0,0 +1,126 @@
+# accounts/signals.py
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+from courses.models import Course, Lesson, Order
+from edenites_be import jobs
+from edenites_be.cache import TOKEN_VERSIONS
+from enrollments.models import Enrollment, LessonProgress
+from . import dashboard, gdpr, notifications
+from .models import DataExport, Message, Notification, User
+
+
+#
+# ─── Token versions (StatelessJWTAuthentication) ─────────────────────────────────
+#
+def forget_token_version(sender, instance, **kwargs):
+    def forget():
+        TOKEN_VERSIONS.delete(instance.pk)
+    forget()
+    transaction.on_commit(forget)
+
+
+post_save.connect(forget_token_version, sender=User, dispatch_uid="token-version-save")
+post_delete.connect(forget_token_version, sender=User, dispatch_uid="token-version-delete")
+
+
+#
+# ─── Dashboards (accounts/dashboard.py) ──────────────────────────────────────────
+#
+def _loaded(instance, *path):
+    """
+    instance.<path…> if every relation on the way is already loaded, else None.
+    """
+    for name in path:
+        if instance is None or not instance._meta.get_field(name).is_cached(instance):
+            return None
+        instance = getattr(instance, name)
+    return instance
+
+
+def _instructor_of(instance):
+    # `instance` has a course FK: use the loaded course, else one pk read.
+    course = _loaded(instance, "course")
+    if course is not None:
+        return course.instructor_id
+    return Course.objects.filter(pk=instance.course_id).values_list("instructor_id", flat=True).first()
+
+
+def _dashboard_users(sender, instance):
+    if sender is User:
+        return [instance.pk]
+    if sender is Notification:
+        return [instance.user_id]
+    if sender is Message:
+        return [instance.recipient_id]
+    if sender is LessonProgress:
+        enrollment = _loaded(instance, "enrollment")
+        if enrollment is None:
+            owner = (
+                Enrollment.objects.filter(pk=instance.enrollment_id)
+                .values_list("student_id", "course__instructor_id")
+                .first()
+            )
+            return list(owner or ())
+        return [enrollment.student_id, _instructor_of(enrollment)]
+    # Enrollment, Order
+    return [instance.student_id, _instructor_of(instance)]
+
+
+def refresh_dashboards(sender, instance, **kwargs):
+    user_ids = _dashboard_users(sender, instance)
+    dashboard.invalidate(*user_ids)
+    transaction.on_commit(lambda: dashboard.invalidate(*user_ids))
+
+
+for model in (User, Notification, Message, Enrollment, LessonProgress, Order):
+    post_save.connect(refresh_dashboards, sender=model, dispatch_uid=f"dashboard-save-{model.__name__}")
+# Progress and orders are only deleted along with their enrollment, lesson,
+# course or student, whose own signals cover the dashboards; leaving them
+# without delete receivers keeps those cascades fast deletes.
+for model in (User, Notification, Message, Enrollment):
+    post_delete.connect(refresh_dashboards, sender=model, dispatch_uid=f"dashboard-delete-{model.__name__}")
+
+
+#
+# ─── GDPR exports (accounts/gdpr.py) ─────────────────────────────────────────────
+#
+def remove_export_file(sender, instance, **kwargs):
+    transaction.on_commit(lambda: gdpr.remove_file(instance))
+
+
+post_delete.connect(remove_export_file, sender=DataExport, dispatch_uid="gdpr-export-delete")
+
+
+
+#
+# ─── Unread notification counters (accounts/notifications.py) ────────────────────
+#
+def count_saved_notification(sender, instance, created, update_fields=None, **kwargs):
+    if created:
+        if not instance.is_read:
+            notifications.adjust([instance.user_id], 1)
+    elif (update_fields is None or "is_read" in update_fields) and instance.is_read != instance._saved_is_read:
+        # What this instance last saw may be out of date; count the rows.
+        notifications.recount([instance.user_id])
+    instance._saved_is_read = instance.is_read
+
+
+def count_deleted_notification(sender, instance, **kwargs):
+    if not instance.is_read:
+        notifications.recount([instance.user_id])
+
+
+post_save.connect(count_saved_notification, sender=Notification, dispatch_uid="notification-counter-save")
+post_delete.connect(count_deleted_notification, sender=Notification, dispatch_uid="notification-counter-delete")
+
+
+#
+# ─── New-lesson fan-out ──────────────────────────────────────────────────────────
+#
+def announce_new_lesson(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        jobs.enqueue(notifications.notify_new_lesson, instance.pk)
+
+
+post_save.connect(announce_new_lesson, sender=Lesson, dispatch_uid="lesson-fan-out")
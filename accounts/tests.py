@@ -1,10 +1,34 @@
 # accounts/tests.py
 
+import io
+import json
+import tempfile
+import time
+import zipfile
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.test import override_settings
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework import status
-from rest_framework.test import APITestCase
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.test import APIRequestFactory, APITestCase
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
 from django.contrib.auth import get_user_model
 
+from courses.models import Category, Course, FollowUpQuestion, Lesson, Order
+from edenites_be import cache, jobs
+from enrollments.models import Answer, Enrollment, LessonProgress
+from . import blacklist, gdpr, login, notifications
+from .authentication import StatelessJWTAuthentication
+from .models import AccountErasure, DataExport, Message, Notification, NotificationCounter
+from .tokens import ClaimsRefreshToken
+
 User = get_user_model()
 
 class AuthTests(APITestCase):
@@ -34,7 +58,7 @@ class AuthTests(APITestCase):
             "password": "pass1234"
         }, format="json")
         self.assertEqual(resp2.status_code, status.HTTP_200_OK)
-        token = resp2.data["access"]
+        token = resp2.json()["access"]
         self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
 
         # 3) Access dashboard
@@ -52,3 +76,529 @@ class AuthTests(APITestCase):
         resp = self.client.post(self.register_url, data, format="json")
         self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertIn("confirmPassword", resp.data)
+
+
+class StatelessJWTTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        cache.l2.clear()
+        self.user = User.objects.create_user(
+            username="claims", email="claims@example.com", password="pass1234",
+            first_name="Claire",
+        )
+        self.login_url = reverse("token_obtain_pair")
+        self.profile_url = reverse("profile")
+
+    def login(self):
+        resp = self.client.post(self.login_url, {"email": "claims@example.com", "password": "pass1234"}, format="json")
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        return resp.json()
+
+    def authenticate(self, access):
+        request = APIRequestFactory().get("/", HTTP_AUTHORIZATION=f"Bearer {access}")
+        return StatelessJWTAuthentication().authenticate(request)[0]
+
+    def test_claims_authenticate_without_user_query(self):
+        access = self.login()["access"]
+        self.authenticate(access)  # warm the token-version cache
+        with self.assertNumQueries(0):
+            user = self.authenticate(access)
+            self.assertEqual(user.pk, self.user.pk)
+            self.assertTrue(user.is_authenticated)
+            self.assertFalse(user.is_staff)
+            self.assertFalse(user.is_instructor)
+        with self.assertNumQueries(1):
+            self.assertEqual(user.email, "claims@example.com")
+            self.assertEqual(user.first_name, "Claire")
+            self.assertEqual(user.username, "claims")
+
+    def test_password_change_revokes_tokens(self):
+        tokens = self.login()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens['access']}")
+        self.assertEqual(self.client.get(self.profile_url).status_code, status.HTTP_200_OK)
+
+        self.user.set_password("newpass1234")
+        self.user.save()
+        self.assertEqual(self.client.get(self.profile_url).status_code, status.HTTP_401_UNAUTHORIZED)
+        resp = self.client.post(reverse("token_refresh"), {"refresh": tokens["refresh"]}, format="json")
+        self.assertEqual(resp.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_revocation_on_another_worker_is_seen_at_once(self):
+        access = self.login()["access"]
+        self.authenticate(access)  # this worker has now read the version
+        # Another process: its own L1, the shared L2.
+        with mock.patch.object(cache, "l1", cache.LRUCache()):
+            self.user.set_password("newpass1234")
+            self.user.save()
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate(access)
+
+    def test_role_change_revokes_but_profile_edit_does_not(self):
+        access = self.login()["access"]
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+        resp = self.client.put(self.profile_url, {"first_name": "Clara"}, format="json")
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.client.get(self.profile_url).data["first_name"], "Clara")
+
+        user = User.objects.get(pk=self.user.pk)
+        user.is_instructor = True
+        user.save(update_fields=["is_instructor"])
+        self.assertEqual(User.objects.get(pk=self.user.pk).token_version, 1)
+        self.assertEqual(self.client.get(self.profile_url).status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class TokenBlacklistTests(APITestCase):
+    def setUp(self):
+        cache.l2.clear()
+        blacklist.reset()
+        self.user = User.objects.create_user(username="bloom", email="bloom@example.com", password="pass1234")
+
+    def tokens(self):
+        resp = self.client.post(reverse("token_obtain_pair"), {"username": "bloom", "password": "pass1234"}, format="json")
+        return resp.json()
+
+    def test_bloom_filter_has_no_false_negatives(self):
+        bloom = blacklist.BloomFilter(1000, 0.01)
+        for n in range(1000):
+            bloom.add(f"jti-{n}")
+        self.assertTrue(all(f"jti-{n}" in bloom for n in range(1000)))
+        false_positives = sum(f"other-{n}" in bloom for n in range(10000))
+        self.assertLess(false_positives, 300)
+
+    def test_unlisted_token_skips_blacklist_query(self):
+        refresh = self.tokens()["refresh"]
+        ClaimsRefreshToken(refresh)  # build the filter
+        with self.assertNumQueries(0):
+            ClaimsRefreshToken(refresh)
+
+    def test_rotated_and_logged_out_tokens_are_rejected(self):
+        refresh_url = reverse("token_refresh")
+        first = self.tokens()
+        rotated = self.client.post(refresh_url, {"refresh": first["refresh"]}, format="json")
+        self.assertEqual(rotated.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            self.client.post(refresh_url, {"refresh": first["refresh"]}, format="json").status_code,
+            status.HTTP_401_UNAUTHORIZED,
+        )
+
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {rotated.data['access']}")
+        resp = self.client.post(reverse("logout"), {"refresh": rotated.data["refresh"]}, format="json")
+        self.assertEqual(resp.status_code, status.HTTP_205_RESET_CONTENT)
+        # A worker whose filter predates the logout still rejects it.
+        stale = blacklist.BloomFilter(blacklist.MIN_CAPACITY, 0.001)
+        with mock.patch.multiple(blacklist, _filter=stale, _built_at=time.monotonic()):
+            self.assertEqual(
+                self.client.post(refresh_url, {"refresh": rotated.data["refresh"]}, format="json").status_code,
+                status.HTTP_401_UNAUTHORIZED,
+            )
+
+    def test_blacklisting_survives_an_evicted_cache_mark(self):
+        refresh = self.tokens()["refresh"]
+        ClaimsRefreshToken(refresh).blacklist()
+        cache.clear()
+        cache.l2.clear()
+        # A worker that built its filter before the logout: the next sync
+        # reads the new row from the table.
+        stale = blacklist.BloomFilter(blacklist.MIN_CAPACITY, 0.001)
+        synced = time.monotonic() - blacklist.sync_seconds() - 1
+        with mock.patch.multiple(blacklist, _filter=stale, _built_at=time.monotonic(), _synced_at=synced, _last_pk=0):
+            resp = self.client.post(reverse("token_refresh"), {"refresh": refresh}, format="json")
+        self.assertEqual(resp.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_sync_interval_is_capped_by_access_token_lifetime(self):
+        with self.settings(TOKEN_BLACKLIST_BLOOM_SYNC_SECONDS=3600):
+            self.assertEqual(blacklist.sync_seconds(), api_settings.ACCESS_TOKEN_LIFETIME.total_seconds() / 10)
+
+    def test_prune_tokens_deletes_expired_rows_in_batches(self):
+        past = timezone.now() - timedelta(days=2)
+        expired = OutstandingToken.objects.bulk_create(
+            OutstandingToken(user=self.user, jti=f"old-{n}", token="x", expires_at=past) for n in range(5)
+        )
+        BlacklistedToken.objects.create(token=expired[0])
+        self.tokens()  # one live token
+
+        call_command("prune_tokens", batch_size=2, stdout=io.StringIO())
+        self.assertEqual(OutstandingToken.objects.count(), 1)
+        self.assertFalse(BlacklistedToken.objects.exists())
+
+
+class LoginPipelineTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="Mixed@Example.com", email="Mixed@Example.com", password="pass1234")
+        self.login_url = reverse("token_obtain_pair")
+
+    def test_email_login_is_case_insensitive_and_single_query(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(login.find_user("mixed@example.COM"), self.user)
+        resp = self.client.post(self.login_url, {"email": "mixed@example.com", "password": "pass1234"}, format="json")
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertIn("access", resp.json())
+
+    def test_bad_credentials_and_inactive_users_are_rejected(self):
+        resp = self.client.post(self.login_url, {"email": "mixed@example.com", "password": "wrong-pass"}, format="json")
+        self.assertEqual(resp.status_code, status.HTTP_401_UNAUTHORIZED)
+        resp = self.client.post(self.login_url, {"email": "nobody@example.com", "password": "pass1234"}, format="json")
+        self.assertEqual(resp.status_code, status.HTTP_401_UNAUTHORIZED)
+        resp = self.client.post(self.login_url, {"password": "pass1234"}, format="json")
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        resp = self.client.post(self.login_url, {"email": "mixed@example.com", "password": "pass1234"}, format="json")
+        self.assertEqual(resp.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_outdated_hash_is_upgraded_without_revoking_tokens(self):
+        with self.settings(PASSWORD_HASHERS=[
+            "django.contrib.auth.hashers.PBKDF2PasswordHasher",
+            "django.contrib.auth.hashers.MD5PasswordHasher",
+        ]):
+            User.objects.filter(pk=self.user.pk).update(password=make_password("pass1234", hasher="md5"))
+            resp = self.client.post(self.login_url, {"username": "Mixed@Example.com", "password": "pass1234"}, format="json")
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        user = User.objects.get(pk=self.user.pk)
+        self.assertTrue(user.password.startswith("pbkdf2_sha256$"))
+        self.assertEqual(user.token_version, 0)
+
+    def test_login_is_refused_when_every_hasher_slot_is_busy(self):
+        slots = login.hasher_slots()
+        held = 0
+        while slots.acquire(blocking=False):
+            held += 1
+        try:
+            resp = self.client.post(self.login_url, {"email": "mixed@example.com", "password": "pass1234"}, format="json")
+        finally:
+            for _ in range(held):
+                slots.release()
+        self.assertEqual(resp.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(resp["Retry-After"], str(login.BUSY_RETRY_AFTER))
+        resp = self.client.post(self.login_url, {"email": "mixed@example.com", "password": "pass1234"}, format="json")
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+
+    def test_login_is_throttled_per_account(self):
+        cache.l2.clear()
+        with self.settings(THROTTLE_RATES={"login_account": "2/min"}):
+            for _ in range(2):
+                resp = self.client.post(self.login_url, {"email": "MIXED@example.com", "password": "wrong-pass"}, format="json")
+                self.assertEqual(resp.status_code, status.HTTP_401_UNAUTHORIZED)
+            resp = self.client.post(self.login_url, {"email": "mixed@example.com", "password": "pass1234"}, format="json")
+        self.assertEqual(resp.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn("Retry-After", resp)
+
+
+class DashboardTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        cache.l2.clear()
+        self.url = reverse("dashboard")
+        self.teacher = User.objects.create_user(username="teach", email="teach@example.com", password="x", is_instructor=True)
+        self.student = User.objects.create_user(username="learn", email="learn@example.com", password="x", first_name="Lea")
+        category = Category.objects.create(name="Dashboards")
+        self.course = Course.objects.create(title="Algebra", description="…", category=category,
+                                            instructor=self.teacher, price=Decimal("20.00"))
+        self.lessons = [
+            Lesson.objects.create(course=self.course, title=f"Lesson {n}", content="…", order=n) for n in range(1, 5)
+        ]
+        self.enrollment = Enrollment.objects.create(student=self.student, course=self.course)
+        for lesson in self.lessons[:2]:
+            LessonProgress.objects.create(enrollment=self.enrollment, lesson=lesson, completed=True)
+        Order.objects.create(student=self.student, course=self.course, amount=Decimal("20.00"), status=Order.COMPLETED)
+        Order.objects.create(student=self.student, course=self.course, amount=Decimal("20.00"), status=Order.FAILED)
+        Order.objects.create(student=self.student, course=self.course, amount=Decimal("20.00"))
+        Notification.objects.create(user=self.student, verb="Welcome")
+        Message.objects.create(sender=self.teacher, recipient=self.student, subject="Hi", body="…")
+
+    def test_student_dashboard_in_five_queries_then_cached(self):
+        self.client.force_authenticate(self.student)
+        with self.assertNumQueries(5):
+            data = self.client.get(self.url).json()
+        self.assertEqual(data["role"], "student")
+        self.assertEqual(
+            data["enrollments"],
+            [{"id": self.enrollment.pk, "student": self.student.pk, "course": self.course.pk,
+              "enrolled_at": data["enrollments"][0]["enrolled_at"]}],
+        )
+        self.assertEqual(data["enrollment_count"], 1)
+        self.assertEqual(data["enrollment_progress"][0]["completion_percent"], 50.0)
+        self.assertEqual(data["progress_summary"], {str(self.course.pk): 2})
+        self.assertEqual(len(data["recent_activity"]), 2)
+        self.assertEqual([n["verb"] for n in data["notifications"]], ["Welcome"])
+        self.assertEqual([m["subject"] for m in data["inbox"]], ["Hi"])
+        self.assertEqual((data["unread_notifications"], data["unread_messages"]), (1, 1))
+        self.assertEqual(data["user"]["first_name"], "Lea")
+        with self.assertNumQueries(0):
+            self.client.get(self.url)
+
+        LessonProgress.objects.create(enrollment=self.enrollment, lesson=self.lessons[2], completed=True)
+        data = self.client.get(self.url).json()
+        self.assertEqual(data["enrollment_progress"][0]["completion_percent"], 75.0)
+
+    def test_instructor_counts_enrollments_and_completed_revenue_only(self):
+        self.client.force_authenticate(self.teacher)
+        with self.assertNumQueries(6):
+            data = self.client.get(self.url).json()
+        self.assertEqual(data["role"], "instructor")
+        self.assertEqual(data["courses"][0]["title"], "Algebra")
+        self.assertEqual(data["courses"][0]["category"], "Dashboards")
+        self.assertEqual(data["courses"][0]["instructor"], "teach")
+        course = data["course_stats"][0]
+        self.assertEqual((course["students"], course["sales"], course["revenue"]), (1, 1, "20.00"))
+        self.assertEqual(course["completion_percent"], 50.0)
+        self.assertEqual(data["enrollment_stats"], {str(self.course.pk): 1})
+        self.assertEqual(data["revenue"], {"total": "20.00", "sales": 1})
+        self.assertEqual([entry["type"] for entry in data["recent_activity"]], ["sale", "enrollment"])
+        self.assertEqual((data["notifications"], data["inbox"]), ([], []))
+
+        # The course isn't loaded with the order: the instructor is looked up.
+        pending = Order.objects.get(status=Order.PENDING)
+        pending.status = Order.COMPLETED
+        pending.save(update_fields=["status"])
+        self.assertEqual(self.client.get(self.url).json()["revenue"], {"total": "40.00", "sales": 2})
+
+    def test_loaded_course_spares_the_instructor_lookup(self):
+        with self.assertNumQueries(1):  # the INSERT
+            LessonProgress.objects.create(enrollment=self.enrollment, lesson=self.lessons[3])
+        order = Order.objects.select_related("course").get(status=Order.PENDING)
+        with self.assertNumQueries(1):  # the UPDATE
+            order.save(update_fields=["status"])
+
+    def test_progress_and_orders_are_fast_deleted(self):
+        from django.db.models.deletion import Collector
+
+        collector = Collector(using="default")
+        self.assertTrue(collector.can_fast_delete(LessonProgress.objects.all()))
+        self.assertTrue(collector.can_fast_delete(Order.objects.all()))
+
+
+class GDPRExportTests(APITestCase):
+    def setUp(self):
+        self.export_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.export_dir.cleanup)
+        settings_override = override_settings(GDPR_EXPORT_DIR=self.export_dir.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.url = reverse("gdpr-export")
+        self.user = User.objects.create_user(username="owner", email="owner@example.com", password="x")
+        teacher = User.objects.create_user(username="prof", email="prof@example.com", password="x", is_instructor=True)
+        category = Category.objects.create(name="Exports")
+        for n in range(3):
+            course = Course.objects.create(title=f"Course {n}", description="…", category=category,
+                                           instructor=teacher, price=Decimal("0.00"), is_free=True)
+            enrollment = Enrollment.objects.create(student=self.user, course=course)
+            lesson = Lesson.objects.create(course=course, title="Intro", content="…", order=1)
+            LessonProgress.objects.create(enrollment=enrollment, lesson=lesson, completed=True)
+        Message.objects.create(sender=teacher, recipient=self.user, subject="Hi", body="…")
+
+    def test_export_is_built_in_the_background_and_streamed(self):
+        self.client.force_authenticate(self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            resp = self.client.post(self.url)
+        self.assertEqual(resp.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(resp.data["status"], DataExport.PENDING)
+
+        detail = self.client.get(reverse("gdpr-export-detail", args=[resp.data["id"]])).data
+        self.assertEqual(detail["status"], DataExport.READY)
+        self.assertTrue(detail["download_url"].endswith(reverse("gdpr-export-download", args=[resp.data["id"]])))
+
+        download = self.client.get(detail["download_url"])
+        self.assertEqual(download.status_code, status.HTTP_200_OK)
+        self.assertTrue(download.streaming)
+        self.assertEqual(download["Content-Type"], "application/zip")
+        with zipfile.ZipFile(io.BytesIO(b"".join(download.streaming_content))) as archive:
+            sections = {
+                name: [json.loads(line) for line in archive.read(name).splitlines()]
+                for name in archive.namelist()
+            }
+        self.assertEqual(sections["profile.ndjson"][0]["email"], "owner@example.com")
+        self.assertEqual(len(sections["enrollments.ndjson"]), 3)
+        self.assertEqual(len(sections["progress.ndjson"]), 3)
+        self.assertEqual(sections["courses.ndjson"], [])
+        self.assertEqual(sections["messages_received.ndjson"][0]["sender"], "prof")
+
+    def test_exports_are_private_and_not_duplicated(self):
+        self.client.force_authenticate(self.user)
+        first = self.client.post(self.url)  # not committed yet, so still pending
+        again = self.client.post(self.url)
+        self.assertEqual(again.status_code, status.HTTP_200_OK)
+        self.assertEqual(again.data["id"], first.data["id"])
+
+        self.client.force_authenticate(User.objects.get(username="prof"))
+        self.assertEqual(self.client.get(self.url).data, [])
+        missing = self.client.get(reverse("gdpr-export-detail", args=[first.data["id"]]))
+        self.assertEqual(missing.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_expired_exports_and_files_are_purged(self):
+        self.client.force_authenticate(self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            export_id = self.client.post(self.url).data["id"]
+        export = DataExport.objects.get(pk=export_id)
+        path = gdpr.export_path(export)
+        self.assertTrue(path.exists())
+
+        DataExport.objects.filter(pk=export_id).update(finished_at=timezone.now() - timedelta(days=8))
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command("run_pending_jobs", stdout=io.StringIO())
+        self.assertFalse(DataExport.objects.filter(pk=export_id).exists())
+        self.assertFalse(path.exists())
+
+    def test_worker_process_resumes_interrupted_exports(self):
+        # Queued by a web process that died before the job ran.
+        export = DataExport.objects.create(user=self.user)
+        DataExport.objects.filter(pk=export.pk).update(created_at=timezone.now() - timedelta(minutes=11))
+        from accounts.management.commands import run_pending_jobs
+
+        with mock.patch.object(run_pending_jobs.time, "sleep", side_effect=SystemExit), \
+                mock.patch.object(run_pending_jobs, "close_old_connections"), self.assertRaises(SystemExit):
+            call_command("run_pending_jobs", every=60, stdout=io.StringIO())
+        self.assertEqual(DataExport.objects.get(pk=export.pk).status, DataExport.READY)
+
+
+@override_settings(GDPR_ERASE_BATCH_SIZE=2)
+class GDPRErasureTests(APITestCase):
+    def setUp(self):
+        self.url = reverse("gdpr-delete")
+        self.user = User.objects.create_user(username="leaver", email="leaver@example.com", password="x",
+                                             first_name="Lee")
+        self.other = User.objects.create_user(username="stayer", email="stayer@example.com", password="x")
+        teacher = User.objects.create_user(username="tutor", email="tutor@example.com", password="x", is_instructor=True)
+        category = Category.objects.create(name="Erasure")
+        for n in range(3):
+            course = Course.objects.create(title=f"Course {n}", description="…", category=category,
+                                           instructor=teacher, price=Decimal("0.00"), is_free=True)
+            lesson = Lesson.objects.create(course=course, title="Intro", content="…", order=1)
+            question = FollowUpQuestion.objects.create(lesson=lesson, question_text="?")
+            for student in (self.user, self.other):
+                enrollment = Enrollment.objects.create(student=student, course=course)
+                LessonProgress.objects.create(enrollment=enrollment, lesson=lesson, completed=True)
+                Answer.objects.create(question=question, student=student, selected="A", is_correct=True)
+
+    def test_user_is_anonymized_now_and_records_removed_in_batches(self):
+        self.client.force_authenticate(self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            resp = self.client.delete(self.url)
+            self.user.refresh_from_db()
+            self.assertEqual((self.user.username, self.user.email, self.user.first_name),
+                             (f"deleted_user_{self.user.pk}", "", ""))
+            self.assertFalse(self.user.is_active)
+            self.assertFalse(self.user.has_usable_password())
+            self.assertEqual(Enrollment.objects.filter(student=self.user).count(), 3)
+        self.assertEqual(resp.status_code, status.HTTP_202_ACCEPTED)
+
+        erasure = AccountErasure.objects.get(pk=resp.data["erasure"])
+        self.assertEqual(erasure.status, AccountErasure.DONE)
+        self.assertEqual(erasure.deleted, {"answers": 3, "progress": 3, "enrollments": 3})
+        self.assertFalse(Enrollment.objects.filter(student=self.user).exists())
+        self.assertFalse(LessonProgress.objects.filter(enrollment__student=self.user).exists())
+        self.assertFalse(Answer.objects.filter(student=self.user).exists())
+        self.assertEqual(Enrollment.objects.filter(student=self.other).count(), 3)
+        self.assertEqual(LessonProgress.objects.count(), 3)
+        self.assertEqual(Answer.objects.count(), 3)
+
+    def test_interrupted_erasure_is_resumed(self):
+        erasure = AccountErasure.objects.create(user=self.user, status=AccountErasure.RUNNING,
+                                                deleted={"answers": 3})
+        AccountErasure.objects.filter(pk=erasure.pk).update(created_at=timezone.now() - timedelta(hours=1))
+        Answer.objects.filter(student=self.user).delete()
+        call_command("run_pending_jobs", stdout=io.StringIO())
+        erasure.refresh_from_db()
+        self.assertEqual(erasure.status, AccountErasure.DONE)
+        self.assertEqual(erasure.deleted, {"answers": 3, "progress": 3, "enrollments": 3})
+        self.assertFalse(Enrollment.objects.filter(student=self.user).exists())
+
+    def test_running_erasure_with_a_live_lease_is_left_alone(self):
+        erasure = AccountErasure.objects.create(user=self.user)
+        AccountErasure.objects.filter(pk=erasure.pk).update(created_at=timezone.now() - timedelta(hours=1))
+        lease = jobs.claim(AccountErasure, erasure.pk)
+        self.assertIsNone(jobs.claim(AccountErasure, erasure.pk))
+        call_command("run_pending_jobs", stdout=io.StringIO())
+        self.assertEqual(AccountErasure.objects.get(pk=erasure.pk).status, AccountErasure.RUNNING)
+        self.assertEqual(Enrollment.objects.filter(student=self.user).count(), 3)
+
+        # Its heartbeat stops; the next pass takes over and the old run, if
+        # it wakes up, finds its lease gone.
+        AccountErasure.objects.filter(pk=erasure.pk).update(lease_expires_at=timezone.now() - timedelta(seconds=1))
+        call_command("run_pending_jobs", stdout=io.StringIO())
+        self.assertEqual(AccountErasure.objects.get(pk=erasure.pk).status, AccountErasure.DONE)
+        with self.assertRaises(jobs.LeaseLost):
+            lease.renew(force=True)
+
+
+class NotificationCounterTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        cache.l2.clear()
+        self.teacher = User.objects.create_user(username="lecturer", email="lecturer@example.com", password="x",
+                                                is_instructor=True)
+        self.students = [
+            User.objects.create_user(username=f"pupil{n}", email=f"pupil{n}@example.com", password="x")
+            for n in range(5)
+        ]
+        category = Category.objects.create(name="Notices")
+        self.course = Course.objects.create(title="Physics", description="…", category=category,
+                                            instructor=self.teacher, price=Decimal("0.00"), is_free=True)
+        for student in self.students:
+            Enrollment.objects.create(student=student, course=self.course)
+        self.count_url = reverse("notification-unread-count")
+
+    @override_settings(NOTIFICATION_BATCH_SIZE=2)
+    def test_new_lesson_fans_out_to_enrolled_students_in_batches(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Lesson.objects.create(course=self.course, title="Optics", content="…", order=1)
+        self.assertEqual(Notification.objects.filter(verb="New lesson in Physics: Optics").count(), 5)
+        self.assertFalse(Notification.objects.filter(user=self.teacher).exists())
+        self.assertEqual(sorted(NotificationCounter.objects.values_list("unread", flat=True)), [1] * 5)
+
+        self.client.force_authenticate(self.students[0])
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get(self.count_url).data, {"unread": 1})
+
+    def test_counter_follows_single_changes_and_mark_all_read(self):
+        student = self.students[0]
+        self.client.force_authenticate(student)
+        self.assertEqual(self.client.get(self.count_url).data, {"unread": 0})
+        first = Notification.objects.create(user=student, verb="One")
+        notifications.notify([student.pk, self.students[1].pk], "Two")
+        Notification.objects.create(user=student, verb="Read already", is_read=True)
+        self.assertEqual(self.client.get(self.count_url).data, {"unread": 2})
+
+        resp = self.client.patch(reverse("notification-detail", args=[first.pk]), {"is_read": True}, format="json")
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.client.get(self.count_url).data, {"unread": 1})
+        unread = self.client.get(reverse("notification-list"), {"is_read": "false"}).data
+        self.assertEqual([row["verb"] for row in unread["results"]], ["Two"])
+
+        resp = self.client.post(reverse("notification-mark-all-read"))
+        self.assertEqual(resp.data, {"marked": 1})
+        self.assertEqual(self.client.get(self.count_url).data, {"unread": 0})
+        self.assertEqual(notifications.unread_count(self.students[1].pk), 1)
+
+        Notification.objects.create(user=student, verb="Three").delete()
+        self.assertEqual(notifications.unread_count(student.pk), 0)
+        self.assertEqual(self.client.get(reverse("dashboard")).json()["unread_notifications"], 0)
+
+    def test_racing_reads_move_the_counter_once(self):
+        student = self.students[0]
+        notifications.notify([student.pk], "One")
+        notifications.notify([student.pk], "Two")
+        first, second = Notification.objects.filter(user=student).order_by("pk")
+        stale = Notification.objects.get(pk=first.pk)  # loaded while still unread
+
+        self.assertTrue(notifications.set_read(first.pk, student.pk))
+        self.assertFalse(notifications.set_read(first.pk, student.pk))  # the second PATCH
+        self.assertEqual(notifications.unread_count(student.pk), 1)
+        self.client.force_authenticate(student)
+        self.client.patch(reverse("notification-detail", args=[first.pk]), {"is_read": True}, format="json")
+        self.assertEqual(notifications.unread_count(student.pk), 1)
+
+        notifications.mark_all_read(student.pk)
+        stale.is_read = True
+        stale.save()  # an instance that missed both changes
+        self.assertEqual(notifications.unread_count(student.pk), 0)
+        self.assertTrue(Notification.objects.get(pk=second.pk).is_read)
+
+    def test_recount_command_repairs_drifted_counters(self):
+        notifications.notify([self.students[0].pk], "One")
+        NotificationCounter.objects.update(unread=7)
+        Notification.objects.bulk_create([Notification(user=self.students[1], verb="Raw")])  # no counter yet
+        call_command("recount_notifications", batch_size=2, stdout=io.StringIO())
+        self.assertEqual(notifications.unread_count(self.students[0].pk), 1)
+        self.assertEqual(notifications.unread_count(self.students[1].pk), 1)
+        self.assertEqual(notifications.unread_count(self.teacher.pk), 0)
@@ -0,0 +1,48 @@
+# accounts/tokens.py
+"""
+JWTs that carry what request handling needs to know about the user.
+
+Besides the user id, every refresh token — and each access token derived
+from it — holds the User.CLAIM_FIELDS flags and the user's token_version
+("ver"), so StatelessJWTAuthentication can authorize a request without
+loading the user row. Blacklist checks go through the Bloom filter in
+accounts/blacklist.py first.
+"""
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from . import blacklist
+
+VERSION_CLAIM = "ver"
+
+
+class ClaimsRefreshToken(RefreshToken):
+    """
+    RefreshToken.for_user() plus the claim fields and token version; the
+    blacklist is only queried when the Bloom filter reports a possible hit.
+    """
+
+    def check_blacklist(self):
+        if blacklist.might_contain(self.payload[api_settings.JTI_CLAIM]):
+            super().check_blacklist()
+
+    def blacklist(self):
+        result = super().blacklist()
+        blacklist.add(self.payload[api_settings.JTI_CLAIM])
+        return result
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token[VERSION_CLAIM] = user.token_version
+        for name in user.CLAIM_FIELDS:
+            token[name] = getattr(user, name)
+        return token
+
+
+def issue_tokens(user):
+    """
+    {"refresh", "access"} for a freshly authenticated user.
+    """
+    refresh = ClaimsRefreshToken.for_user(user)
+    return {"refresh": str(refresh), "access": str(refresh.access_token)}
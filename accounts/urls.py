@@ -10,6 +10,8 @@ from .views import (
     DashboardView,
     LogoutView,
     GDPRDataExportView,
+    GDPRDataExportDetailView,
+    GDPRDataExportDownloadView,
     GDPRDeleteAccountView,
     NotificationViewSet,
     MessageViewSet,
@@ -23,6 +25,8 @@ urlpatterns = [
     path("dashboard/",    DashboardView.as_view(),            name="dashboard"),
     path("logout/",       LogoutView.as_view(),               name="logout"),
     path("gdpr/export/",  GDPRDataExportView.as_view(),        name="gdpr-export"),
+    path("gdpr/export/<uuid:pk>/",          GDPRDataExportDetailView.as_view(),   name="gdpr-export-detail"),
+    path("gdpr/export/<uuid:pk>/download/", GDPRDataExportDownloadView.as_view(), name="gdpr-export-download"),
     path("gdpr/delete/",  GDPRDeleteAccountView.as_view(),     name="gdpr-delete"),
 ]
 router = DefaultRouter()
@@ -1,29 +1,24 @@
 # accounts/views.py
 
 from django.contrib.auth import get_user_model
-from django.db.models import Count
+from django.http import FileResponse, Http404
+from django.shortcuts import get_object_or_404
 from rest_framework import permissions, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import Throttled
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework_simplejwt.tokens import RefreshToken
 
+from . import dashboard, gdpr, login, notifications
+from .tokens import ClaimsRefreshToken, issue_tokens
 from .serializers import (
     MyTokenObtainPairSerializer,
     RegisterSerializer,
     ProfileSerializer,
-    FullDataExportSerializer,
-    UserDataExportSerializer, ProfileSerializer
-)
-from courses.models import Course
-from courses.serializers import CourseSerializer
-from enrollments.models import Enrollment, LessonProgress, Answer
-from enrollments.serializers import (
-    EnrollmentSerializer,
-    LessonProgressSerializer,
-    AnswerSerializer,
+    DataExportSerializer,
 )
 from rest_framework import viewsets
-from .models import Notification, Message
+from .models import DataExport, Notification, Message
 from .serializers import NotificationSerializer, MessageSerializer
 
 User = get_user_model()
@@ -32,17 +27,40 @@ User = get_user_model()
 class MyTokenObtainPairView(APIView):
     """
     POST /api/auth/login/
+    The password check needs a free hasher slot (accounts/login.py);
+    without one the client is told to retry instead of holding a thread.
     """
     permission_classes = [permissions.AllowAny]
 
     def post(self, request):
-        serializer = MyTokenObtainPairSerializer(
-            data=request.data,
-            context={"request": request},
-        )
-        serializer.is_valid(raise_exception=True)
-        # validated_data contains {"access": ..., "refresh": ...}
-        return Response(serializer.validated_data, status=status.HTTP_200_OK)
+        serializer = MyTokenObtainPairSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        identifier = serializer.validated_data["identifier"]
+
+        wait = login.throttle_wait(request, identifier)
+        if wait:
+            raise Throttled(wait)
+
+        user = login.find_user(identifier)
+        with login.hasher_slot() as acquired:
+            if not acquired:
+                return Response(
+                    {"detail": "Too many logins in progress, try again shortly."},
+                    status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    headers={"Retry-After": str(login.BUSY_RETRY_AFTER)},
+                )
+            matches, new_hash = login.verify_password(user, serializer.validated_data["password"])
+        if not (matches and user.is_active):
+            return Response(
+                {"detail": "No active user found with the given credentials."},
+                status=status.HTTP_401_UNAUTHORIZED,
+                headers={"WWW-Authenticate": 'Bearer realm="api"'},
+            )
+
+        if new_hash:
+            login.store_rehash(user, new_hash)
+        return Response(issue_tokens(user), status=status.HTTP_200_OK)
 
 
 class RegisterView(APIView):
@@ -50,6 +68,7 @@ class RegisterView(APIView):
     POST /api/auth/register/
     """
     permission_classes = [permissions.AllowAny]
+    throttle_scope     = "register"
 
     def post(self, request):
         serializer = RegisterSerializer(data=request.data)
@@ -58,17 +77,14 @@ class RegisterView(APIView):
 
         user = serializer.save()
 
-        refresh_obj   = RefreshToken.for_user(user)
-        access_token  = str(refresh_obj.access_token)
-        refresh_token = str(refresh_obj)
-
+        tokens    = issue_tokens(user)
         user_data = ProfileSerializer(user).data
 
         return Response(
             {
                 "user":    user_data,
-                "access":  access_token,
-                "refresh": refresh_token,
+                "access":  tokens["access"],
+                "refresh": tokens["refresh"],
             },
             status=status.HTTP_201_CREATED,
         )
@@ -94,56 +110,13 @@ class ProfileView(APIView):
 class DashboardView(APIView):
     """
     GET /api/auth/dashboard/
+    Counts, completion, revenue, recent activity and unread counters from
+    a few grouped queries, cached per user (accounts/dashboard.py).
     """
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request):
-        user = request.user
-        response_data = {}  # <- Make sure this is a dict
-
-        if user.is_instructor:
-            # Instructor side
-            courses = (
-                Course.objects.filter(instructor=user)
-                .annotate(num_students=Count("orders"))
-            )
-            response_data["role"] = "instructor"
-            response_data["courses"] = CourseSerializer(courses, many=True).data
-            response_data["enrollment_stats"] = {
-                c.id: c.num_students for c in courses
-            }
-
-        else:
-            # Student side
-            enrollments = Enrollment.objects.filter(student=user)
-            completed = (
-                LessonProgress.objects
-                .filter(enrollment__in=enrollments, completed=True)
-                .values("enrollment__course")
-                .annotate(completed_lessons=Count("id"))
-            )
-            response_data["role"] = "student"
-            response_data["enrollments"] = EnrollmentSerializer(
-                enrollments, many=True
-            ).data
-            response_data["progress_summary"] = {
-                item["enrollment__course"]: item["completed_lessons"]
-                for item in completed
-            }
-
-        # Optional: add user’s own name/email to dashboard payload
-        response_data["user"] = {
-            "first_name": user.first_name,
-            "last_name":  user.last_name,
-            "email":      user.email,
-        }
-
-        # TODO: Hook up your real notifications/messages logic here.
-        # For now, stub out empty lists so the front‑end doesn’t blow up:
-        response_data["notifications"] = []
-        response_data["inbox"]         = []
-
-        return Response(response_data, status=status.HTTP_200_OK)
+        return Response(dashboard.dashboard(request.user), status=status.HTTP_200_OK)
 
 class LogoutView(APIView):
     """
@@ -159,7 +132,7 @@ class LogoutView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
         try:
-            token = RefreshToken(refresh_token)
+            token = ClaimsRefreshToken(refresh_token)
             token.blacklist()
         except Exception:
             return Response(
@@ -175,7 +148,8 @@ class LogoutView(APIView):
 
 class GDPRDataExportView(APIView):
     """
-    GET /api/auth/gdpr/export/
+    GET  /api/auth/gdpr/export/   your exports, newest first
+    POST /api/auth/gdpr/export/   start one (202); built in the background
     """
     permission_classes = [permissions.IsAuthenticated]
 
@@ -184,66 +158,99 @@ class GDPRDataExportView(APIView):
 
     def get_view_description(self, html=False):
         return (
-            "Download a JSON dump of all your user profile, "
-            "enrollments, progress and quiz answers."
+            "Request a ZIP of your profile, courses, enrollments, progress, "
+            "quiz answers, notifications and messages as NDJSON files, then "
+            "poll it and download it when it is ready."
         )
 
     def get(self, request):
-        user = request.user
-        courses = Course.objects.filter(instructor=user)
-        enrollments = Enrollment.objects.filter(student=user)
-        progress = LessonProgress.objects.filter(enrollment__student=user)
-        answers = Answer.objects.filter(student=user)
+        exports = DataExport.objects.filter(user_id=request.user.pk).order_by("-created_at")
+        return Response(DataExportSerializer(exports, many=True, context={"request": request}).data)
 
-        payload = {
-            "user":        UserDataExportSerializer(user).data,
-            "courses":     CourseSerializer(courses, many=True).data,
-            "enrollments": EnrollmentSerializer(enrollments, many=True).data,
-            "progress":    LessonProgressSerializer(progress, many=True).data,
-            "answers":     AnswerSerializer(answers, many=True).data,
-        }
+    def post(self, request):
+        export, created = gdpr.request_export(request.user)
+        return Response(
+            DataExportSerializer(export, context={"request": request}).data,
+            status=status.HTTP_202_ACCEPTED if created else status.HTTP_200_OK,
+        )
 
-        serializer = FullDataExportSerializer(payload)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+
+class GDPRDataExportDetailView(APIView):
+    """
+    GET /api/auth/gdpr/export/{id}/
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, pk):
+        export = get_object_or_404(DataExport, pk=pk, user_id=request.user.pk)
+        return Response(DataExportSerializer(export, context={"request": request}).data)
+
+
+class GDPRDataExportDownloadView(APIView):
+    """
+    GET /api/auth/gdpr/export/{id}/download/
+    Streams the finished archive from disk.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, pk):
+        export = get_object_or_404(DataExport, pk=pk, user_id=request.user.pk, status=DataExport.READY)
+        try:
+            archive = open(gdpr.export_path(export), "rb")
+        except FileNotFoundError:
+            raise Http404("Export file is no longer available.")
+        return FileResponse(
+            archive,
+            as_attachment=True,
+            filename=f"personal-data-{export.created_at:%Y%m%d}.zip",
+            content_type="application/zip",
+        )
 
 
 class GDPRDeleteAccountView(APIView):
     """
     DELETE /api/auth/gdpr/delete/
-    Soft‐delete the user by anonymizing and removing PII.
+    Anonymize and deactivate the user now; their enrollments, progress and
+    answers are removed in the background (accounts/gdpr.py).
     """
     permission_classes = [permissions.IsAuthenticated]
 
     def delete(self, request):
-        user = request.user
-        user.username = f"deleted_user_{user.id}"
-        user.email = ""
-        user.set_unusable_password()
-        user.is_active = False
-        user.save()
-
-        Enrollment.objects.filter(student=user).delete()
-        LessonProgress.objects.filter(enrollment__student=user).delete()
-        Answer.objects.filter(student=user).delete()
-
+        erasure = gdpr.request_erasure(request.user)
         return Response(
-            {"detail": "Account deactivated and personal data removed."},
-            status=status.HTTP_204_NO_CONTENT
+            {"detail": "Account deactivated; your personal data is being removed.", "erasure": erasure.pk},
+            status=status.HTTP_202_ACCEPTED
         )
 
 class NotificationViewSet(viewsets.ModelViewSet):
     """
-    List and mark notifications as read.
+    List and mark notifications as read; ?is_read=false lists unread ones.
+    Unread totals come from a per-user counter (accounts/notifications.py).
     """
     serializer_class   = NotificationSerializer
 
     def get_queryset(self):
-        return Notification.objects.filter(user=self.request.user).order_by("-created_at")
+        queryset = Notification.objects.filter(user=self.request.user)
+        is_read = self.request.query_params.get("is_read", "").lower()
+        if is_read in ("true", "false"):
+            queryset = queryset.filter(is_read=is_read == "true")
+        return queryset.order_by("-created_at", "-id")
+
+    @action(detail=False, methods=["get"], url_path="unread-count")
+    def unread_count(self, request):
+        return Response({"unread": notifications.unread_count(request.user.pk)})
+
+    @action(detail=False, methods=["post"], url_path="mark-all-read")
+    def mark_all_read(self, request):
+        return Response({"marked": notifications.mark_all_read(request.user.pk)})
 
     def perform_update(self, serializer):
-        # support marking as read
-        serializer.instance.is_read = serializer.validated_data.get("is_read", True)
-        serializer.instance.save()
+        # support marking as read; one conditional UPDATE, so racing
+        # requests move the unread counter once
+        notification = serializer.instance
+        is_read = serializer.validated_data.get("is_read", True)
+        notifications.set_read(notification.pk, notification.user_id, is_read)
+        notification.is_read = notification._saved_is_read = is_read
         return serializer
 
 class MessageViewSet(viewsets.ModelViewSet):
@@ -257,7 +264,7 @@ class MessageViewSet(viewsets.ModelViewSet):
         return [permissions.IsAuthenticated()]
 
     def get_queryset(self):
-        return Message.objects.filter(recipient=self.request.user).order_by("-sent_at")
+        return Message.objects.filter(recipient=self.request.user).order_by("-sent_at", "-id")
 
     def perform_create(self, serializer):
         serializer.save(sender=self.request.user)
\ No newline at end of file
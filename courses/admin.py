@@ -13,6 +13,9 @@ from .models import (
     QuizOption,
     ExamProject,
     Order,
+    ChunkedUpload,
+    CourseAffinity,
+    TrendingScore,
 )
 #
 # ─── Category/Admin ───────────────────────────────────────────────────────────────
@@ -120,3 +123,35 @@ class OrderAdmin(admin.ModelAdmin):
     list_filter     = ("status", "course")
     search_fields   = ("student__username", "transaction_id")
     readonly_fields = ("created_at", "updated_at")
+
+
+
+#
+# ─── ChunkedUpload/Admin ──────────────────────────────────────────────────────────
+#
+@admin.register(ChunkedUpload)
+class ChunkedUploadAdmin(admin.ModelAdmin):
+    list_display    = ("filename", "kind", "user", "offset", "total_size", "status", "updated_at")
+    list_filter     = ("kind", "status")
+    search_fields   = ("filename", "user__username")
+    readonly_fields = ("offset", "checksum", "created_at", "updated_at")
+
+
+#
+# ─── CourseAffinity/Admin ─────────────────────────────────────────────────────────
+#
+@admin.register(CourseAffinity)
+class CourseAffinityAdmin(admin.ModelAdmin):
+    list_display  = ("course", "other", "co_count", "score")
+    list_select_related = ("course", "other")
+    search_fields = ("course__title", "other__title")
+
+
+#
+# ─── TrendingScore/Admin ──────────────────────────────────────────────────────────
+#
+@admin.register(TrendingScore)
+class TrendingScoreAdmin(admin.ModelAdmin):
+    list_display  = ("kind", "key", "score", "decayed_at")
+    list_filter   = ("kind",)
+    search_fields = ("key",)
@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class CoursesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'courses'
+
+    def ready(self):
+        from . import autocomplete, signals  # noqa: F401
+
+        if autocomplete.background_refresh():
+            autocomplete.start()
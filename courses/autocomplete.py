@@ -0,0 +1,258 @@
+# courses/autocomplete.py
+"""
+In-memory prefix index behind GET /api/courses/autocomplete/?q=…
+
+Course titles, category names, exam subjects and JAMB subjects are kept in
+one sorted array of (key, entry) pairs — one key per word start, so
+"Intro to Python" is found by "intro", "to p" and "pyth" — and looked up
+with bisect. Results are ranked by a popularity weight (enrollments,
+courses per category, questions per subject) and memoized per prefix, so
+a keystroke is answered from memory without touching the database.
+
+The index is built by a background thread that CoursesConfig.ready()
+starts when AUTOCOMPLETE_BACKGROUND_REFRESH is on (the Procfile's web
+process turns it on; management commands and tests leave it off). The
+model signals in courses/signals.py patch it, and the same thread rebuilds
+it every AUTOCOMPLETE_REFRESH_SECONDS to pick up changes made through other
+workers and fresh popularity counts. Patches that arrive while a rebuild
+is reading the database are logged and replayed onto the new arrays, so
+they are never lost. Requests never build it: until the first build
+finishes they get no suggestions, and during a rebuild they keep searching
+the previous arrays.
+
+A lookup scans the array from the prefix and stops once `limit` entries
+have matched, then ranks those; typing more narrows a prefix that has more.
+"""
+import logging
+import threading
+import time
+import unicodedata
+from bisect import bisect_left, insort
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Count
+
+from exams.models import ExamSubject
+from jamb.models import JAMBSubject
+from .models import Category, Course
+
+COURSE       = "course"
+CATEGORY     = "category"
+EXAM_SUBJECT = "exam_subject"
+JAMB_SUBJECT = "jamb_subject"
+
+logger = logging.getLogger(__name__)
+
+MEMO_LIMIT = 10_000
+RETRY_SECONDS = 30
+
+
+def normalize(text):
+    """
+    Casefold, strip accents and collapse whitespace.
+    """
+    text = unicodedata.normalize("NFKD", text or "")
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return " ".join(text.casefold().split())
+
+
+class PrefixIndex:
+    """
+    A sorted array of (key, entry_key) tuples searched with bisect.
+    `entries` maps entry_key → (weight, suggestion dict). `snapshot` holds
+    (keys, entries, memo) as one tuple, so a reader takes all three from
+    the same generation with a single attribute read. While load() runs,
+    `pending` logs the patches to replay onto its result.
+    """
+
+    def __init__(self):
+        self.snapshot = ([], {}, {})
+        self.lock = threading.Lock()
+        self.built = False
+        self.pending = None
+
+    @staticmethod
+    def _keys_for(label):
+        words = normalize(label).split(" ")
+        return [" ".join(words[i:]) for i in range(len(words)) if words[i]]
+
+    def _delete(self, keys, entries, entry_key):
+        current = entries.pop(entry_key, None)
+        if current is None:
+            return None
+        for key in self._keys_for(current[1]["label"]):
+            pos = bisect_left(keys, (key, entry_key))
+            if pos < len(keys) and keys[pos] == (key, entry_key):
+                del keys[pos]
+        return current[0]
+
+    def _upsert(self, keys, entries, entry_key, suggestion, weight):
+        previous = self._delete(keys, entries, entry_key)
+        if weight is None:
+            weight = previous or 0
+        entries[entry_key] = (weight, suggestion)
+        for key in self._keys_for(suggestion["label"]):
+            insort(keys, (key, entry_key))
+
+    def load(self, items):
+        """
+        Replace the whole index with (entry_key, suggestion, weight) items.
+        `items` may read the database lazily; patches made meanwhile are
+        replayed on top, since the rows read may predate them.
+        """
+        with self.lock:
+            self.pending = []
+        try:
+            keys, entries = [], {}
+            for entry_key, suggestion, weight in items:
+                entries[entry_key] = (weight, suggestion)
+                keys.extend((key, entry_key) for key in self._keys_for(suggestion["label"]))
+            keys.sort()
+            with self.lock:
+                for op, args in self.pending:
+                    op(keys, entries, *args)
+                self.snapshot = (keys, entries, {})
+                self.built = True
+        finally:
+            self.pending = None
+
+    # Updates are copy-on-write: readers never lock and always see either
+    # the old or the new arrays, never a half-shifted one.
+    def _patch(self, op, *args):
+        with self.lock:
+            if self.pending is not None:
+                self.pending.append((op, args))
+            if self.built:
+                keys, entries = list(self.snapshot[0]), dict(self.snapshot[1])
+                op(keys, entries, *args)
+                self.snapshot = (keys, entries, {})
+
+    def upsert(self, entry_key, suggestion, weight=None):
+        self._patch(self._upsert, entry_key, suggestion, weight)
+
+    def remove(self, entry_key):
+        self._patch(self._delete, entry_key)
+
+    def search(self, prefix, limit=10):
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        # Results only ever go into the memo of the arrays they were
+        # computed from; an update swaps in a fresh memo with new arrays.
+        keys, entries, memo = self.snapshot
+        memo_key = (prefix, limit)
+        cached = memo.get(memo_key)
+        if cached is not None:
+            return cached
+
+        seen = set()
+        pos = bisect_left(keys, (prefix,))
+        while len(seen) < limit and pos < len(keys) and keys[pos][0].startswith(prefix):
+            if keys[pos][1] in entries:
+                seen.add(keys[pos][1])
+            pos += 1
+        best = sorted((entries[k] for k in seen), key=lambda item: (-item[0], item[1]["label"]))
+        result = [suggestion for _, suggestion in best]
+
+        if len(memo) >= MEMO_LIMIT:
+            memo.clear()
+        memo[memo_key] = result
+        return result
+
+
+_index = PrefixIndex()
+_built_at = None
+_refresher = None
+_refresher_lock = threading.Lock()
+
+
+def refresh_seconds():
+    return getattr(settings, "AUTOCOMPLETE_REFRESH_SECONDS", 300)
+
+
+def background_refresh():
+    return getattr(settings, "AUTOCOMPLETE_BACKGROUND_REFRESH", False)
+
+
+def course_suggestion(course):
+    return {"type": COURSE, "id": course.pk, "label": course.title}
+
+
+def category_suggestion(category):
+    return {"type": CATEGORY, "id": category.pk, "label": category.name}
+
+
+def exam_subject_suggestion(subject):
+    return {"type": EXAM_SUBJECT, "id": subject.pk, "label": subject.name, "slug": subject.slug}
+
+
+def jamb_subject_suggestion(subject):
+    return {"type": JAMB_SUBJECT, "id": subject.pk, "label": subject.name, "slug": subject.slug}
+
+
+def _collect():
+    for course in Course.objects.annotate(weight=Count("enrollment")).only("id", "title"):
+        yield (COURSE, course.pk), course_suggestion(course), course.weight
+    for category in Category.objects.annotate(weight=Count("courses")):
+        yield (CATEGORY, category.pk), category_suggestion(category), category.weight
+    for subject in ExamSubject.objects.annotate(weight=Count("past_questions")):
+        yield (EXAM_SUBJECT, subject.pk), exam_subject_suggestion(subject), subject.weight
+    for subject in JAMBSubject.objects.annotate(weight=Count("questions")):
+        yield (JAMB_SUBJECT, subject.pk), jamb_subject_suggestion(subject), subject.weight
+
+
+def rebuild():
+    global _built_at
+    _index.load(_collect())
+    _built_at = time.monotonic()
+
+
+def _refresh_periodically():
+    while True:
+        if _built_at is not None:
+            time.sleep(max(0, _built_at + refresh_seconds() - time.monotonic()))
+        try:
+            rebuild()
+        except Exception:
+            logger.exception("Autocomplete index rebuild failed")
+            time.sleep(RETRY_SECONDS)
+        finally:
+            connection.close()  # this thread's connection
+
+
+def start():
+    """
+    Start the thread that builds and refreshes the index, unless it is
+    already running. Called from CoursesConfig.ready(), i.e. once per
+    process that loads the app registry.
+    """
+    global _refresher
+    if _refresher is not None and _refresher.is_alive():
+        return
+    with _refresher_lock:
+        if _refresher is None or not _refresher.is_alive():
+            _refresher = threading.Thread(target=_refresh_periodically, name="autocomplete-refresh", daemon=True)
+            _refresher.start()
+
+
+def get_index():
+    """
+    Return the process-wide index as it is now; never queries.
+    """
+    return _index
+
+
+def suggest(prefix, limit=10):
+    return get_index().search(prefix, limit)
+
+
+def upsert(entry_key, suggestion):
+    """
+    Patch one entry after a save; a no-op until the index is first built.
+    """
+    _index.upsert(entry_key, suggestion)
+
+
+def remove(entry_key):
+    _index.remove(entry_key)
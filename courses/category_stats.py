@@ -0,0 +1,44 @@
+# courses/category_stats.py
+"""
+Category listing with per-category course statistics.
+
+One grouped query computes, for every category, its course count, free
+and paid counts and the price range of its paid courses. The serialized
+listing is cached whole together with its ETag version in the CATEGORIES
+namespace of edenites_be/cache.py, so GET /api/categories/ (including a
+304) is a single cache read; Course and Category saves invalidate it.
+"""
+from django.db.models import Count, Max, Min, Q
+
+from edenites_be.cache import CATEGORIES
+from .models import Category
+
+CACHE_KEY = "listing"
+VERSION_MODELS = ("courses.category", "courses.course")
+
+
+def annotate_stats(queryset):
+    paid = Q(courses__is_free=False)
+    return queryset.annotate(
+        course_count=Count("courses"),
+        free_count=Count("courses", filter=Q(courses__is_free=True)),
+        paid_count=Count("courses", filter=paid),
+        min_price=Min("courses__price", filter=paid),
+        max_price=Max("courses__price", filter=paid),
+    )
+
+
+def category_listing():
+    """
+    Returns (version, listing): serialized categories with their stats,
+    ordered by name, and the conditional-GET version they were built at.
+    """
+    from edenites_be.conditional import resource_version
+    from .serializers import CategorySerializer
+
+    def build():
+        version = resource_version(VERSION_MODELS)
+        categories = annotate_stats(Category.objects.order_by("name"))
+        return version, [dict(item) for item in CategorySerializer(categories, many=True).data]
+
+    return CATEGORIES.get_or_set(CACHE_KEY, build)
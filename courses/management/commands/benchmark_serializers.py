@@ -0,0 +1,112 @@
+# courses/management/commands/benchmark_serializers.py
+
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from courses.models import Category, Course
+from courses.serializers import CourseSerializer
+from edenites_be.fastpath import compile_serializer, serialize_values
+from edenites_be.sparse import sparse_queryset
+from exams.models import ExamSubject, PastOption, PastQuestion
+from exams.serializers import PastQuestionSerializer
+from jamb.models import JAMBQuestion, JAMBSubject
+from jamb.serializers import JAMBQuestionSerializer
+from testimonials.models import Testimonial
+from testimonials.serializers import TestimonialSerializer
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the values() fast path with the DRF serializers on the hot list "
+        "endpoints. Runs on synthetic rows inside a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=1000, help="Rows per model (default 1000).")
+        parser.add_argument("--repeat", type=int, default=5, help="Best of N runs (default 5).")
+
+    def handle(self, *args, **options):
+        rows, repeat = options["rows"], options["repeat"]
+        try:
+            with transaction.atomic():
+                self._seed(rows)
+                for label, queryset, serializer_class in (
+                    ("courses", Course.objects.order_by("-created_at", "-id"), CourseSerializer),
+                    ("past questions", PastQuestion.objects.order_by("-year", "id"), PastQuestionSerializer),
+                    ("jamb questions", JAMBQuestion.objects.order_by("subject__name", "id"), JAMBQuestionSerializer),
+                    ("testimonials", Testimonial.objects.order_by("id"), TestimonialSerializer),
+                ):
+                    self._compare(label, queryset, serializer_class, rows, repeat)
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def _seed(self, rows):
+        User = get_user_model()
+        instructor = User.objects.create_user(
+            username="benchmark-instructor", email="benchmark@example.com", password=None
+        )
+        category = Category.objects.create(name="Benchmark category")
+        Course.objects.bulk_create(
+            Course(title=f"Course {n}", description="…" * 20, category=category,
+                   instructor=instructor, price=n % 100)
+            for n in range(rows)
+        )
+        subject = ExamSubject.objects.create(name="Benchmark subject")
+        questions = PastQuestion.objects.bulk_create(
+            PastQuestion(exam_type=PastQuestion.WAEC, year=2000 + n % 25, subject=subject,
+                         question_text=f"Question {n}", solution_text="…" * 20)
+            for n in range(rows)
+        )
+        PastOption.objects.bulk_create(
+            PastOption(question=question, label=label, text=f"Option {label}", is_correct=label == "A")
+            for question in questions
+            for label in "ABCD"
+        )
+        jamb_subject = JAMBSubject.objects.create(name="Benchmark subject", slug="benchmark-subject")
+        JAMBQuestion.objects.bulk_create(
+            JAMBQuestion(subject=jamb_subject, question_text=f"Question {n}", option_a="a",
+                         option_b="b", option_c="c", option_d="d", correct_choice="A")
+            for n in range(rows)
+        )
+        Testimonial.objects.bulk_create(
+            Testimonial(name=f"Student {n}", role="Student", quote="…" * 20, rating=n % 5 + 1)
+            for n in range(rows)
+        )
+
+    @staticmethod
+    def _best(run, repeat):
+        best, result = None, None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            result = run()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best, result
+
+    def _compare(self, label, queryset, serializer_class, rows, repeat):
+        serializer = serializer_class(many=True)
+        plan = compile_serializer(serializer, queryset.model)
+        if plan is None:
+            raise CommandError(f"{serializer_class.__name__} does not compile to a fast path.")
+
+        slow_time, slow = self._best(
+            lambda: serializer_class(sparse_queryset(queryset, serializer), many=True).data, repeat
+        )
+        fast_time, fast = self._best(lambda: plan.rows(serialize_values(queryset, plan)), repeat)
+        if JSONRenderer().render(fast) != JSONRenderer().render(slow):
+            raise CommandError(f"{label}: fast path output differs from the serializer.")
+
+        self.stdout.write(
+            f"{label:<15} serializer {slow_time / rows * 1e6:8.1f} µs/row   "
+            f"fast path {fast_time / rows * 1e6:8.1f} µs/row   "
+            + self.style.SUCCESS(f"{slow_time / fast_time:4.1f}x")
+        )
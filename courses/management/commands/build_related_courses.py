@@ -0,0 +1,19 @@
+# courses/management/commands/build_related_courses.py
+
+from django.core.management.base import BaseCommand
+
+from courses import recommendations
+
+
+class Command(BaseCommand):
+    help = "Rebuild the related-courses table from the co-enrollment matrix."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--top-k", type=int, default=None,
+            help="Neighbours kept per course (default: RELATED_COURSES_TOP_K).",
+        )
+
+    def handle(self, *args, **options):
+        count = recommendations.rebuild(options["top_k"])
+        self.stdout.write(self.style.SUCCESS(f"Stored {count} course affinities."))
@@ -0,0 +1,14 @@
+# courses/management/commands/decay_trending.py
+
+from django.core.management.base import BaseCommand
+
+from courses import trending
+
+
+class Command(BaseCommand):
+    help = "Flush buffered trending counters and apply exponential decay (run e.g. hourly)."
+
+    def handle(self, *args, **options):
+        trending.flush()
+        dropped = trending.decay()
+        self.stdout.write(self.style.SUCCESS(f"Decayed trending scores; dropped {dropped} faded row(s)."))
@@ -0,0 +1,24 @@
+# courses/management/commands/purge_chunked_uploads.py
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from courses.models import ChunkedUpload
+from courses.uploads import discard_upload
+
+
+class Command(BaseCommand):
+    help = "Delete unfinished chunked uploads (and their part files) older than CHUNKED_UPLOAD_EXPIRY."
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - settings.CHUNKED_UPLOAD_EXPIRY
+        stale = ChunkedUpload.objects.filter(
+            status=ChunkedUpload.UPLOADING,
+            updated_at__lt=cutoff,
+        )
+        count = 0
+        for upload in stale.iterator():
+            if discard_upload(upload):
+                count += 1
+        self.stdout.write(self.style.SUCCESS(f"Purged {count} stale upload(s)."))
@@ -0,0 +1,16 @@
+# courses/management/commands/rebuild_catalog_index.py
+
+from django.core.management.base import BaseCommand
+
+from courses import search
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text search index of the course catalog."
+
+    def handle(self, *args, **options):
+        if search.search_backend() is None:
+            self.stderr.write("No full-text index on this database; nothing to rebuild.")
+            return
+        count = search.rebuild_index()
+        self.stdout.write(self.style.SUCCESS(f"Indexed {count} course(s)."))
@@ -0,0 +1,65 @@
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        schema_editor.execute(
+            "CREATE TABLE courses_coursesearchindex ("
+            " course_id bigint PRIMARY KEY REFERENCES courses_course (id) ON DELETE CASCADE"
+            " DEFERRABLE INITIALLY DEFERRED,"
+            " document tsvector NOT NULL)"
+        )
+        schema_editor.execute(
+            "CREATE INDEX courses_coursesearchindex_document_gin "
+            "ON courses_coursesearchindex USING GIN (document)"
+        )
+    elif vendor == "sqlite":
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE courses_course_fts USING fts5("
+            "title, category, lessons, description, tokenize = 'porter unicode61')"
+        )
+    else:
+        return
+
+    Course = apps.get_model("courses", "Course")
+    Lesson = apps.get_model("courses", "Lesson")
+    for course in Course.objects.select_related("category").iterator():
+        lessons = " ".join(
+            Lesson.objects.filter(course=course).order_by("order").values_list("title", flat=True)
+        )
+        document = [course.title, course.category.name, lessons, course.description]
+        if vendor == "postgresql":
+            schema_editor.execute(
+                "INSERT INTO courses_coursesearchindex (course_id, document) VALUES (%s, "
+                "setweight(to_tsvector('english', %s), 'A') || "
+                "setweight(to_tsvector('english', %s), 'B') || "
+                "setweight(to_tsvector('english', %s), 'B') || "
+                "setweight(to_tsvector('english', %s), 'C'))",
+                [course.pk, *document],
+            )
+        else:
+            schema_editor.execute(
+                "INSERT INTO courses_course_fts (rowid, title, category, lessons, description) "
+                "VALUES (%s, %s, %s, %s, %s)",
+                [course.pk, *document],
+            )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        schema_editor.execute("DROP TABLE IF EXISTS courses_coursesearchindex")
+    elif vendor == "sqlite":
+        schema_editor.execute("DROP TABLE IF EXISTS courses_course_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0003_chunkedupload'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.20 on 2026-10-19 01:18
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def backfill_created_at(apps, schema_editor):
+    Course = apps.get_model("courses", "Course")
+    Course.objects.filter(created_at__isnull=True).update(created_at=timezone.now())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0004_course_search_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_created_at, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='course',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True),
+        ),
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(fields=['-created_at', '-id'], name='course_created_id_idx'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.20 on 2026-10-19 01:20
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0005_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CourseAffinity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('co_count', models.PositiveIntegerField(help_text='Students enrolled in both courses.')),
+                ('score', models.FloatField()),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='affinities', to='courses.course')),
+                ('other', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='courses.course')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['course', '-score'], name='affinity_course_score_idx')],
+                'unique_together': {('course', 'other')},
+            },
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 4.2.20 on 2026-10-19 01:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0006_course_affinity'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrendingScore',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('course', 'Course'), ('paper', 'Exam paper')], max_length=10)),
+                ('key', models.CharField(help_text='Course id, or EXAM_TYPE:year:subject-slug.', max_length=150)),
+                ('score', models.FloatField(default=0.0)),
+                ('decayed_at', models.DateTimeField(help_text='When `score` was last decayed.')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['kind', '-score'], name='trending_kind_score_idx')],
+                'unique_together': {('kind', 'key')},
+            },
+        ),
+    ]
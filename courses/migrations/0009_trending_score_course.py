@@ -0,0 +1,36 @@
+# Generated by Django 4.2.20 on 2026-10-19 02:23
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def link_course_scores(apps, schema_editor):
+    """
+    Point existing course scores at their course; drop those of deleted courses.
+    """
+    TrendingScore = apps.get_model("courses", "TrendingScore")
+    Course = apps.get_model("courses", "Course")
+    existing = set(Course.objects.values_list("id", flat=True))
+    orphans = []
+    for pk, key in TrendingScore.objects.filter(kind="course").values_list("id", "key"):
+        if key.isdigit() and int(key) in existing:
+            TrendingScore.objects.filter(pk=pk).update(course_id=int(key))
+        else:
+            orphans.append(pk)
+    TrendingScore.objects.filter(pk__in=orphans).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0008_sync_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='trendingscore',
+            name='course',
+            field=models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='trending', to='courses.course'),
+        ),
+        migrations.RunPython(link_course_scores, migrations.RunPython.noop),
+    ]
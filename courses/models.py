@@ -1,5 +1,6 @@
 # courses/models.py
 import os
+import uuid
 from decimal import Decimal
 from django.conf import settings
 from django.db import models
@@ -17,7 +18,8 @@ class Category(models.Model):
     """
     A category/tag for grouping multiple courses.
     """
-    name = models.CharField(max_length=100, unique=True)
+    name       = models.CharField(max_length=100, unique=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self):
         return self.name
@@ -44,7 +46,14 @@ class Course(models.Model):
         default=False,
         help_text="If True, course is entirely free; otherwise price applies."
     )
-    created_at  = models.DateTimeField(auto_now_add=True, null=True)
+    created_at  = models.DateTimeField(auto_now_add=True)
+    updated_at  = models.DateTimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            # Catalog listing / keyset pagination order
+            models.Index(fields=["-created_at", "-id"], name="course_created_id_idx"),
+        ]
 
     def __str__(self):
         return self.title
@@ -65,6 +74,7 @@ class Lesson(models.Model):
     is_free     = models.BooleanField(default=False, help_text="If True, this lesson is free preview.")
     order       = models.PositiveIntegerField(default=1, help_text="Display order within the course.")
     created_at  = models.DateTimeField(auto_now_add=True, null=True)
+    updated_at  = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         unique_together = ("course", "order")
@@ -249,3 +259,119 @@ class Order(models.Model):
 
     def __str__(self):
         return f"Order #{self.id} – {self.student.username} ⇒ {self.course.title} [{self.status}]"
+
+
+
+class ChunkedUpload(models.Model):
+    """
+    A resumable upload of a lesson video or exam submission.
+    Chunks are written straight into a part file under CHUNKED_UPLOAD_DIR at
+    their byte offset; `checksum` is a running SHA-256 chain over the chunk
+    digests, so it can be advanced without re-reading earlier bytes.
+    """
+    LESSON_VIDEO    = "LESSON_VIDEO"
+    EXAM_SUBMISSION = "EXAM_SUBMISSION"
+    KIND_CHOICES = [
+        (LESSON_VIDEO,    "Lesson video"),
+        (EXAM_SUBMISSION, "Exam submission"),
+    ]
+
+    UPLOADING = "UPLOADING"
+    COMPLETED = "COMPLETED"
+    STATUS_CHOICES = [
+        (UPLOADING, "Uploading"),
+        (COMPLETED, "Completed"),
+    ]
+
+    id         = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user       = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="chunked_uploads"
+    )
+    kind       = models.CharField(max_length=20, choices=KIND_CHOICES)
+    lesson     = models.ForeignKey(
+        Lesson,
+        on_delete=models.CASCADE,
+        related_name="chunked_uploads",
+        blank=True,
+        null=True
+    )
+    course     = models.ForeignKey(
+        Course,
+        on_delete=models.CASCADE,
+        related_name="chunked_uploads",
+        blank=True,
+        null=True
+    )
+    filename   = models.CharField(max_length=255)
+    total_size = models.BigIntegerField()
+    offset     = models.BigIntegerField(default=0, help_text="Bytes received so far.")
+    checksum   = models.CharField(max_length=64, blank=True, help_text="Running SHA-256 chain of chunk digests.")
+    status     = models.CharField(max_length=10, choices=STATUS_CHOICES, default=UPLOADING)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.get_kind_display()} {self.filename} [{self.offset}/{self.total_size}]"
+
+
+class CourseAffinity(models.Model):
+    """
+    Precomputed "students who took this also took…" edge: cosine similarity
+    of the two courses' enrollment vectors. Built by `build_related_courses`
+    and patched as enrollments change (see courses/recommendations.py).
+    """
+    course   = models.ForeignKey(
+        Course,
+        on_delete=models.CASCADE,
+        related_name="affinities"
+    )
+    other    = models.ForeignKey(
+        Course,
+        on_delete=models.CASCADE,
+        related_name="+"
+    )
+    co_count = models.PositiveIntegerField(help_text="Students enrolled in both courses.")
+    score    = models.FloatField()
+
+    class Meta:
+        unique_together = ("course", "other")
+        indexes = [
+            models.Index(fields=["course", "-score"], name="affinity_course_score_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.course_id} → {self.other_id} ({self.score:.3f})"
+
+
+class TrendingScore(models.Model):
+    """
+    Exponentially decayed activity counter for one course or exam paper.
+    Written in batches by courses/trending.py and decayed by `decay_trending`.
+    """
+    COURSE = "course"
+    PAPER  = "paper"
+    KIND_CHOICES = [
+        (COURSE, "Course"),
+        (PAPER,  "Exam paper"),
+    ]
+
+    kind       = models.CharField(max_length=10, choices=KIND_CHOICES)
+    key        = models.CharField(max_length=150, help_text="Course id, or EXAM_TYPE:year:subject-slug.")
+    # Set for course scores, so ?ordering=trending is a join driven by the
+    # (kind, -score) index rather than a per-course subquery.
+    course     = models.OneToOneField(
+        "Course", null=True, blank=True, on_delete=models.CASCADE, related_name="trending"
+    )
+    score      = models.FloatField(default=0.0)
+    decayed_at = models.DateTimeField(help_text="When `score` was last decayed.")
+
+    class Meta:
+        unique_together = ("kind", "key")
+        indexes = [
+            models.Index(fields=["kind", "-score"], name="trending_kind_score_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.key}: {self.score:.2f}"
@@ -0,0 +1,170 @@
+# courses/recommendations.py
+"""
+"Students who took this also took…" from co-enrollment.
+
+Every course is a sparse binary vector over students. The similarity of
+two courses is the cosine of their vectors,
+
+    score(a, b) = co(a, b) / sqrt(n(a) · n(b))
+
+where co(a, b) is the number of students enrolled in both and n(x) the
+enrollment count of x. `rebuild()` computes the whole co-occurrence matrix
+in one pass over Enrollment and stores the RELATED_COURSES_TOP_K best
+neighbours of each course in CourseAffinity, so serving is a single read
+on the (course, -score) index.
+
+`refresh_for_enrollment()` runs as a background job (edenites_be/jobs.py)
+after an enrollment is created or deleted. It recomputes the exact
+co-counts and scores of the pairs it touches, writes them with one upsert
+and trims the touched courses back to their top-k. Other scores of those
+courses drift slightly as enrollment counts grow; the periodic rebuild
+corrects them.
+"""
+import heapq
+import math
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Q
+
+from enrollments.models import Enrollment
+from .models import CourseAffinity
+
+
+def top_k():
+    return getattr(settings, "RELATED_COURSES_TOP_K", 20)
+
+
+def _cosine(co, n_a, n_b):
+    return co / math.sqrt(n_a * n_b) if n_a and n_b else 0.0
+
+
+def co_occurrence():
+    """
+    Returns (co, sizes): co[a][b] = students in both a and b (a ≠ b),
+    sizes[a] = students in a.
+    """
+    by_student = defaultdict(list)
+    rows = Enrollment.objects.order_by().values_list("student_id", "course_id").iterator(chunk_size=5000)
+    for student_id, course_id in rows:
+        by_student[student_id].append(course_id)
+
+    co = defaultdict(Counter)
+    sizes = Counter()
+    for courses in by_student.values():
+        sizes.update(courses)
+        for a in courses:
+            row = co[a]
+            for b in courses:
+                if a != b:
+                    row[b] += 1
+    return co, sizes
+
+
+def rebuild(k=None):
+    """
+    Recompute every course's top-k neighbours. Returns the number of rows.
+    """
+    k = k or top_k()
+    co, sizes = co_occurrence()
+    rows = []
+    for a, neighbours in co.items():
+        best = heapq.nlargest(
+            k,
+            ((_cosine(count, sizes[a], sizes[b]), count, b) for b, count in neighbours.items()),
+        )
+        rows.extend(
+            CourseAffinity(course_id=a, other_id=b, co_count=count, score=score)
+            for score, count, b in best
+        )
+    with transaction.atomic():
+        CourseAffinity.objects.all().delete()
+        CourseAffinity.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
+
+
+def refresh_for_enrollment(student_id, course_id):
+    """
+    Re-score the pairs between `course_id` and the student's other courses
+    after the student enrolled in (or left) `course_id`.
+    """
+    others = list(
+        Enrollment.objects.filter(student_id=student_id)
+        .exclude(course_id=course_id)
+        .values_list("course_id", flat=True)
+    )
+    if not others:
+        return
+    co = dict(
+        Enrollment.objects.filter(
+            course_id__in=others,
+            student__in=Enrollment.objects.filter(course_id=course_id).values("student_id"),
+        )
+        .values_list("course_id")
+        .annotate(n=Count("id"))
+        .order_by()
+    )
+    sizes = dict(
+        Enrollment.objects.filter(course_id__in=[course_id, *others])
+        .values_list("course_id")
+        .annotate(n=Count("id"))
+        .order_by()
+    )
+
+    rows, gone = [], Q()
+    for other in others:
+        count = co.get(other, 0)
+        if not count:
+            gone |= Q(course_id=course_id, other_id=other) | Q(course_id=other, other_id=course_id)
+            continue
+        score = _cosine(count, sizes.get(course_id, 0), sizes.get(other, 0))
+        rows.extend(
+            CourseAffinity(course_id=a, other_id=b, co_count=count, score=score)
+            for a, b in ((course_id, other), (other, course_id))
+        )
+
+    with transaction.atomic():
+        if gone:
+            CourseAffinity.objects.filter(gone).delete()
+        CourseAffinity.objects.bulk_create(
+            rows,
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=["course", "other"],
+            update_fields=["co_count", "score"],
+        )
+        _prune([course_id, *others])
+
+
+def _prune(course_ids, k=None):
+    """
+    Drop the neighbours of `course_ids` that fell out of their top-k.
+    """
+    k = k or top_k()
+    kept = Counter()
+    extra = []
+    affinities = (
+        CourseAffinity.objects.filter(course_id__in=course_ids)
+        .order_by("course_id", "-score", "other_id")
+        .values_list("pk", "course_id")
+    )
+    for pk, course_id in affinities:
+        kept[course_id] += 1
+        if kept[course_id] > k:
+            extra.append(pk)
+    if extra:
+        CourseAffinity.objects.filter(pk__in=extra).delete()
+
+
+def related_courses(course_id, limit=None):
+    """
+    The `limit` most similar courses, best first — one indexed read.
+    """
+    limit = min(limit or top_k(), top_k())
+    affinities = (
+        CourseAffinity.objects.filter(course_id=course_id)
+        .select_related("other__category", "other__instructor")
+        .order_by("-score", "other_id")[:limit]
+    )
+    return [(a.other, a.score) for a in affinities]
@@ -0,0 +1,201 @@
+# courses/search.py
+"""
+Full-text catalog search.
+
+Each course is indexed as one weighted document made of its title, its
+category name, the titles of its lessons and its description:
+
+  • PostgreSQL: `courses_coursesearchindex` holds a weighted tsvector per
+    course behind a GIN index; queries use websearch_to_tsquery and are
+    ranked with ts_rank_cd.
+  • SQLite: `courses_course_fts` is an FTS5 table using the porter
+    tokenizer (stemming); queries are ranked with bm25().
+
+Other databases fall back to DRF's icontains SearchFilter.
+The index is kept current by the signals in courses/signals.py.
+"""
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Case, IntegerField, When
+from rest_framework import filters
+
+from .models import Course, Lesson
+
+PG_TABLE = "courses_coursesearchindex"
+SQLITE_TABLE = "courses_course_fts"
+
+# Relative weight of title, category, lesson titles and description.
+SQLITE_BM25_WEIGHTS = (10.0, 4.0, 4.0, 1.0)
+
+# Vendors whose index table has been seen; only positives are remembered so
+# a later `migrate` is picked up without a restart.
+_available = {}
+
+
+def search_backend():
+    """
+    Returns "postgresql", "sqlite" or None when the current database has
+    no full-text index.
+    """
+    vendor = connection.vendor
+    if vendor not in ("postgresql", "sqlite"):
+        return None
+    if vendor not in _available:
+        table = PG_TABLE if vendor == "postgresql" else SQLITE_TABLE
+        with connection.cursor() as cursor:
+            if table not in connection.introspection.table_names(cursor):
+                return None
+        _available[vendor] = True
+    return vendor
+
+
+def max_results():
+    return getattr(settings, "CATALOG_SEARCH_MAX_RESULTS", 1000)
+
+
+def _document(course_id):
+    row = (
+        Course.objects.filter(pk=course_id)
+        .values_list("title", "category__name", "description")
+        .first()
+    )
+    if row is None:
+        return None
+    title, category, description = row
+    lessons = " ".join(
+        Lesson.objects.filter(course_id=course_id).order_by("order").values_list("title", flat=True)
+    )
+    return title, category or "", lessons, description
+
+
+def index_course(course_id):
+    """
+    (Re)build the search document of one course.
+    """
+    backend = search_backend()
+    if backend is None:
+        return
+    document = _document(course_id)
+    if document is None:
+        remove_course(course_id)
+        return
+    with connection.cursor() as cursor:
+        if backend == "postgresql":
+            cursor.execute(
+                f"""
+                INSERT INTO {PG_TABLE} (course_id, document) VALUES (
+                    %s,
+                    setweight(to_tsvector('english', %s), 'A') ||
+                    setweight(to_tsvector('english', %s), 'B') ||
+                    setweight(to_tsvector('english', %s), 'B') ||
+                    setweight(to_tsvector('english', %s), 'C')
+                )
+                ON CONFLICT (course_id) DO UPDATE SET document = EXCLUDED.document
+                """,
+                [course_id, *document],
+            )
+        else:
+            cursor.execute(f"DELETE FROM {SQLITE_TABLE} WHERE rowid = %s", [course_id])
+            cursor.execute(
+                f"INSERT INTO {SQLITE_TABLE} (rowid, title, category, lessons, description) "
+                f"VALUES (%s, %s, %s, %s, %s)",
+                [course_id, *document],
+            )
+
+
+def remove_course(course_id):
+    backend = search_backend()
+    if backend is None:
+        return
+    with connection.cursor() as cursor:
+        if backend == "postgresql":
+            cursor.execute(f"DELETE FROM {PG_TABLE} WHERE course_id = %s", [course_id])
+        else:
+            cursor.execute(f"DELETE FROM {SQLITE_TABLE} WHERE rowid = %s", [course_id])
+
+
+def rebuild_index():
+    """
+    Re-index every course. Returns the number of courses indexed.
+    """
+    backend = search_backend()
+    if backend is None:
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {PG_TABLE if backend == 'postgresql' else SQLITE_TABLE}")
+    count = 0
+    for course_id in Course.objects.values_list("pk", flat=True).iterator():
+        index_course(course_id)
+        count += 1
+    return count
+
+
+def _fts5_query(text):
+    """
+    Turn free text into a safe FTS5 expression: every word is quoted (so
+    operators in user input are inert) and the last one is a prefix match.
+    """
+    words = re.findall(r"\w+", text)
+    if not words:
+        return None
+    terms = [f'"{w}"' for w in words]
+    terms[-1] += "*"
+    return " ".join(terms)
+
+
+def search_course_ids(text, limit=None):
+    """
+    Return up to `limit` course ids matching `text`, best match first,
+    or None when full-text search is unavailable.
+    """
+    backend = search_backend()
+    if backend is None:
+        return None
+    limit = limit or max_results()
+    with connection.cursor() as cursor:
+        if backend == "postgresql":
+            cursor.execute(
+                f"""
+                SELECT course_id
+                FROM {PG_TABLE}, websearch_to_tsquery('english', %s) query
+                WHERE document @@ query
+                ORDER BY ts_rank_cd(document, query) DESC, course_id DESC
+                LIMIT %s
+                """,
+                [text, limit],
+            )
+        else:
+            query = _fts5_query(text)
+            if query is None:
+                return []
+            weights = ", ".join(str(w) for w in SQLITE_BM25_WEIGHTS)
+            cursor.execute(
+                f"SELECT rowid FROM {SQLITE_TABLE} WHERE {SQLITE_TABLE} MATCH %s "
+                f"ORDER BY bm25({SQLITE_TABLE}, {weights}), rowid DESC LIMIT %s",
+                [query, limit],
+            )
+        return [row[0] for row in cursor.fetchall()]
+
+
+class CatalogSearchFilter(filters.SearchFilter):
+    """
+    Drop-in replacement for SearchFilter on the course catalog: ranked
+    full-text matches when an index exists, icontains otherwise.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        if not terms:
+            return queryset
+        ids = search_course_ids(" ".join(terms))
+        if ids is None:
+            return super().filter_queryset(request, queryset, view)
+        if not ids:
+            return queryset.none()
+        rank = Case(
+            *[When(pk=pk, then=position) for position, pk in enumerate(ids)],
+            output_field=IntegerField(),
+        )
+        return queryset.filter(pk__in=ids).annotate(search_rank=rank).order_by("search_rank")
@@ -1,23 +1,51 @@
 # courses/serializers.py
+from django.contrib.auth import get_user_model
 from rest_framework import serializers
-from .models import Category, Course, Lesson, FollowUpQuestion, FollowUpOption, Quiz, QuizQuestion, QuizOption, ExamProject, Order
+
+from edenites_be.sparse import SparseFieldsMixin
+from .models import Category, Course, Lesson, FollowUpQuestion, FollowUpOption, Quiz, QuizQuestion, QuizOption, ExamProject, Order, ChunkedUpload
+from .uploads import max_upload_size
+from .media import signed_media_url
 
 # CategorySerializer
 
 class CategorySerializer(serializers.ModelSerializer):
+    # Filled from the aggregates in courses/category_stats.py
+    course_count = serializers.IntegerField(read_only=True, default=0)
+    free_count   = serializers.IntegerField(read_only=True, default=0)
+    paid_count   = serializers.IntegerField(read_only=True, default=0)
+    min_price    = serializers.DecimalField(max_digits=8, decimal_places=2, read_only=True, default=None)
+    max_price    = serializers.DecimalField(max_digits=8, decimal_places=2, read_only=True, default=None)
+
     class Meta:
         model = Category
-        fields = ["id", "name"]
+        fields = ["id", "name", "course_count", "free_count", "paid_count", "min_price", "max_price"]
         read_only_fields = ["id"]
 
+class CategoryBriefSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Category
+        fields = ["id", "name"]
+
+
+class InstructorBriefSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = get_user_model()
+        fields = ["id", "username", "first_name", "last_name"]
+
 #
 # Course
 #
-class CourseSerializer(serializers.ModelSerializer):
+class CourseSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     category   = serializers.SlugRelatedField(slug_field="name", queryset=Category.objects.all())
     instructor = serializers.CharField(read_only=True, source="instructor.username")
     is_free    = serializers.BooleanField(default=False)
 
+    expandable_fields = {
+        "category":   (CategoryBriefSerializer, {}),
+        "instructor": (InstructorBriefSerializer, {}),
+    }
+
     class Meta:
         model = Course
         fields = ["id","title","description","category","instructor","price","is_free","created_at"]
@@ -41,15 +69,29 @@ class FollowUpQuestionSerializer(serializers.ModelSerializer):
         fields = ["id","question_text","solution_text","allow_multiple","options"]
         read_only_fields = ["id"]
 
-class LessonSerializer(serializers.ModelSerializer):
+class LessonSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     followup_questions = FollowUpQuestionSerializer(many=True, required=False)
     video              = serializers.FileField(required=False, allow_null=True)
 
+    prefetch_fields = {"followup_questions": ["followup_questions__options"]}
+    sparse_required = ["is_free"]   # read by to_representation()
+
     class Meta:
         model = Lesson
         fields = ["id","order","title","content","video","is_free","followup_questions","created_at"]
         read_only_fields = ["id","created_at"]
 
+    def to_representation(self, instance):
+        # Videos are only reachable through signed, expiring URLs. The view
+        # decides access once and passes it in as context["media_access"].
+        data = super().to_representation(instance)
+        if "video" in data:
+            if instance.is_free or self.context.get("media_access", False):
+                data["video"] = signed_media_url(instance.video, self.context.get("request"))
+            else:
+                data["video"] = None
+        return data
+
     def create(self, validated_data):
         questions = validated_data.pop("followup_questions", [])
         lesson = Lesson.objects.create(**validated_data)
@@ -159,6 +201,13 @@ class ExamProjectSerializer(serializers.ModelSerializer):
             "id", "student", "submitted_at", "score", "is_approved", "certificate_file"
         ]
 
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        request = self.context.get("request")
+        data["submission_file"] = signed_media_url(instance.submission_file, request)
+        data["certificate_file"] = signed_media_url(instance.certificate_file, request)
+        return data
+
 #
 # OrderSerializer
 #
@@ -175,3 +224,32 @@ class OrderSerializer(serializers.ModelSerializer):
         read_only_fields = [
             "id", "student", "status", "transaction_id", "created_at", "updated_at"
         ]
+
+
+#
+# ChunkedUploadSerializer
+#
+class ChunkedUploadSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ChunkedUpload
+        fields = [
+            "id", "kind", "lesson", "course", "filename",
+            "total_size", "offset", "checksum", "status", "created_at"
+        ]
+        read_only_fields = ["id", "offset", "checksum", "status", "created_at"]
+
+    def validate_total_size(self, value):
+        if value <= 0 or value > max_upload_size():
+            raise serializers.ValidationError(f"Uploads must be between 1 and {max_upload_size()} bytes.")
+        return value
+
+    def validate(self, data):
+        if data["kind"] == ChunkedUpload.LESSON_VIDEO:
+            if not data.get("lesson"):
+                raise serializers.ValidationError({"lesson": "Required for lesson video uploads."})
+            data["course"] = None
+        else:
+            if not data.get("course"):
+                raise serializers.ValidationError({"course": "Required for exam submission uploads."})
+            data["lesson"] = None
+        return data
@@ -0,0 +1,112 @@
+# courses/signals.py
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from edenites_be import cache
+from exams.models import ExamSubject
+from jamb.models import JAMBSubject
+from . import autocomplete, search, trending
+from .models import Category, Course, ExamProject, FollowUpOption, FollowUpQuestion, Lesson, Order
+
+
+#
+# ─── Catalog search index ─────────────────────────────────────────────────────────
+#
+@receiver(post_save, sender=Course)
+def index_saved_course(sender, instance, **kwargs):
+    course_id = instance.pk
+    transaction.on_commit(lambda: search.index_course(course_id))
+
+
+@receiver(post_delete, sender=Course)
+def unindex_deleted_course(sender, instance, **kwargs):
+    course_id = instance.pk
+    transaction.on_commit(lambda: search.remove_course(course_id))
+
+
+@receiver(post_save, sender=Lesson)
+@receiver(post_delete, sender=Lesson)
+def reindex_lesson_course(sender, instance, **kwargs):
+    course_id = instance.course_id
+    transaction.on_commit(lambda: search.index_course(course_id))
+
+
+@receiver(post_save, sender=Category)
+def reindex_category_courses(sender, instance, created, **kwargs):
+    if created:
+        return
+    course_ids = list(instance.courses.values_list("pk", flat=True))
+
+    def reindex():
+        for course_id in course_ids:
+            search.index_course(course_id)
+    transaction.on_commit(reindex)
+
+
+#
+# ─── View caches (category listing, catalog responses) ────────────────────────────
+#
+cache.connect_invalidation(Category, Course, Lesson, FollowUpQuestion, FollowUpOption)
+
+
+#
+# ─── Autocomplete prefix index ────────────────────────────────────────────────────
+#
+AUTOCOMPLETE_SOURCES = {
+    Course:      (autocomplete.COURSE,       autocomplete.course_suggestion),
+    Category:    (autocomplete.CATEGORY,     autocomplete.category_suggestion),
+    ExamSubject: (autocomplete.EXAM_SUBJECT, autocomplete.exam_subject_suggestion),
+    JAMBSubject: (autocomplete.JAMB_SUBJECT, autocomplete.jamb_subject_suggestion),
+}
+
+
+def autocomplete_saved(sender, instance, **kwargs):
+    kind, build = AUTOCOMPLETE_SOURCES[sender]
+    entry_key, suggestion = (kind, instance.pk), build(instance)
+    transaction.on_commit(lambda: autocomplete.upsert(entry_key, suggestion))
+
+
+def autocomplete_deleted(sender, instance, **kwargs):
+    entry_key = (AUTOCOMPLETE_SOURCES[sender][0], instance.pk)
+    transaction.on_commit(lambda: autocomplete.remove(entry_key))
+
+
+for model in AUTOCOMPLETE_SOURCES:
+    post_save.connect(autocomplete_saved, sender=model, dispatch_uid=f"autocomplete-save-{model.__name__}")
+    post_delete.connect(autocomplete_deleted, sender=model, dispatch_uid=f"autocomplete-delete-{model.__name__}")
+
+
+#
+# ─── Trending counters ────────────────────────────────────────────────────────────
+#
+@receiver(post_save, sender=Order)
+def count_trending_order(sender, instance, created, **kwargs):
+    if created:
+        course_id = instance.course_id
+        transaction.on_commit(lambda: trending.record_course(course_id, trending.ORDER))
+
+
+@receiver(post_save, sender=ExamProject)
+def count_trending_exam_attempt(sender, instance, created, **kwargs):
+    if created:
+        course_id = instance.course_id
+        transaction.on_commit(lambda: trending.record_course(course_id, trending.EXAM_ATTEMPT))
+
+
+#
+# ─── Lesson freshness ─────────────────────────────────────────────────────────────
+#
+# Follow-up questions are embedded in lesson payloads; bumping the lesson's
+# updated_at keeps its ETag and the sync feed honest when only they change.
+@receiver(post_save, sender=FollowUpQuestion)
+@receiver(post_delete, sender=FollowUpQuestion)
+def touch_lesson_of_question(sender, instance, **kwargs):
+    Lesson.objects.filter(pk=instance.lesson_id).update(updated_at=timezone.now())
+
+
+@receiver(post_save, sender=FollowUpOption)
+@receiver(post_delete, sender=FollowUpOption)
+def touch_lesson_of_option(sender, instance, **kwargs):
+    Lesson.objects.filter(followup_questions=instance.question_id).update(updated_at=timezone.now())
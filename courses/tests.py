@@ -1,3 +1,483 @@
-from django.test import TestCase
+# courses/tests.py
 
-# Create your tests here.
+import hashlib
+import io
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.db import DatabaseError
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.test import APITestCase
+
+from enrollments.models import Enrollment
+from .models import Category, Course, CourseAffinity, Lesson, ChunkedUpload, TrendingScore
+from .uploads import UploadConflict, chain_checksum, discard_upload, finalize_upload, part_path, write_chunk
+from .views import CourseViewSet
+
+User = get_user_model()
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, CHUNKED_UPLOAD_DIR=os.path.join(MEDIA_ROOT, "chunked_uploads"))
+class ChunkedUploadTests(APITestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.instructor = User.objects.create_user(
+            username="teach", email="teach@example.com", password="pass1234", is_instructor=True
+        )
+        category = Category.objects.create(name="Science")
+        self.course = Course.objects.create(
+            title="Physics", description="Motion", category=category, instructor=self.instructor
+        )
+        self.lesson = Lesson.objects.create(course=self.course, title="Intro", content="…", order=1)
+        self.client.force_authenticate(self.instructor)
+
+    def put_chunk(self, upload_id, data, start, total):
+        return self.client.generic(
+            "PUT",
+            f"/api/uploads/{upload_id}/",
+            data,
+            content_type="application/octet-stream",
+            HTTP_CONTENT_RANGE=f"bytes {start}-{start + len(data) - 1}/{total}",
+        )
+
+    def test_resumable_lesson_video_upload(self):
+        payload = os.urandom(3000)
+        resp = self.client.post("/api/uploads/", {
+            "kind": ChunkedUpload.LESSON_VIDEO,
+            "lesson": self.lesson.id,
+            "filename": "intro.mp4",
+            "total_size": len(payload),
+        }, format="json")
+        self.assertEqual(resp.status_code, status.HTTP_201_CREATED)
+        upload_id = resp.data["id"]
+
+        resp = self.put_chunk(upload_id, payload[:1000], 0, len(payload))
+        self.assertEqual(resp.data["offset"], 1000)
+
+        # A chunk at the wrong offset is rejected; the client resumes from GET.
+        resp = self.put_chunk(upload_id, payload[2000:], 2000, len(payload))
+        self.assertEqual(resp.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(self.client.get(f"/api/uploads/{upload_id}/").data["offset"], 1000)
+
+        self.put_chunk(upload_id, payload[1000:2000], 1000, len(payload))
+        self.put_chunk(upload_id, payload[2000:], 2000, len(payload))
+
+        expected = ""
+        for i in range(0, 3000, 1000):
+            expected = chain_checksum(expected, hashlib.sha256(payload[i:i + 1000]).hexdigest())
+        resp = self.client.post(f"/api/uploads/{upload_id}/finalize/", {"checksum": expected}, format="json")
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp.data["status"], ChunkedUpload.COMPLETED)
+
+        self.lesson.refresh_from_db()
+        with self.lesson.video.open("rb") as fh:
+            self.assertEqual(fh.read(), payload)
+
+    def test_racing_finalizes_and_deletes_fail_cleanly(self):
+        payload = os.urandom(100)
+        upload_id = self.client.post("/api/uploads/", {
+            "kind": ChunkedUpload.LESSON_VIDEO,
+            "lesson": self.lesson.id,
+            "filename": "intro.mp4",
+            "total_size": len(payload),
+        }, format="json").data["id"]
+        self.put_chunk(upload_id, payload, 0, len(payload))
+        # Both requests loaded the upload before either finalized it.
+        stale = ChunkedUpload.objects.get(pk=upload_id)
+        self.assertEqual(self.client.post(f"/api/uploads/{upload_id}/finalize/").status_code, status.HTTP_200_OK)
+        with self.assertRaises(ValidationError):
+            finalize_upload(stale)
+        self.assertFalse(discard_upload(stale))
+        self.assertEqual(self.client.post(f"/api/uploads/{upload_id}/finalize/").status_code,
+                         status.HTTP_400_BAD_REQUEST)
+        self.lesson.refresh_from_db()
+        with self.lesson.video.open("rb") as fh:
+            self.assertEqual(fh.read(), payload)
+
+    def test_losing_chunk_of_a_race_never_reaches_the_part_file(self):
+        payload, rival = os.urandom(100), os.urandom(100)
+        upload_id = self.client.post("/api/uploads/", {
+            "kind": ChunkedUpload.LESSON_VIDEO,
+            "lesson": self.lesson.id,
+            "filename": "intro.mp4",
+            "total_size": 200,
+        }, format="json").data["id"]
+        stale = ChunkedUpload.objects.get(pk=upload_id)  # both clients see offset 0
+        self.put_chunk(upload_id, payload, 0, 200)
+        with self.assertRaises(UploadConflict):
+            write_chunk(stale, io.BytesIO(rival), 0, 100)
+        upload = ChunkedUpload.objects.get(pk=upload_id)
+        self.assertEqual(upload.checksum, chain_checksum("", hashlib.sha256(payload).hexdigest()))
+        with open(part_path(upload), "rb") as fh:
+            self.assertEqual(fh.read(100), payload)
+        self.assertEqual([n for n in os.listdir(os.path.dirname(part_path(upload))) if n.endswith(".chunk")], [])
+
+    def test_failed_finalize_keeps_the_part_file(self):
+        payload = os.urandom(100)
+        upload_id = self.client.post("/api/uploads/", {
+            "kind": ChunkedUpload.LESSON_VIDEO,
+            "lesson": self.lesson.id,
+            "filename": "intro.mp4",
+            "total_size": len(payload),
+        }, format="json").data["id"]
+        self.put_chunk(upload_id, payload, 0, len(payload))
+        upload = ChunkedUpload.objects.get(pk=upload_id)
+        with mock.patch.object(Lesson, "save", side_effect=DatabaseError("boom")), self.assertRaises(DatabaseError):
+            finalize_upload(upload)
+        self.assertTrue(os.path.exists(part_path(upload)))
+        self.assertEqual(ChunkedUpload.objects.get(pk=upload_id).status, ChunkedUpload.UPLOADING)
+
+        self.assertEqual(self.client.post(f"/api/uploads/{upload_id}/finalize/").status_code, status.HTTP_200_OK)
+        self.lesson.refresh_from_db()
+        with self.lesson.video.open("rb") as fh:
+            self.assertEqual(fh.read(), payload)
+
+    def test_finalize_rejects_incomplete_upload(self):
+        resp = self.client.post("/api/uploads/", {
+            "kind": ChunkedUpload.LESSON_VIDEO,
+            "lesson": self.lesson.id,
+            "filename": "intro.mp4",
+            "total_size": 10,
+        }, format="json")
+        resp = self.client.post(f"/api/uploads/{resp.data['id']}/finalize/")
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class SignedMediaTests(APITestCase):
+    def setUp(self):
+        instructor = User.objects.create_user(
+            username="teach", email="teach@example.com", password="pass1234", is_instructor=True
+        )
+        self.student = User.objects.create_user(
+            username="learn", email="learn@example.com", password="pass1234"
+        )
+        category = Category.objects.create(name="Science")
+        self.course = Course.objects.create(
+            title="Physics", description="Motion", category=category,
+            instructor=instructor, price="100.00"
+        )
+        self.lesson = Lesson.objects.create(course=self.course, title="Intro", content="…", order=1)
+        self.lesson.video.save("intro.mp4", ContentFile(b"0123456789"))
+        self.url = f"/api/courses/{self.course.id}/lessons/{self.lesson.id}/"
+
+    def test_paid_lesson_requires_enrollment(self):
+        self.client.force_authenticate(self.student)
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_signed_url_streams_ranges_without_queries(self):
+        Enrollment.objects.create(student=self.student, course=self.course)
+        self.client.force_authenticate(self.student)
+        video_url = self.client.get(self.url).data["video"]
+        self.assertIn("sig=", video_url)
+
+        self.client.force_authenticate(None)
+        with self.assertNumQueries(0):
+            resp = self.client.get(video_url, HTTP_RANGE="bytes=2-5")
+        self.assertEqual(resp.status_code, 206)
+        self.assertEqual(b"".join(resp.streaming_content), b"2345")
+        self.assertEqual(resp["Content-Range"], "bytes 2-5/10")
+
+        resp = self.client.get(video_url.replace("sig=", "sig=0"))
+        self.assertEqual(resp.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class CatalogSearchTests(APITestCase):
+    def setUp(self):
+        instructor = User.objects.create_user(
+            username="teach", email="teach@example.com", password="pass1234", is_instructor=True
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            science = Category.objects.create(name="Science")
+            arts = Category.objects.create(name="Arts")
+            self.physics = Course.objects.create(
+                title="Physics", description="Motion and energy", category=science, instructor=instructor
+            )
+            self.painting = Course.objects.create(
+                title="Painting", description="Brushes; the physics of light is mentioned once",
+                category=arts, instructor=instructor
+            )
+            Lesson.objects.create(course=self.painting, title="Mixing watercolours", content="…", order=1)
+
+    def search(self, term):
+        resp = self.client.get("/api/courses/", {"search": term})
+        return [c["id"] for c in resp.data["results"]]
+
+    def test_ranked_by_relevance(self):
+        # Title matches outrank description matches.
+        self.assertEqual(self.search("physics"), [self.physics.id, self.painting.id])
+
+    def test_stems_and_indexes_lesson_and_category_names(self):
+        self.assertEqual(self.search("mixed watercolour"), [self.painting.id])
+        self.assertEqual(self.search("science"), [self.physics.id])
+
+
+class AutocompleteTests(APITestCase):
+    def setUp(self):
+        from exams.models import ExamSubject
+        from . import autocomplete
+
+        instructor = User.objects.create_user(
+            username="teach", email="teach@example.com", password="pass1234", is_instructor=True
+        )
+        category = Category.objects.create(name="Physical Sciences")
+        popular = Course.objects.create(
+            title="Intro to Physics", description="…", category=category, instructor=instructor
+        )
+        Course.objects.create(title="Physiology", description="…", category=category, instructor=instructor)
+        Enrollment.objects.create(student=instructor, course=popular)
+        ExamSubject.objects.create(name="Physics")
+        autocomplete.rebuild()
+        self.autocomplete = autocomplete
+
+    def test_suggestions_are_ranked_and_served_without_queries(self):
+        with self.assertNumQueries(0):
+            resp = self.client.get("/api/courses/autocomplete/", {"q": "phys"})
+        labels = [s["label"] for s in resp.data]
+        # The enrolled-in course outranks the one nobody has taken.
+        self.assertLess(labels.index("Intro to Physics"), labels.index("Physiology"))
+        self.assertCountEqual(labels, ["Intro to Physics", "Physiology", "Physical Sciences", "Physics"])
+
+    def test_index_is_patched_by_signals(self):
+        category = Category.objects.get()
+        with self.captureOnCommitCallbacks(execute=True):
+            category.name = "Natural Sciences"
+            category.save()
+        labels = [s["label"] for s in self.autocomplete.suggest("nat")]
+        self.assertEqual(labels, ["Natural Sciences"])
+        self.assertNotIn("Physical Sciences", [s["label"] for s in self.autocomplete.suggest("phys")])
+
+    def test_requests_never_build_the_index(self):
+        with mock.patch.object(self.autocomplete, "_index", self.autocomplete.PrefixIndex()), \
+                mock.patch.object(self.autocomplete, "start") as start, self.assertNumQueries(0):
+            self.assertEqual(self.autocomplete.suggest("phys"), [])
+            self.autocomplete.upsert((self.autocomplete.COURSE, 99), {"label": "Physics II"})
+            self.assertEqual(self.autocomplete.suggest("phys"), [])
+        start.assert_not_called()
+
+    def test_patches_made_during_a_rebuild_are_replayed(self):
+        index = self.autocomplete.PrefixIndex()
+
+        def rows_read_before_the_rename():
+            yield (self.autocomplete.CATEGORY, 1), {"label": "Physical Sciences"}, 5
+            index.upsert((self.autocomplete.CATEGORY, 1), {"label": "Natural Sciences"})
+            index.remove((self.autocomplete.COURSE, 2))
+            yield (self.autocomplete.COURSE, 2), {"label": "Physiology"}, 1
+
+        index.load(rows_read_before_the_rename())
+        self.assertEqual(index.search("sci"), [{"label": "Natural Sciences"}])
+        self.assertEqual(index.search("phys"), [])
+        self.assertIsNone(index.pending)
+
+    def test_scan_stops_at_limit(self):
+        index = self.autocomplete.PrefixIndex()
+        index.load(((self.autocomplete.COURSE, i), {"label": f"Course {i:03}"}, i) for i in range(500))
+        results = index.search("course", limit=3)
+        # Only the first three keys from the prefix were looked at, then ranked.
+        self.assertEqual([r["label"] for r in results], ["Course 002", "Course 001", "Course 000"])
+
+
+class RelatedCoursesTests(APITestCase):
+    def setUp(self):
+        from . import recommendations
+
+        instructor = User.objects.create_user(
+            username="teach", email="teach@example.com", password="pass1234", is_instructor=True
+        )
+        category = Category.objects.create(name="Science")
+        self.physics, self.maths, self.biology = [
+            Course.objects.create(title=t, description="…", category=category, instructor=instructor)
+            for t in ("Physics", "Maths", "Biology")
+        ]
+        self.students = [
+            User.objects.create_user(username=f"s{i}", email=f"s{i}@example.com", password="pass1234")
+            for i in range(3)
+        ]
+        # All three physics students take maths; one of them takes biology.
+        for student in self.students:
+            Enrollment.objects.create(student=student, course=self.physics)
+            Enrollment.objects.create(student=student, course=self.maths)
+        Enrollment.objects.create(student=self.students[0], course=self.biology)
+        recommendations.rebuild()
+
+    def related(self, course):
+        with self.assertNumQueries(1):
+            resp = self.client.get(f"/api/courses/{course.id}/related/")
+        return [(c["title"], c["score"]) for c in resp.data]
+
+    def test_ranked_by_cosine_similarity(self):
+        self.assertEqual(self.related(self.physics), [("Maths", 1.0), ("Biology", 0.5774)])
+        self.assertEqual(CourseAffinity.objects.count(), 6)
+
+    def test_new_enrollment_updates_pairs_incrementally(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Enrollment.objects.create(student=self.students[1], course=self.biology)
+        self.assertEqual(self.related(self.biology), [("Physics", 0.8165), ("Maths", 0.8165)])
+
+    @override_settings(RELATED_COURSES_TOP_K=1)
+    def test_incremental_updates_keep_top_k_and_follow_unenrollment(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Enrollment.objects.create(student=self.students[1], course=self.biology)
+        self.assertEqual(self.related(self.physics), [("Maths", 1.0)])
+        self.assertEqual(CourseAffinity.objects.filter(course=self.biology).count(), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Enrollment.objects.filter(student=self.students[0], course=self.biology).delete()
+            Enrollment.objects.filter(student=self.students[1], course=self.biology).delete()
+        self.assertEqual(self.related(self.biology), [])
+
+
+class TrendingTests(APITestCase):
+    def setUp(self):
+        from . import trending
+
+        trending._buffer.clear()
+        self.addCleanup(trending._buffer.clear)
+        self.trending = trending
+        instructor = User.objects.create_user(
+            username="teach", email="teach@example.com", password="pass1234", is_instructor=True
+        )
+        category = Category.objects.create(name="Science")
+        self.old, self.hot, self.quiet = [
+            Course.objects.create(title=t, description="…", category=category, instructor=instructor)
+            for t in ("Old favourite", "Hot new course", "No activity")
+        ]
+
+    def test_ordering_by_buffered_decayed_scores(self):
+        student = User.objects.create_user(username="learn", email="learn@example.com", password="pass1234")
+        with self.captureOnCommitCallbacks(execute=True):
+            Enrollment.objects.create(student=student, course=self.hot)
+        for _ in range(3):
+            self.trending.record_course(self.old.id, self.trending.LESSON_VIEW)
+        # Nothing is written until the buffer is flushed.
+        self.assertFalse(TrendingScore.objects.exists())
+        self.assertEqual(self.trending.flush(), 2)
+
+        resp = self.client.get("/api/courses/", {"ordering": "trending"})
+        self.assertEqual([c["id"] for c in resp.data["results"]], [self.hot.id, self.old.id])
+        # A join on the score row, not a subquery per course.
+        sql = str(self.trending.trending_courses(Course.objects.all()).query)
+        self.assertIn("INNER JOIN", sql)
+        self.assertNotIn("SELECT U0", sql)
+
+        later = timezone.now() + timedelta(hours=self.trending.half_life_hours())
+        self.trending.decay(now=later)
+        self.assertAlmostEqual(TrendingScore.objects.get(key=str(self.hot.id)).score, 2.5, places=3)
+
+    def test_quiet_worker_is_flushed_by_the_timer(self):
+        with override_settings(TRENDING_FLUSH_SECONDS=3600):
+            self.trending.record_course(self.old.id, self.trending.LESSON_VIEW)
+        self.assertTrue(self.trending._flusher.is_alive())
+        wake = mock.Mock(wait=mock.Mock(side_effect=[False, SystemExit]))
+        with mock.patch.object(self.trending, "_wake", wake), \
+                mock.patch.object(self.trending, "flush") as flush, \
+                mock.patch.object(self.trending.connection, "close"):
+            with self.assertRaises(SystemExit):
+                self.trending._flush_periodically()
+        flush.assert_called_once_with()
+
+    def test_requests_never_flush_and_failed_flushes_keep_their_counts(self):
+        with override_settings(TRENDING_FLUSH_SIZE=2), \
+                mock.patch.object(self.trending, "flush") as flush, \
+                mock.patch.object(self.trending, "_wake") as wake:
+            self.trending.record_course(self.old.id, 1.0)
+            self.trending.record_course(self.hot.id, 1.0)
+        flush.assert_not_called()
+        wake.set.assert_called_once_with()
+
+        real_add = self.trending._add
+        calls = []
+
+        def add_then_fail(*args):
+            calls.append(args)
+            if len(calls) == 2:
+                raise DatabaseError("boom")
+            real_add(*args)
+
+        with mock.patch.object(self.trending, "_add", side_effect=add_then_fail):
+            with self.assertRaises(DatabaseError):
+                self.trending.flush()
+        self.assertEqual(TrendingScore.objects.count(), 1)
+        self.assertEqual(len(self.trending._buffer), 1)
+        self.assertEqual(self.trending.flush(), 1)
+        self.assertEqual(TrendingScore.objects.count(), 2)
+
+    def test_popular_papers(self):
+        for _ in range(2):
+            self.trending.record_paper("WAEC", 2023, "physics")
+        self.trending.record_paper("JAMB", 2024, "english-language")
+        self.trending.flush()
+        resp = self.client.get("/api/exams/past-questions/popular/")
+        self.assertEqual(
+            [(p["exam_type"], p["year"], p["subject_slug"]) for p in resp.data],
+            [("WAEC", 2023, "physics"), ("JAMB", 2024, "english-language")],
+        )
+
+
+class CategoryListingTests(APITestCase):
+    def setUp(self):
+        self.instructor = User.objects.create_user(
+            username="teach", email="teach@example.com", password="pass1234", is_instructor=True
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            self.science = Category.objects.create(name="Science")
+            Category.objects.create(name="Arts")
+            for title, price, free in (("Physics", "50.00", False), ("Maths", "80.00", False), ("Intro", "0", True)):
+                Course.objects.create(
+                    title=title, description="…", category=self.science,
+                    instructor=self.instructor, price=price, is_free=free,
+                )
+
+    def test_counts_and_prices_served_from_cache(self):
+        self.client.get("/api/categories/")
+        with self.assertNumQueries(0):
+            resp = self.client.get("/api/categories/")
+        arts, science = resp.data["results"]
+        self.assertEqual(arts["course_count"], 0)
+        self.assertEqual(
+            (science["course_count"], science["free_count"], science["paid_count"]), (3, 1, 2)
+        )
+        self.assertEqual((science["min_price"], science["max_price"]), ("50.00", "80.00"))
+
+    def test_course_changes_invalidate_listing(self):
+        self.client.get("/api/categories/")
+        with self.captureOnCommitCallbacks(execute=True):
+            Course.objects.filter(title="Intro").get().delete()
+        science = self.client.get("/api/categories/").data["results"][1]
+        self.assertEqual((science["course_count"], science["free_count"]), (2, 0))
+
+
+class CourseFastListTests(APITestCase):
+    def setUp(self):
+        instructor = User.objects.create_user(
+            username="teach", email="teach@example.com", password="pass1234",
+            first_name="Tola", is_instructor=True,
+        )
+        category = Category.objects.create(name="Science")
+        for title, price in (("Physics", "1250.5"), ("Chemistry", "0")):
+            Course.objects.create(
+                title=title, description="…", category=category, instructor=instructor, price=price,
+            )
+
+    def test_values_fast_path_matches_serializer(self):
+        for params in ({}, {"expand": "category,instructor"}, {"fields": "title,price"},
+                       {"ordering": "trending"}, {"cursor": "", "page_size": 1}):
+            fast = self.client.get("/api/courses/", params)
+            with mock.patch.object(CourseViewSet, "fast_list", False):
+                slow = self.client.get("/api/courses/", params)
+            self.assertEqual(fast.content, slow.content, params)
+        self.assertEqual(fast.data["results"][0]["price"], "0.00")
@@ -0,0 +1,211 @@
+# courses/trending.py
+"""
+Time-decayed "trending" scores for courses and exam papers.
+
+Events (enrollments, orders, lesson views, exam attempts) are added to an
+in-process buffer and written to TrendingScore in one batch of
+`score = score + n` UPDATEs, so a busy lesson costs one write per flush
+rather than one per view. Only a daemon thread writes: it flushes the
+buffer every TRENDING_FLUSH_SECONDS, however quiet the worker, and is
+woken early once TRENDING_FLUSH_SIZE keys are waiting; requests never do.
+Counts a failed flush didn't write go back into the buffer for the next
+one. A worker that is killed outright loses at most one interval of
+counts.
+
+`decay()` — run periodically by `manage.py decay_trending` — multiplies
+every score by 0.5 ** (elapsed / TRENDING_HALF_LIFE_HOURS) and drops the
+ones that have faded away.
+
+`?ordering=trending` lists the courses that have a score, hottest first:
+an inner join from the course to its TrendingScore ordered by the score,
+which the (kind, -score) index serves together with the page LIMIT.
+Courses without recent activity are left out.
+"""
+import atexit
+import logging
+import threading
+from collections import Counter
+
+from django.conf import settings
+from django.db import DatabaseError, IntegrityError, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+from rest_framework import filters
+
+from .models import TrendingScore
+
+logger = logging.getLogger(__name__)
+
+# Relative weight of each kind of event.
+ENROLLMENT   = 5.0
+ORDER        = 3.0
+EXAM_ATTEMPT = 2.0
+LESSON_VIEW  = 1.0
+
+_buffer = Counter()
+_lock = threading.Lock()
+_flusher = None
+_wake = threading.Event()
+
+
+def half_life_hours():
+    return getattr(settings, "TRENDING_HALF_LIFE_HOURS", 72)
+
+
+def flush_seconds():
+    return getattr(settings, "TRENDING_FLUSH_SECONDS", 30)
+
+
+def flush_size():
+    return getattr(settings, "TRENDING_FLUSH_SIZE", 500)
+
+
+def _flush_periodically():
+    while True:
+        _wake.wait(flush_seconds())
+        _wake.clear()
+        if not _buffer:
+            continue
+        try:
+            flush()
+        except Exception:
+            logger.exception("Periodic trending flush failed")
+        finally:
+            connection.close()  # this thread's connection
+
+
+def _start_flusher():
+    # Called with _lock held. Also restarts it in a forked worker, where
+    # the parent's thread doesn't exist.
+    global _flusher
+    if _flusher is None or not _flusher.is_alive():
+        _flusher = threading.Thread(target=_flush_periodically, name="trending-flush", daemon=True)
+        _flusher.start()
+
+
+def paper_key(exam_type, year, subject_slug):
+    return f"{exam_type}:{year}:{subject_slug}"
+
+
+def record(kind, key, weight):
+    """
+    Buffer one event; a full buffer wakes the flusher thread.
+    """
+    with _lock:
+        _start_flusher()
+        _buffer[(kind, str(key))] += weight
+        full = len(_buffer) >= flush_size()
+    if full:
+        _wake.set()
+
+
+def record_course(course_id, weight):
+    record(TrendingScore.COURSE, course_id, weight)
+
+
+def record_paper(exam_type, year, subject_slug, weight=EXAM_ATTEMPT):
+    record(TrendingScore.PAPER, paper_key(exam_type, year, subject_slug), weight)
+
+
+def flush():
+    """
+    Write the buffered increments. Returns the number of keys written.
+    On an error the keys not yet written are put back in the buffer.
+    """
+    global _buffer
+    with _lock:
+        pending, _buffer = list(_buffer.items()), Counter()
+    for n, ((kind, key), weight) in enumerate(pending):
+        try:
+            _add(kind, key, weight)
+        except Exception:
+            with _lock:
+                _buffer.update(dict(pending[n:]))
+            raise
+    return len(pending)
+
+
+def _add(kind, key, weight):
+    rows = TrendingScore.objects.filter(kind=kind, key=key)
+    if rows.update(score=F("score") + weight):
+        return
+    try:
+        with transaction.atomic():
+            TrendingScore.objects.create(
+                kind=kind, key=key, score=weight, decayed_at=timezone.now(),
+                course_id=int(key) if kind == TrendingScore.COURSE else None,
+            )
+    except IntegrityError:
+        # Another worker created the row in the meantime.
+        rows.update(score=F("score") + weight)
+
+
+@atexit.register
+def _flush_at_exit():
+    # Best effort: the database may already be gone at interpreter exit.
+    try:
+        flush()
+    except DatabaseError:
+        logger.warning("Dropped buffered trending counters at exit", exc_info=True)
+
+
+def decay(now=None, min_score=None):
+    """
+    Apply exponential decay up to `now` and delete negligible scores.
+    Rows are grouped by their last decay time, so each UPDATE is one
+    `score = score * factor` and concurrent increments are never lost.
+    """
+    now = now or timezone.now()
+    min_score = getattr(settings, "TRENDING_MIN_SCORE", 0.01) if min_score is None else min_score
+    half_life = half_life_hours() * 3600
+    stamps = TrendingScore.objects.filter(decayed_at__lt=now).values_list("decayed_at", flat=True).distinct()
+    for stamp in list(stamps):
+        factor = 0.5 ** ((now - stamp).total_seconds() / half_life)
+        TrendingScore.objects.filter(decayed_at=stamp).update(score=F("score") * factor, decayed_at=now)
+    deleted, _ = TrendingScore.objects.filter(score__lt=min_score).delete()
+    return deleted
+
+
+def trending_courses(queryset):
+    """
+    The courses of `queryset` that have a score, hottest first, with the
+    score as `trending_score`.
+    """
+    return (
+        queryset.filter(trending__isnull=False)
+        .annotate(trending_score=F("trending__score"))
+        .order_by("-trending_score", "-id")
+    )
+
+
+def popular_papers(limit=10):
+    """
+    Most active exam papers as dicts of exam_type, year, subject_slug, score.
+    """
+    rows = (
+        TrendingScore.objects.filter(kind=TrendingScore.PAPER)
+        .order_by("-score", "key")
+        .values_list("key", "score")[:limit]
+    )
+    papers = []
+    for key, score in rows:
+        exam_type, year, subject_slug = key.split(":", 2)
+        papers.append({
+            "exam_type": exam_type,
+            "year": int(year),
+            "subject_slug": subject_slug,
+            "score": round(score, 4),
+        })
+    return papers
+
+
+class TrendingOrderingFilter(filters.OrderingFilter):
+    """
+    OrderingFilter that also understands `?ordering=trending`.
+    """
+    trending_param = "trending"
+
+    def filter_queryset(self, request, queryset, view):
+        if request.query_params.get(self.ordering_param) == self.trending_param:
+            return trending_courses(queryset)
+        return super().filter_queryset(request, queryset, view)
@@ -0,0 +1,247 @@
+# courses/uploads.py
+"""
+Resumable chunked uploads for lesson videos and exam submissions.
+
+Protocol:
+  1. POST /api/uploads/                  → create a session, returns its id
+  2. PUT  /api/uploads/{id}/             → raw bytes + "Content-Range: bytes start-end/total"
+  3. GET  /api/uploads/{id}/             → current offset, to resume after a failure
+  4. POST /api/uploads/{id}/finalize/    → move the file into place and attach it
+
+Every chunk is streamed from the socket into its own temporary file, so
+no request ever holds more than one read buffer in memory, and a dropped
+connection only costs the chunk that was in flight. Only a chunk that
+wins the offset check on the locked upload row is copied into the part
+file, so of two clients racing on the same offset the loser's bytes never
+land there.
+"""
+import hashlib
+import os
+import re
+import shutil
+import uuid
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from django.utils.text import get_valid_filename
+from rest_framework import status
+from rest_framework.exceptions import APIException, NotFound, ValidationError
+
+from .models import ChunkedUpload, ExamProject, Lesson
+
+READ_BUFFER_SIZE = 64 * 1024
+
+CONTENT_RANGE_RE = re.compile(r"^bytes (\d+)-(\d+)/(\d+)$")
+
+
+class UploadConflict(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "Chunk does not start at the current upload offset."
+    default_code = "upload_conflict"
+
+
+def upload_dir():
+    return str(getattr(settings, "CHUNKED_UPLOAD_DIR", os.path.join(settings.MEDIA_ROOT, "chunked_uploads")))
+
+
+def max_upload_size():
+    return getattr(settings, "CHUNKED_UPLOAD_MAX_SIZE", 4 * 1024 ** 3)
+
+
+def max_chunk_size():
+    return getattr(settings, "CHUNKED_UPLOAD_MAX_CHUNK", 8 * 1024 ** 2)
+
+
+def part_path(upload):
+    return os.path.join(upload_dir(), f"{upload.pk}.part")
+
+
+def chain_checksum(previous, chunk_digest):
+    """
+    Advance the running checksum with the SHA-256 hex digest of one chunk.
+    Clients compute the same chain to verify the finished file.
+    """
+    return hashlib.sha256((previous + chunk_digest).encode()).hexdigest()
+
+
+def start_upload(upload):
+    """
+    Create the empty part file for a freshly saved ChunkedUpload.
+    """
+    os.makedirs(upload_dir(), exist_ok=True)
+    with open(part_path(upload), "wb"):
+        pass
+
+
+def parse_content_range(header, upload):
+    """
+    Returns (start, length) for a "bytes start-end/total" header.
+    """
+    match = CONTENT_RANGE_RE.match(header or "")
+    if not match:
+        raise ValidationError({"detail": "A 'Content-Range: bytes start-end/total' header is required."})
+    start, end, total = (int(g) for g in match.groups())
+    if total != upload.total_size or end < start or end >= total:
+        raise ValidationError({"detail": "Content-Range does not match this upload."})
+    length = end - start + 1
+    if length > max_chunk_size():
+        raise ValidationError({"detail": f"Chunks may not exceed {max_chunk_size()} bytes."})
+    return start, length
+
+
+def write_chunk(upload, stream, start, length, expected_digest=None):
+    """
+    Stream `length` bytes from `stream` into a temporary chunk file,
+    hashing as we go; then, on the locked row, check the offset, append
+    the chunk to the part file at `start` and advance the offset.
+    """
+    if upload.status != ChunkedUpload.UPLOADING:
+        raise ValidationError({"detail": "Upload is already finalized."})
+    if start != upload.offset:
+        raise UploadConflict(detail=f"Expected chunk at offset {upload.offset}.")
+
+    chunk_path = f"{part_path(upload)}.{uuid.uuid4().hex}.chunk"
+    try:
+        digest = hashlib.sha256()
+        remaining = length
+        with open(chunk_path, "wb") as fh:
+            while remaining:
+                buf = stream.read(min(READ_BUFFER_SIZE, remaining)) if stream else b""
+                if not buf:
+                    break
+                fh.write(buf)
+                digest.update(buf)
+                remaining -= len(buf)
+        if remaining:
+            raise ValidationError({"detail": "Request body is shorter than the declared Content-Range."})
+
+        chunk_digest = digest.hexdigest()
+        if expected_digest and expected_digest.lower() != chunk_digest:
+            raise ValidationError({"detail": "Chunk checksum mismatch."})
+
+        with transaction.atomic():
+            locked = _lock(upload)
+            if locked.status != ChunkedUpload.UPLOADING:
+                raise ValidationError({"detail": "Upload is already finalized."})
+            if locked.offset != start:
+                upload.offset = locked.offset
+                raise UploadConflict(detail=f"Expected chunk at offset {locked.offset}.")
+            with open(chunk_path, "rb") as src, open(part_path(locked), "r+b") as dst:
+                dst.seek(start)
+                shutil.copyfileobj(src, dst, READ_BUFFER_SIZE)
+            locked.offset = start + length
+            locked.checksum = chain_checksum(locked.checksum, chunk_digest)
+            locked.save(update_fields=["offset", "checksum", "updated_at"])
+    finally:
+        try:
+            os.remove(chunk_path)
+        except FileNotFoundError:
+            pass
+
+    upload.offset = locked.offset
+    upload.checksum = locked.checksum
+    return upload
+
+
+def _move_into_storage(upload, instance, field):
+    """
+    Hand the finished part file to the field's storage without re-reading
+    it when the storage is on the local filesystem (a rename), falling back
+    to a regular storage save for remote backends. Returns (name, undo):
+    undo() puts things back as they were, so a failed finalize leaves the
+    part file to finalize again and no orphan in storage.
+    """
+    storage = field.storage
+    name = field.generate_filename(instance, get_valid_filename(upload.filename))
+    name = storage.get_available_name(name)
+    source = part_path(upload)
+    try:
+        destination = storage.path(name)
+    except NotImplementedError:
+        with open(source, "rb") as fh:
+            name = storage.save(name, File(fh))
+        # the part file goes once the attachment is committed
+        transaction.on_commit(lambda: os.remove(source))
+        return name, lambda: storage.delete(name)
+    os.makedirs(os.path.dirname(destination), exist_ok=True)
+    shutil.move(source, destination)
+    return name, lambda: shutil.move(destination, source)
+
+
+def _lock(upload):
+    """
+    Re-read `upload` with its row locked, for the rest of the transaction.
+    """
+    try:
+        return ChunkedUpload.objects.select_for_update().get(pk=upload.pk)
+    except ChunkedUpload.DoesNotExist:
+        raise NotFound("Upload no longer exists.")
+
+
+def finalize_upload(upload, expected_checksum=None):
+    """
+    Verify the upload is complete, move it into MEDIA_ROOT and attach it
+    to the Lesson or ExamProject it was started for. The checks run on the
+    locked row, so of two racing finalizes (or a finalize and a delete)
+    only the first finds the part file; the other gets a clean 400/404.
+    Returns the finalized upload.
+    """
+    undo = None
+    try:
+        with transaction.atomic():
+            upload = _lock(upload)
+            if upload.status != ChunkedUpload.UPLOADING:
+                raise ValidationError({"detail": "Upload is already finalized."})
+            if upload.offset != upload.total_size:
+                raise ValidationError(
+                    {"detail": f"Upload incomplete: {upload.offset} of {upload.total_size} bytes received."}
+                )
+            if expected_checksum and expected_checksum.lower() != upload.checksum:
+                raise ValidationError({"detail": "Upload checksum mismatch."})
+
+            with open(part_path(upload), "r+b") as fh:
+                fh.truncate(upload.total_size)
+
+            if upload.kind == ChunkedUpload.LESSON_VIDEO:
+                lesson = upload.lesson
+                lesson.video.name, undo = _move_into_storage(upload, lesson, Lesson._meta.get_field("video"))
+                lesson.save(update_fields=["video"])
+            else:
+                project = ExamProject.objects.filter(course=upload.course, student=upload.user).first()
+                if project and project.is_approved:
+                    raise ValidationError({"detail": "Exam project has already been approved."})
+                name, undo = _move_into_storage(
+                    upload, project, ExamProject._meta.get_field("submission_file")
+                )
+                if project:
+                    project.submission_file.name = name
+                    project.save(update_fields=["submission_file"])
+                else:
+                    ExamProject.objects.create(course=upload.course, student=upload.user, submission_file=name)
+
+            upload.status = ChunkedUpload.COMPLETED
+            upload.save(update_fields=["status", "updated_at"])
+    except Exception:
+        # Rolled back: the file must not stay attached to nothing.
+        if undo is not None:
+            undo()
+        raise
+    return upload
+
+
+def discard_upload(upload):
+    """
+    Remove an unfinished upload and its part file; False if it has been
+    finalized meanwhile.
+    """
+    with transaction.atomic():
+        upload = _lock(upload)
+        if upload.status != ChunkedUpload.UPLOADING:
+            return False
+        upload.delete()
+        try:
+            os.remove(part_path(upload))
+        except FileNotFoundError:
+            pass
+    return True
@@ -1,19 +1,37 @@
 # courses/views.py
 
 from django.shortcuts import get_object_or_404
-from rest_framework import viewsets, permissions, filters, status
+from rest_framework import viewsets, mixins, permissions, filters, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, PermissionDenied
 from rest_framework.response import Response
 from rest_framework import status
 
-from .models import Category, Course, Lesson, Quiz, Order
+from .models import Category, Course, Lesson, Quiz, Order, ChunkedUpload
 from .serializers import (
     CategorySerializer,
     CourseSerializer,
     LessonSerializer,
     QuizSerializer,
+    ChunkedUploadSerializer,
 )
+from . import autocomplete, category_stats, recommendations, trending
+from .media import media_expiry
+from .search import CatalogSearchFilter
+from .uploads import (
+    start_upload,
+    parse_content_range,
+    write_chunk,
+    finalize_upload,
+    discard_upload,
+)
+from edenites_be import cache
+from edenites_be.conditional import ConditionalGetMixin
+from edenites_be.fastpath import FastListMixin
+from edenites_be.pagination import EstimatedCountPageNumberPagination
+from edenites_be.sparse import SparseQuerysetMixin, sparse_queryset
 from enrollments.models import Enrollment
+from enrollments.entitlements import has_course_access
 from payment.paystack import initialize_transaction, verify_transaction
 
 
@@ -28,7 +46,7 @@ class IsInstructor(permissions.BasePermission):
             and getattr(request.user, "is_instructor", False)
         )
 
-class CategoryViewSet(viewsets.ModelViewSet):
+class CategoryViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """
     CRUD for Course Categories.
     GET/HEAD/OPTIONS: public
@@ -39,22 +57,52 @@ class CategoryViewSet(viewsets.ModelViewSet):
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
     filter_backends = [filters.SearchFilter]
     search_fields = ["name"]
+    # Small table served from a cached list: page numbers only.
+    pagination_class = EstimatedCountPageNumberPagination
+    conditional_models = ("courses.category", "courses.course")
+    cache_namespace = cache.CATEGORIES
+
+    def get_queryset(self):
+        return category_stats.annotate_stats(super().get_queryset())
+
+    def list(self, request, *args, **kwargs):
+        # Searches hit the database; the plain listing is one cache read.
+        if request.query_params.get(filters.SearchFilter.search_param):
+            return super().list(request, *args, **kwargs)
+        version, listing = category_stats.category_listing()
+
+        def build():
+            page = self.paginate_queryset(listing)
+            if page is not None:
+                return self.get_paginated_response(page)
+            return Response(listing)
+        return self.conditional_response(request, build, version=version)
 
 
-class CourseViewSet(viewsets.ModelViewSet):
+class CourseViewSet(ConditionalGetMixin, FastListMixin, SparseQuerysetMixin, viewsets.ModelViewSet):
     """
     CRUD for Courses + unified lessons/quizzes actions + purchase/verify.
     """
-    queryset = Course.objects.all().order_by("-created_at")
+    queryset = Course.objects.all().order_by("-created_at", "-id")
     serializer_class = CourseSerializer
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [CatalogSearchFilter, trending.TrendingOrderingFilter]
     filterset_fields = ["category__name", "instructor__username"]
     search_fields    = ["title", "description"]
-    ordering_fields  = ["title", "created_at"]
+    ordering_fields  = ["title", "created_at"]   # plus ?ordering=trending
+    conditional_models = ("courses.course", "courses.category")
+    cache_namespace = cache.COURSES
+    throttle_scope = None  # set per action below
+
+    def response_cache_key(self, request, extra=()):
+        # Trending scores move without model signals; rank those live.
+        ordering = trending.TrendingOrderingFilter.ordering_param
+        if request.query_params.get(ordering) == trending.TrendingOrderingFilter.trending_param:
+            return None
+        return super().response_cache_key(request, extra)
 
     def get_permissions(self):
-        # Public: list & retrieve courses
-        if self.action in ["list", "retrieve"]:
+        # Public: list & retrieve courses, search-box suggestions
+        if self.action in ["list", "retrieve", "autocomplete", "related"]:
             return [permissions.AllowAny()]
 
         # Public GET lessons/quizzes
@@ -79,6 +127,39 @@ class CourseViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         serializer.save(instructor=self.request.user)
 
+    @action(detail=False, methods=["get"], url_path="autocomplete")
+    def autocomplete(self, request):
+        """
+        GET /api/courses/autocomplete/?q=phy&limit=10
+        Served from the in-memory prefix index; no database access.
+        """
+        try:
+            limit = min(max(int(request.query_params.get("limit", 10)), 1), 25)
+        except ValueError:
+            limit = 10
+        return Response(autocomplete.suggest(request.query_params.get("q", ""), limit))
+
+    @action(detail=True, methods=["get"], url_path="related")
+    def related(self, request, pk=None):
+        """
+        GET /api/courses/{id}/related/?limit=10
+        "Students who took this also took…", read from the precomputed
+        CourseAffinity table.
+        """
+        try:
+            limit = max(int(request.query_params.get("limit", 10)), 1)
+        except ValueError:
+            limit = 10
+        if not pk.isdigit():
+            raise NotFound()
+        related = recommendations.related_courses(int(pk), limit)
+        data = CourseSerializer(
+            [course for course, _ in related], many=True, context={"request": request}
+        ).data
+        for item, (_, score) in zip(data, related):
+            item["score"] = round(score, 4)
+        return Response(data)
+
     #
     # ─── Unified Lessons endpoint ─────────────────────────────────────────
     #
@@ -101,20 +182,40 @@ class CourseViewSet(viewsets.ModelViewSet):
 
         # LIST all lessons
         if request.method == "GET" and lesson_id is None:
-            qs = course.lessons.order_by("order")
-            if not course.is_free and not request.user.is_authenticated:
-                qs = qs.filter(is_free=True)
-            return Response(LessonSerializer(qs, many=True, context={"request": request}).data)
+            access = has_course_access(request.user, course)
+
+            def build():
+                qs = course.lessons.order_by("order")
+                if not course.is_free and not request.user.is_authenticated:
+                    qs = qs.filter(is_free=True)
+                context = {"request": request, "media_access": access}
+                serializer = LessonSerializer(context=context)
+                return Response(LessonSerializer(sparse_queryset(qs, serializer), many=True, context=context).data)
+            # Signed video links change every media TTL window; the outline
+            # is shared by everyone with the same access to this course.
+            expiry = media_expiry()
+            outline = ("outline", request.build_absolute_uri(), access, request.user.is_authenticated, expiry)
+            return self.conditional_response(
+                request, build, models=("courses.lesson",), private=True, extra=(access, expiry),
+                cache_key=outline,
+            )
 
         # RETRIEVE single lesson
         if request.method == "GET" and lesson_id is not None:
-            lesson = get_object_or_404(Lesson, course=course, pk=lesson_id)
-            # enforce enrollment on paid content
-            if not course.is_free and not Enrollment.objects.filter(
-                student=request.user, course=course
-            ).exists():
+            # enforce enrollment on paid content; video links are signed here
+            # so the player's range requests never need another check
+            if not has_course_access(request.user, course):
                 return Response({"detail":"Enroll to view."}, status=status.HTTP_403_FORBIDDEN)
-            return Response(LessonSerializer(lesson, context={"request": request}).data)
+            trending.record_course(course.id, trending.LESSON_VIEW)
+
+            def build():
+                context = {"request": request, "media_access": True}
+                qs = sparse_queryset(course.lessons.all(), LessonSerializer(context=context))
+                lesson = get_object_or_404(qs, pk=lesson_id)
+                return Response(LessonSerializer(lesson, context=context).data)
+            return self.conditional_response(
+                request, build, models=("courses.lesson",), private=True, extra=(media_expiry(),)
+            )
 
         # CREATE new lesson (instructor only)
         if request.method == "POST":
@@ -156,8 +257,10 @@ class CourseViewSet(viewsets.ModelViewSet):
         """
         course = self.get_object()
 
-        # LIST
+        # LIST (paid courses: enrolled students only)
         if request.method == "GET":
+            if not has_course_access(request.user, course):
+                return Response({"detail":"Enroll to view."}, status=status.HTTP_403_FORBIDDEN)
             qs = course.quizzes.order_by("title")
             serializer = QuizSerializer(qs, many=True, context={"request": request})
             return Response(serializer.data)
@@ -200,7 +303,7 @@ class CourseViewSet(viewsets.ModelViewSet):
     #
     # ─── Purchase & Verify ─────────────────────────────────────────────
     #
-    @action(detail=True, methods=["post"], url_path="purchase")
+    @action(detail=True, methods=["post"], url_path="purchase", throttle_scope="purchase")
     def purchase(self, request, pk=None):
         """
         POST /api/courses/{pk}/purchase/
@@ -230,7 +333,9 @@ class CourseViewSet(viewsets.ModelViewSet):
         GET /api/courses/{pk}/verify/?order_id={order_id}
         """
         order_id = request.query_params.get("order_id")
-        order = get_object_or_404(Order, pk=order_id, student=request.user)
+        # course loaded with the order: the enrollment below and the
+        # instructor's dashboard refresh (accounts/signals.py) need it
+        order = get_object_or_404(Order.objects.select_related("course"), pk=order_id, student=request.user)
         data = verify_transaction(reference=order.transaction_id)
         if data.get("status") == "success":
             order.status = Order.COMPLETED
@@ -238,3 +343,60 @@ class CourseViewSet(viewsets.ModelViewSet):
             Enrollment.objects.get_or_create(student=order.student, course=order.course)
             return Response({"detail": "Payment successful, enrolled."})
         return Response({"detail": "Payment failed."}, status=status.HTTP_400_BAD_REQUEST)
+
+
+
+class ChunkedUploadViewSet(mixins.CreateModelMixin,
+                           mixins.RetrieveModelMixin,
+                           viewsets.GenericViewSet):
+    """
+    Resumable uploads for lesson videos (course instructor) and
+    exam project submissions (enrolled students).
+
+    POST   /api/uploads/                  → start an upload
+    GET    /api/uploads/{id}/             → status + offset to resume from
+    PUT    /api/uploads/{id}/             → append one chunk (Content-Range)
+    POST   /api/uploads/{id}/finalize/    → attach the file to its target
+    DELETE /api/uploads/{id}/             → abandon the upload
+    """
+    serializer_class   = ChunkedUploadSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        return ChunkedUpload.objects.filter(user=self.request.user)
+
+    def perform_create(self, serializer):
+        user = self.request.user
+        data = serializer.validated_data
+        if data["kind"] == ChunkedUpload.LESSON_VIDEO:
+            course = data["lesson"].course
+            if not (user.is_staff or (user.is_instructor and course.instructor_id == user.id)):
+                raise PermissionDenied("Only the course instructor may upload lesson videos.")
+        else:
+            if not has_course_access(user, data["course"]):
+                raise PermissionDenied("Enroll to submit an exam project.")
+        upload = serializer.save(user=user)
+        start_upload(upload)
+
+    def update(self, request, pk=None):
+        upload = self.get_object()
+        start, length = parse_content_range(request.META.get("HTTP_CONTENT_RANGE"), upload)
+        write_chunk(
+            upload,
+            request.stream,
+            start,
+            length,
+            expected_digest=request.META.get("HTTP_X_CHUNK_SHA256"),
+        )
+        return Response(self.get_serializer(upload).data)
+
+    def destroy(self, request, pk=None):
+        upload = self.get_object()
+        if not discard_upload(upload):
+            return Response({"detail": "Upload is already finalized."}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    @action(detail=True, methods=["post"], url_path="finalize")
+    def finalize(self, request, pk=None):
+        upload = finalize_upload(self.get_object(), expected_checksum=request.data.get("checksum"))
+        return Response(self.get_serializer(upload).data)
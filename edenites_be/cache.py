@@ -0,0 +1,390 @@
+# edenites_be/cache.py
+"""
+Two-tier cache behind every view-level cache in the project.
+
+  L1  a bounded per-process LRU with TTLs (CACHE_L1_MAX_ENTRIES,
+      CACHE_L1_SECONDS): a hit is a dict lookup, no I/O, no pickling.
+  L2  Django's default cache (settings.CACHES): a file-based cache
+      locally, Redis in production via CACHE_URL, locmem under tests.
+
+Entries live in namespaces whose keys embed a version number kept in L2.
+invalidate() bumps the version, which orphans every entry of the
+namespace at once; old entries simply age out of both tiers. Namespaces
+name the models they are built from, and post_save / post_delete on those
+models (connected in each app's signals.py through connect_invalidation)
+invalidate them — immediately, and again once the transaction commits so
+a reader racing the write can't re-cache the old rows. Other workers
+notice a bump within CACHE_VERSION_SECONDS, the time a version number is
+trusted from L1.
+
+get_or_set() — used by every cached view, listing and queryset — keeps
+a rebuild from stampeding the database:
+
+  • single flight: on a miss, the worker that wins a lock (cache.add in
+    L2) recomputes; the others serve the namespace's last value for that
+    key — kept unversioned for CACHE_STALE_SECONDS so it survives an
+    invalidation or a deploy — or, with nothing to serve, wait up to
+    CACHE_LOCK_WAIT_SECONDS for the winner's result. Namespaces created
+    with stale=False (security decisions: token versions, entitlements)
+    never serve an old value; they only wait or compute. delete() drops
+    the stale copy too;
+  • namespaces created with local=False skip L1 for their entries, so a
+    delete() on one worker is seen by every other one on its next read
+    (token versions: a revoked token must stop working everywhere).
+  • early refresh (XFetch): a hit recomputes ahead of expiry with a
+    probability that rises as expiry nears and with how long the value
+    took to build (CACHE_XFETCH_BETA), so hot keys are refreshed by one
+    request before they expire instead of by all of them after.
+
+metrics() reports per-namespace L1 hits, L2 hits, misses, stale serves
+and early refreshes for this worker; staff can read them at
+GET /api/cache/metrics/.
+"""
+import hashlib
+import math
+import random
+import threading
+import time
+from collections import Counter, OrderedDict, namedtuple
+
+from django.conf import settings
+from django.core.cache import cache as l2
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from rest_framework import permissions
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+MISSING = object()
+
+
+def l1_max_entries():
+    return getattr(settings, "CACHE_L1_MAX_ENTRIES", 1000)
+
+
+def l1_seconds():
+    return getattr(settings, "CACHE_L1_SECONDS", 30)
+
+
+def version_seconds():
+    return getattr(settings, "CACHE_VERSION_SECONDS", 2)
+
+
+def default_timeout():
+    return getattr(settings, "CACHE_DEFAULT_TIMEOUT", 60 * 10)
+
+
+def stale_seconds():
+    return getattr(settings, "CACHE_STALE_SECONDS", 60 * 60 * 24)
+
+
+def lock_seconds():
+    return getattr(settings, "CACHE_LOCK_SECONDS", 30)
+
+
+def lock_wait_seconds():
+    return getattr(settings, "CACHE_LOCK_WAIT_SECONDS", 5)
+
+
+def xfetch_beta():
+    return getattr(settings, "CACHE_XFETCH_BETA", 1.0)
+
+
+# What get_or_set() stores: the value, how long it took to compute and
+# when it expires (epoch seconds), for XFetch.
+Entry = namedtuple("Entry", "value delta expires_at")
+
+LOCK_POLL_SECONDS = 0.05
+
+
+class Uncacheable(Exception):
+    """
+    Raised by a get_or_set() compute function to hand back a result
+    (e.g. an error response) that must not be cached.
+    """
+
+    def __init__(self, result):
+        super().__init__(result)
+        self.result = result
+
+
+class LRUCache:
+    """
+    Thread-safe LRU of (expires_at, value) pairs.
+    """
+
+    def __init__(self):
+        self.data = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            item = self.data.get(key)
+            if item is None:
+                return MISSING
+            if item[0] < time.monotonic():
+                del self.data[key]
+                return MISSING
+            self.data.move_to_end(key)
+            return item[1]
+
+    def set(self, key, value, ttl):
+        with self.lock:
+            self.data[key] = (time.monotonic() + ttl, value)
+            self.data.move_to_end(key)
+            limit = l1_max_entries()
+            while len(self.data) > limit:
+                self.data.popitem(last=False)
+
+    def delete(self, key):
+        with self.lock:
+            self.data.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.data.clear()
+
+    def __len__(self):
+        return len(self.data)
+
+
+l1 = LRUCache()
+
+_namespaces = {}
+_dependents = {}
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+def _count(namespace, outcome):
+    with _stats_lock:
+        _stats.setdefault(namespace, Counter())[outcome] += 1
+
+
+def _safe(key):
+    """
+    Keys go to L2 backends (memcached-style) that reject long or spaced keys.
+    """
+    key = str(key)
+    if len(key) <= 120 and key.isprintable() and " " not in key:
+        return key
+    return hashlib.md5(key.encode()).hexdigest()
+
+
+class Namespace:
+    """
+    A versioned group of cache entries invalidated together.
+    """
+
+    def __init__(self, name, models=(), timeout=None, stale=True, local=True):
+        self.name = name
+        self.models = tuple(label.lower() for label in models)
+        self._timeout = timeout
+        self.stale = stale
+        self.local = local
+        _namespaces[name] = self
+        for label in self.models:
+            _dependents.setdefault(label, []).append(self)
+
+    @property
+    def timeout(self):
+        timeout = self._timeout() if callable(self._timeout) else self._timeout
+        return default_timeout() if timeout is None else timeout
+
+    @property
+    def _version_key(self):
+        return f"cache-version:{self.name}"
+
+    def version(self):
+        version = l1.get(self._version_key)
+        if version is MISSING:
+            version = l2.get(self._version_key)
+            if version is None:
+                # Start from the clock, not 1: if the version key was evicted
+                # from L2, a restart at 1 could revive entries written under it.
+                l2.add(self._version_key, time.time_ns() // 1000, None)
+                version = l2.get(self._version_key, 1)
+            l1.set(self._version_key, version, version_seconds())
+        return version
+
+    def key(self, key):
+        return f"{self.name}:{self.version()}:{_safe(key)}"
+
+    def _stale_key(self, key):
+        return f"{self.name}:stale:{_safe(key)}"
+
+    def _lookup(self, full_key):
+        if self.local:
+            value = l1.get(full_key)
+            if value is not MISSING:
+                _count(self.name, "l1_hits")
+                return value
+        value = l2.get(full_key, MISSING)
+        if value is MISSING:
+            _count(self.name, "misses")
+            return MISSING
+        _count(self.name, "l2_hits")
+        self._keep_local(full_key, value, self.timeout)
+        return value
+
+    def _keep_local(self, full_key, value, timeout):
+        if self.local:
+            l1.set(full_key, value, min(timeout, l1_seconds()))
+
+    def get(self, key, default=None):
+        value = self._lookup(self.key(key))
+        if value is MISSING:
+            return default
+        return value.value if isinstance(value, Entry) else value
+
+    def set(self, key, value, timeout=None):
+        timeout = self.timeout if timeout is None else timeout
+        full_key = self.key(key)
+        l2.set(full_key, value, timeout)
+        self._keep_local(full_key, value, timeout)
+
+    def delete(self, key):
+        full_key = self.key(key)
+        l1.delete(full_key)
+        l2.delete_many([full_key, self._stale_key(key)])
+
+    def get_or_set(self, key, compute, timeout=None):
+        """
+        Cached value of `key`, computed by `compute()` under single-flight
+        locking with early refresh; see the module docstring.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        full_key = self.key(key)
+        current = self._lookup(full_key)
+        if current is not MISSING:
+            if not isinstance(current, Entry):
+                return current
+            if not _refresh_early(current):
+                return current.value
+            _count(self.name, "early_refreshes")
+
+        lock_key = f"lock:{full_key}"
+        locked = l2.add(lock_key, 1, lock_seconds())
+        if not locked:
+            # Another worker is rebuilding: serve what we have meanwhile.
+            if current is not MISSING:
+                return current.value
+            stale = l2.get(self._stale_key(key), MISSING) if self.stale else MISSING
+            if stale is not MISSING:
+                _count(self.name, "stale")
+                return stale
+            deadline = time.monotonic() + lock_wait_seconds()
+            while time.monotonic() < deadline:
+                time.sleep(LOCK_POLL_SECONDS)
+                current = l2.get(full_key, MISSING)
+                if current is not MISSING:
+                    return current.value if isinstance(current, Entry) else current
+            # The winner died or is slow; compute without the lock.
+        try:
+            return self._compute(key, full_key, compute, timeout)
+        finally:
+            if locked:
+                l2.delete(lock_key)
+
+    def _compute(self, key, full_key, compute, timeout):
+        started = time.monotonic()
+        value = compute()
+        delta = time.monotonic() - started
+        entry = Entry(value, delta, time.time() + timeout)
+        l2.set(full_key, entry, timeout)
+        self._keep_local(full_key, entry, timeout)
+        if self.stale:
+            l2.set(self._stale_key(key), value, stale_seconds())
+        return value
+
+    def invalidate(self):
+        try:
+            version = l2.incr(self._version_key)
+        except ValueError:
+            version = time.time_ns() // 1000
+            l2.set(self._version_key, version, None)
+        l1.set(self._version_key, version, version_seconds())
+        _count(self.name, "invalidations")
+
+
+def _refresh_early(entry):
+    """
+    XFetch (Vattani et al.): true with a probability rising as
+    `entry.expires_at` nears, scaled by how long it took to compute.
+    """
+    gap = -entry.delta * xfetch_beta() * math.log(1.0 - random.random())
+    return time.time() + gap >= entry.expires_at
+
+
+def _setting(name, default):
+    return lambda: getattr(settings, name, default)
+
+
+_CATALOG = ("courses.category", "courses.course", "courses.lesson",
+            "courses.followupquestion", "courses.followupoption")
+
+# ─── Namespaces ───────────────────────────────────────────────────────────────
+COURSES      = Namespace("courses", models=_CATALOG)
+CATEGORIES   = Namespace("categories", models=("courses.category", "courses.course"),
+                         timeout=_setting("CATEGORY_LISTING_CACHE_SECONDS", 60 * 60))
+EXAMS        = Namespace("exams", models=("exams.examsubject", "exams.pastquestion", "exams.pastoption"))
+JAMB         = Namespace("jamb", models=("jamb.jambsubject", "jamb.jambquestion", "jamb.strategy"))
+TESTIMONIALS = Namespace("testimonials", models=("testimonials.testimonial",))
+# Keyed per user / per query / per ETag and expired by time, not by models.
+ENTITLEMENTS = Namespace("entitlements", timeout=_setting("ENTITLEMENT_CACHE_TIMEOUT", 60 * 10), stale=False)
+COUNTS       = Namespace("counts", timeout=_setting("PAGINATION_COUNT_CACHE_SECONDS", 60))
+COMPRESSED   = Namespace("compressed", timeout=_setting("COMPRESSION_CACHE_SECONDS", 60 * 60 * 24))
+# Keyed per user and generation (accounts/dashboard.py); catalog edits retitle courses.
+DASHBOARDS   = Namespace("dashboards", models=("courses.course", "courses.lesson"),
+                         timeout=_setting("DASHBOARD_CACHE_SECONDS", 60 * 5))
+# Read from L2 only: a bump must reach every worker at once.
+TOKEN_VERSIONS = Namespace("token-versions", timeout=_setting("TOKEN_VERSION_CACHE_SECONDS", 60 * 60),
+                           stale=False, local=False)
+
+
+def model_changed(sender, **kwargs):
+    namespaces = _dependents.get(sender._meta.label_lower, ())
+    if not namespaces:
+        return
+
+    def invalidate():
+        for namespace in namespaces:
+            namespace.invalidate()
+    invalidate()
+    transaction.on_commit(invalidate)
+
+
+def connect_invalidation(*models):
+    for model in models:
+        uid = f"cache-invalidation:{model._meta.label_lower}"
+        post_save.connect(model_changed, sender=model, dispatch_uid=uid)
+        post_delete.connect(model_changed, sender=model, dispatch_uid=uid)
+
+
+def metrics():
+    with _stats_lock:
+        stats = {name: dict(counter) for name, counter in _stats.items()}
+    for name, counter in stats.items():
+        lookups = sum(counter.get(k, 0) for k in ("l1_hits", "l2_hits", "misses"))
+        hits = counter.get("l1_hits", 0) + counter.get("l2_hits", 0)
+        counter["hit_ratio"] = round(hits / lookups, 4) if lookups else None
+    return {"l1_entries": len(l1), "namespaces": stats}
+
+
+def clear():
+    """
+    Drop this worker's L1 and its metrics (tests, debugging).
+    """
+    l1.clear()
+    with _stats_lock:
+        _stats.clear()
+
+
+class CacheMetricsView(APIView):
+    """
+    GET /api/cache/metrics/ → this worker's hit/miss counters (staff only).
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        return Response(metrics())
@@ -0,0 +1,181 @@
+# edenites_be/compression.py
+"""
+Content-negotiated Brotli / gzip compression for API responses.
+
+  • Accept-Encoding is parsed with its q-values; br wins ties when the
+    `brotli` package is installed, gzip is the fallback. Every compressible
+    response gets `Vary: Accept-Encoding`.
+  • Bodies under COMPRESSION_MIN_SIZE bytes, non-text content (media,
+    uploads), 206 range responses and anything already encoded are left
+    alone.
+  • Streaming responses (delta sync) are compressed chunk by chunk, with a
+    flush after each chunk so clients still receive data progressively.
+  • Public responses carrying an ETag (the conditional-GET catalog
+    endpoints) are compressed once at the highest level and the bytes are
+    cached under that ETag, so repeat hits skip the compressor entirely.
+  • Anything that is not public and anonymous is gzipped with Django's
+    random-length padding (BREACH mitigation) rather than Brotli.
+"""
+import gzip
+import hashlib
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.text import compress_sequence, compress_string
+
+from .cache import COMPRESSED
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - Brotli is in requirements.txt
+    brotli = None
+
+BR = "br"
+GZIP = "gzip"
+
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "application/msgpack",
+)
+
+# Per-response levels favour latency; cached bodies are compressed once,
+# so they get the maximum.
+BROTLI_QUALITY = 5
+BROTLI_CACHED_QUALITY = 11
+GZIP_CACHED_LEVEL = 9
+MAX_RANDOM_BYTES = 100
+
+
+def min_size():
+    return getattr(settings, "COMPRESSION_MIN_SIZE", 1024)
+
+
+def negotiate(accept_encoding, allow_brotli=True):
+    """
+    Pick "br", "gzip" or None from an Accept-Encoding header.
+    """
+    weights = {}
+    for part in accept_encoding.split(","):
+        token, _, params = part.partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        weight = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[token] = weight
+
+    candidates = ([BR] if brotli is not None and allow_brotli else []) + [GZIP]
+    best, best_weight = None, 0.0
+    for encoding in candidates:
+        weight = weights.get(encoding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+    return best
+
+
+def compress(content, encoding, cached=False):
+    if encoding == BR:
+        return brotli.compress(content, quality=BROTLI_CACHED_QUALITY if cached else BROTLI_QUALITY)
+    if cached:
+        return gzip.compress(content, compresslevel=GZIP_CACHED_LEVEL, mtime=0)
+    return compress_string(content, max_random_bytes=MAX_RANDOM_BYTES)
+
+
+def _brotli_sequence(sequence):
+    compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+    for chunk in sequence:
+        data = compressor.process(chunk) + compressor.flush()
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+def compress_stream(sequence, encoding):
+    if encoding == BR:
+        return _brotli_sequence(sequence)
+    return compress_sequence(sequence, max_random_bytes=MAX_RANDOM_BYTES)
+
+
+def cached_compress(content, encoding, etag):
+    """
+    Compressed bytes of a public representation, computed once per ETag.
+    The raw length is stored alongside as a cheap consistency check.
+    """
+    key = f"{encoding}:" + hashlib.md5(etag.encode()).hexdigest()
+    entry = COMPRESSED.get(key)
+    if entry is not None and entry[0] == len(content):
+        return entry[1]
+    compressed = compress(content, encoding, cached=True)
+    COMPRESSED.set(key, (len(content), compressed))
+    return compressed
+
+
+def _compressible(response):
+    content_type = response.get("Content-Type", "").split(";")[0].strip().lower()
+    return content_type.startswith(COMPRESSIBLE_TYPES) or content_type.endswith("+json")
+
+
+def _cache_control(response):
+    return {d.strip().split("=")[0].lower() for d in response.get("Cache-Control", "").split(",")}
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """
+    br/gzip for API responses; see the module docstring.
+    """
+
+    def process_response(self, request, response):
+        if (
+            response.has_header("Content-Encoding")
+            or response.status_code == 206
+            or not _compressible(response)
+        ):
+            return response
+        directives = _cache_control(response)
+        if "no-transform" in directives:
+            return response
+        if not response.streaming and len(response.content) < min_size():
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        public = "public" in directives
+        anonymous = "HTTP_AUTHORIZATION" not in request.META and settings.SESSION_COOKIE_NAME not in request.COOKIES
+        encoding = negotiate(
+            request.META.get("HTTP_ACCEPT_ENCODING", ""),
+            allow_brotli=public or (anonymous and "private" not in directives),
+        )
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            if response.is_async:
+                return response
+            response.streaming_content = compress_stream(response.streaming_content, encoding)
+            del response.headers["Content-Length"]
+        else:
+            etag = response.get("ETag")
+            if public and etag:
+                compressed = cached_compress(response.content, encoding, etag)
+            else:
+                compressed = compress(response.content, encoding)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers["Content-Length"] = str(len(compressed))
+
+        # A strong ETag must not match a different encoding (RFC 9110 8.8.1).
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+        response.headers["Content-Encoding"] = encoding
+        return response
@@ -0,0 +1,156 @@
+# edenites_be/conditional.py
+"""
+Conditional GET (ETag / Last-Modified → 304) for read-mostly endpoints.
+
+A resource's version is the newest `updated_at` of the models its payload
+is built from, plus the newest delete recorded for them in sync.Tombstone.
+That is one indexed MAX() per model, checked before the real query and the
+serializer run, so a matching If-None-Match / If-Modified-Since costs a few
+index probes and an empty 304.
+
+Views opt in with ConditionalGetMixin and list their models in
+`conditional_models` (labels such as "courses.course"). Public resources
+get `Cache-Control: public, max-age=CONDITIONAL_GET_MAX_AGE` so a CDN can
+serve them; per-user ones are marked private and always revalidated.
+
+With a `cache_namespace` (edenites_be/cache.py) covering those models the
+version is cached too, and so is the data of public 200 responses, keyed
+by URL (per-user ones only when the view passes a `cache_key` naming
+everything that varies): a warm request — 304 or full body — runs no
+queries at all, and a cold one is rebuilt by one worker at a time.
+"""
+import hashlib
+
+from django.apps import apps
+from django.conf import settings
+from django.db.models import Max
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, parse_etags, parse_http_date_safe
+from rest_framework import status
+from rest_framework.response import Response
+
+from .cache import Uncacheable
+
+from sync.models import Tombstone
+
+
+def max_age():
+    return getattr(settings, "CONDITIONAL_GET_MAX_AGE", 60)
+
+
+def resource_version(labels):
+    """
+    Returns (last_modified, token) for the given model labels.
+    """
+    stamps = [
+        apps.get_model(label)._default_manager.order_by().aggregate(m=Max("updated_at"))["m"]
+        for label in labels
+    ]
+    stamps.append(
+        Tombstone.objects.filter(model__in=labels).aggregate(m=Max("deleted_at"))["m"]
+    )
+    known = [s for s in stamps if s is not None]
+    token = "|".join(s.isoformat() if s else "-" for s in stamps)
+    return (max(known) if known else None), token
+
+
+def not_modified(request, etag, last_modified):
+    """
+    RFC 9110 evaluation: If-None-Match wins over If-Modified-Since.
+    """
+    if_none_match = request.META.get("HTTP_IF_NONE_MATCH")
+    if if_none_match:
+        if if_none_match.strip() == "*":
+            return True
+        bare = etag.removeprefix("W/")
+        return any(tag.removeprefix("W/") == bare for tag in parse_etags(if_none_match))
+    since = parse_http_date_safe(request.META.get("HTTP_IF_MODIFIED_SINCE", ""))
+    return bool(since and last_modified and int(last_modified.timestamp()) <= since)
+
+
+class ConditionalGetMixin:
+    conditional_models  = ()
+    conditional_private = False
+    cache_namespace     = None
+
+    def cached_version(self, labels):
+        namespace = self.cache_namespace
+        if namespace is None or not set(labels) <= set(namespace.models):
+            return resource_version(labels)
+        return namespace.get_or_set("version:" + ",".join(labels), lambda: resource_version(labels))
+
+    def response_cache_key(self, request, extra=()):
+        """
+        Key under which a public response's data is cached, or None to
+        build it every time.
+        """
+        return "\n".join(["response", request.get_full_path(), *map(str, extra)])
+
+    def conditional_response(self, request, build, models=None, private=None, extra=(), version=None,
+                             cache_key=None):
+        """
+        Return a 304 when the client's copy is current, else `build()`,
+        with ETag / Last-Modified / Cache-Control set on either.
+        `extra` holds anything besides the models that shapes the body;
+        `version` is a resource_version() result cached by the caller;
+        `cache_key` caches the body in `cache_namespace` even when private.
+        """
+        if request.method not in ("GET", "HEAD"):
+            return build()
+        private = self.conditional_private if private is None else private
+        labels = models or self.conditional_models
+        last_modified, token = version or self.cached_version(labels)
+
+        renderer = getattr(request, "accepted_renderer", None)
+        parts = [token, request.get_full_path(), getattr(renderer, "format", ""), *map(str, extra)]
+        if private:
+            parts.append(str(request.user.pk))
+        etag = 'W/"%s"' % hashlib.md5("\n".join(parts).encode()).hexdigest()
+
+        if not_modified(request, etag, last_modified):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            key = cache_key
+            if key is None and not private and version is None:
+                key = self.response_cache_key(request, extra)
+            if key is None or self.cache_namespace is None:
+                response = build()
+            else:
+                response = self._cached_build(key, build)
+        if response.status_code not in (200, 304):
+            return response
+
+        response["ETag"] = etag
+        if last_modified is not None:
+            response["Last-Modified"] = http_date(last_modified.timestamp())
+        if private:
+            patch_cache_control(response, private=True, no_cache=True)
+            patch_vary_headers(response, ["Accept", "Authorization"])
+        else:
+            patch_cache_control(response, public=True, max_age=max_age())
+            patch_vary_headers(response, ["Accept"])
+        return response
+
+    def _cached_build(self, key, build):
+        built = []
+
+        def compute():
+            response = build()
+            if response.status_code != 200 or response.streaming:
+                raise Uncacheable(response)
+            built.append(response)
+            return response.data
+
+        try:
+            data = self.cache_namespace.get_or_set(key, compute)
+        except Uncacheable as exc:
+            return exc.result
+        return built[0] if built else Response(data)
+
+    def list(self, request, *args, **kwargs):
+        parent = super().list
+        return self.conditional_response(request, lambda: parent(request, *args, **kwargs))
+
+    def retrieve(self, request, *args, **kwargs):
+        parent = super().retrieve
+        return self.conditional_response(request, lambda: parent(request, *args, **kwargs))
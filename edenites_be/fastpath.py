@@ -0,0 +1,266 @@
+# edenites_be/fastpath.py
+"""
+Read-only fast path for hot list endpoints.
+
+ModelSerializer builds a model instance per row and walks its field graph.
+For plain list payloads the same JSON can be produced from `.values()`
+rows: each serializer is compiled once into a plan of (key, lookup, field)
+entries, and a row becomes a dict by calling each field's own
+to_representation() on the looked-up value — so Decimal places, datetime
+format/time zone and choice handling stay DRF's exactly. Nested many=True
+serializers (past-question options) are filled from one grouped query
+per page, like prefetch_related(); expanded forward relations
+(?expand=subject) come from the same values() row.
+
+Serializers whose output can't be derived from columns — a custom
+to_representation(), SerializerMethodField, files, source="*", paths
+through nullable relations — compile to None and the view falls back to
+the regular serializer.
+"""
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+PLAN_CACHE_LIMIT = 256
+
+COLUMN   = 0
+DATETIME = 1
+SINGLE   = 2
+NESTED   = 3
+
+_UNSUPPORTED = (
+    serializers.ManyRelatedField,
+    serializers.HyperlinkedRelatedField,
+    serializers.FileField,
+    serializers.SerializerMethodField,
+    serializers.HiddenField,
+)
+
+_plans = {}
+
+
+def _identity(value):
+    return value
+
+
+class Plan:
+    """
+    Compiled form of one serializer: `entries` holds, in output order,
+    (key, kind, lookup, convert_or_child) tuples.
+    """
+
+    def __init__(self, model, entries):
+        self.model = model
+        self.entries = entries
+
+    @property
+    def lookups(self):
+        found = ["pk"]
+        for _, kind, lookup, child in self.entries:
+            if kind in (COLUMN, DATETIME):
+                found.append(lookup)
+            elif kind == SINGLE:
+                found.append(lookup)
+                found.extend(child.lookups[1:])
+        return found
+
+    def row(self, values, children, tz):
+        out = {}
+        for key, kind, lookup, convert in self.entries:
+            if kind == COLUMN:
+                value = values[lookup]
+                out[key] = None if value is None else convert(value)
+            elif kind == DATETIME:
+                value = values[lookup]
+                if value is None:
+                    out[key] = None
+                elif tz is not None and value.utcoffset() is not None:
+                    # DateTimeField.to_representation() with the time zone
+                    # looked up once per page instead of once per value.
+                    text = value.astimezone(tz).isoformat()
+                    out[key] = text[:-6] + "Z" if text.endswith("+00:00") else text
+                else:
+                    out[key] = convert(value)
+            elif kind == SINGLE:
+                out[key] = None if values[lookup] is None else convert.row(values, children, tz)
+            else:
+                out[key] = children[key].get(values["pk"], [])
+        return out
+
+    def rows(self, values_list):
+        """
+        Serialize a page of values() dicts, fetching nested lists in one
+        query per nested field.
+        """
+        values_list = list(values_list)
+        tz = timezone.get_current_timezone() if settings.USE_TZ else None
+        ids = [values["pk"] for values in values_list]
+        children = {}
+        for key, kind, fk_attname, child in self.entries:
+            if kind != NESTED:
+                continue
+            grouped = defaultdict(list)
+            if ids:
+                # The default manager's ordering is what prefetch_related() uses.
+                child_rows = child.model._default_manager.filter(
+                    **{f"{fk_attname}__in": ids}
+                ).values(fk_attname, *child.lookups)
+                for child_values in child_rows:
+                    grouped[child_values[fk_attname]].append(child.row(child_values, {}, tz))
+            children[key] = grouped
+        return [self.row(values, children, tz) for values in values_list]
+
+
+def _relation(model, name):
+    try:
+        return model._meta.get_field(name)
+    except FieldDoesNotExist:
+        return None
+
+
+def _forward(field):
+    return field is not None and field.is_relation and field.concrete and (
+        field.many_to_one or field.one_to_one
+    )
+
+
+def _lookup(model, attrs, field):
+    """
+    values() lookup for a scalar field's source, or None.
+    """
+    parts = []
+    for index, attr in enumerate(attrs):
+        model_field = _relation(model, attr)
+        if model_field is None:
+            return None
+        last = index == len(attrs) - 1
+        if not model_field.is_relation:
+            return "__".join(parts + [attr]) if last else None
+        if not _forward(model_field):
+            return None
+        if last:
+            if isinstance(field, serializers.SlugRelatedField):
+                return "__".join(parts + [attr, field.slug_field])
+            if isinstance(field, serializers.PrimaryKeyRelatedField) and field.pk_field is None:
+                return "__".join(parts + [attr])
+            return None
+        # DRF skips the key when an intermediate relation is None; a
+        # values() row would say null instead, so don't go there.
+        if model_field.null:
+            return None
+        parts.append(attr)
+        model = model_field.related_model
+    return None
+
+
+def _iso_datetime(field):
+    output_format = getattr(field, "format", api_settings.DATETIME_FORMAT)
+    return (
+        isinstance(field, serializers.DateTimeField)
+        and not hasattr(field, "timezone")
+        and isinstance(output_format, str)
+        and output_format.lower() == ISO_8601
+    )
+
+
+def _compile(serializer, model, prefix=""):
+    if type(serializer).to_representation is not serializers.Serializer.to_representation:
+        return None
+    entries = []
+    for key, field in serializer.fields.items():
+        if field.write_only:
+            continue
+        attrs = field.source_attrs
+        if not attrs or isinstance(field, _UNSUPPORTED):
+            return None
+
+        if isinstance(field, serializers.ListSerializer):
+            relation = _relation(model, attrs[0]) if len(attrs) == 1 else None
+            if prefix or relation is None or not (relation.one_to_many and relation.auto_created):
+                return None
+            child = _compile(field.child, relation.related_model)
+            if child is None or any(kind not in (COLUMN, DATETIME) for _, kind, _, _ in child.entries):
+                return None
+            entries.append((key, NESTED, relation.field.attname, child))
+
+        elif isinstance(field, serializers.BaseSerializer):
+            # An expanded forward relation (?expand=…).
+            relation = _relation(model, attrs[0]) if len(attrs) == 1 else None
+            if not _forward(relation):
+                return None
+            child = _compile(field, relation.related_model, prefix=f"{prefix}{attrs[0]}__")
+            if child is None or any(kind not in (COLUMN, DATETIME) for _, kind, _, _ in child.entries):
+                return None
+            entries.append((key, SINGLE, prefix + attrs[0], child))
+
+        else:
+            lookup = _lookup(model, attrs, field)
+            if lookup is None:
+                return None
+            if isinstance(field, serializers.RelatedField):
+                # Already the slug / pk in a values() row.
+                entries.append((key, COLUMN, prefix + lookup, _identity))
+            elif _iso_datetime(field):
+                entries.append((key, DATETIME, prefix + lookup, field.to_representation))
+            else:
+                entries.append((key, COLUMN, prefix + lookup, field.to_representation))
+
+    return Plan(model, entries)
+
+
+def compile_serializer(serializer, model):
+    """
+    The cached plan for `serializer` — after ?fields= / ?expand= shaped
+    its fields — or None when it must go through DRF.
+    """
+    if isinstance(serializer, serializers.ListSerializer):
+        serializer = serializer.child
+    key = (type(serializer), model, tuple((name, type(f)) for name, f in serializer.fields.items()))
+    if key not in _plans:
+        if len(_plans) >= PLAN_CACHE_LIMIT:
+            _plans.clear()
+        _plans[key] = _compile(serializer, model)
+    return _plans[key]
+
+
+def _ordering_lookups(queryset):
+    found = []
+    for term in queryset.query.order_by or queryset.model._meta.ordering:
+        if isinstance(term, str) and term.lstrip("-") != "?":
+            found.append(term.lstrip("-"))
+    return found
+
+
+def serialize_values(queryset, plan):
+    """
+    values() queryset carrying every column the plan and the pagination
+    (ordering columns for keyset cursors) need.
+    """
+    lookups = dict.fromkeys(plan.lookups + _ordering_lookups(queryset))
+    return queryset.prefetch_related(None).values(*lookups)
+
+
+class FastListMixin:
+    """
+    ViewSet mixin: `list` renders from values() rows when the serializer
+    compiles, through the serializer otherwise. Set `fast_list = False`
+    to opt a subclass out.
+    """
+    fast_list = True
+
+    def list(self, request, *args, **kwargs):
+        model = self.get_queryset().model
+        plan = compile_serializer(self.get_serializer(), model) if self.fast_list else None
+        if plan is None:
+            return super().list(request, *args, **kwargs)
+
+        rows = serialize_values(self.filter_queryset(self.get_queryset()), plan)
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(plan.rows(page))
+        return Response(plan.rows(rows))
@@ -0,0 +1,134 @@
+# edenites_be/jobs.py
+"""
+Background jobs for work too slow for a request (GDPR exports, account
+erasure, related-course updates).
+
+enqueue(func, *args) runs func(*args) on a small per-process thread pool
+(JOB_WORKERS threads) once the current transaction commits, so the job
+sees the rows the request just wrote. With JOBS_INLINE (test settings) it runs
+synchronously in the committing thread instead.
+
+The pool lives in the web process and dies with it. Jobs therefore keep
+their state in the database and are written to be re-run from the top:
+the Procfile's `worker` process (`manage.py run_pending_jobs --every 60`)
+picks up whatever a restart or deploy interrupted. It must be scaled to
+one dyno/instance wherever the web process runs.
+
+A job row (status, lease_expires_at) is taken with claim(): PENDING, or
+RUNNING with an expired lease, in one conditional UPDATE. The run keeps
+its lease alive with Lease.renew() as it makes progress (a heartbeat every
+half JOB_LEASE_SECONDS), so recovery only restarts runs that have really
+stopped; a run that finds its lease taken over raises LeaseLost and stops.
+"""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def workers():
+    return getattr(settings, "JOB_WORKERS", 2)
+
+
+def inline():
+    return getattr(settings, "JOBS_INLINE", False)
+
+
+def lease_seconds():
+    return getattr(settings, "JOB_LEASE_SECONDS", 120)
+
+
+class LeaseLost(Exception):
+    """
+    Another run took the job over after this run's lease expired.
+    """
+
+
+class Lease:
+    """
+    This run's hold on one job row; see claim().
+    """
+
+    def __init__(self, model, pk, expires_at):
+        self.model = model
+        self.pk = pk
+        self.expires_at = expires_at
+
+    def renew(self, force=False):
+        """
+        Push the expiry out again once half the lease has gone by (or now,
+        with force); raises LeaseLost if the row was claimed by another run.
+        """
+        now = timezone.now()
+        if not force and self.expires_at - now > timedelta(seconds=lease_seconds() / 2):
+            return
+        expires_at = now + timedelta(seconds=lease_seconds())
+        renewed = self.model.objects.filter(
+            pk=self.pk, status=self.model.RUNNING, lease_expires_at=self.expires_at
+        ).update(lease_expires_at=expires_at)
+        if not renewed:
+            raise LeaseLost(f"{self.model.__name__} {self.pk}")
+        self.expires_at = expires_at
+
+
+def claim(model, pk):
+    """
+    Mark job `pk` of `model` RUNNING under a new lease if it is PENDING or
+    its previous run's lease has expired; None if it is finished or held.
+    """
+    now = timezone.now()
+    expires_at = now + timedelta(seconds=lease_seconds())
+    expired = Q(lease_expires_at__isnull=True) | Q(lease_expires_at__lt=now)
+    claimed = model.objects.filter(
+        Q(status=model.PENDING) | Q(status=model.RUNNING) & expired, pk=pk
+    ).update(status=model.RUNNING, lease_expires_at=expires_at)
+    return Lease(model, pk, expires_at) if claimed else None
+
+
+def pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ThreadPoolExecutor(max_workers=workers(), thread_name_prefix="job")
+    return _pool
+
+
+def run(func, *args):
+    """
+    Run one job now, logging (not raising) its failure.
+    """
+    try:
+        func(*args)
+    except Exception:
+        logger.exception("Background job %s%r failed", func.__qualname__, args)
+
+
+def _run_in_worker(func, args):
+    close_old_connections()
+    try:
+        run(func, *args)
+    finally:
+        connection.close()  # this thread's connection, not the request's
+
+
+def enqueue(func, *args):
+    """
+    Schedule func(*args) to run in the background after commit.
+    """
+    def submit():
+        if inline():
+            run(func, *args)
+        else:
+            pool().submit(_run_in_worker, func, args)
+    transaction.on_commit(submit)
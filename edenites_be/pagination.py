@@ -0,0 +1,269 @@
+# edenites_be/pagination.py
+"""
+Project-wide pagination.
+
+HybridPagination is the DEFAULT_PAGINATION_CLASS:
+
+  • ?cursor=…  → keyset pagination (KeysetPagination). Pages are fetched
+    with a WHERE on the ordering columns instead of OFFSET, so page 1000
+    costs the same as page 1, and no COUNT(*) is run. Start with an empty
+    `?cursor=` and follow the `next` / `previous` links.
+  • otherwise  → the classic page-number response (count/next/previous/
+    results) for existing clients, with the COUNT(*) estimated or cached
+    on large tables.
+
+Both modes accept an opt-in `?page_size=` capped at PAGINATION_MAX_PAGE_SIZE.
+"""
+import base64
+import hashlib
+import json
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q, QuerySet
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination, _positive_int
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+from .cache import COUNTS
+
+
+def max_page_size():
+    return getattr(settings, "PAGINATION_MAX_PAGE_SIZE", 100)
+
+
+def estimated_count(queryset):
+    """
+    COUNT(*) that stays cheap on big tables:
+      • unfiltered PostgreSQL tables above the threshold use the planner
+        estimate (pg_class.reltuples) instead of a full scan;
+      • large exact counts are cached for PAGINATION_COUNT_CACHE_SECONDS.
+    """
+    threshold = getattr(settings, "PAGINATION_ESTIMATE_THRESHOLD", 10_000)
+    connection = connections[queryset.db]
+
+    if connection.vendor == "postgresql" and not queryset.query.where and not queryset.query.distinct:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE relname = %s",
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        if row and row[0] >= threshold:
+            return row[0]
+
+    sql, params = queryset.query.sql_with_params()
+    key = hashlib.md5(f"{sql}{params!r}".encode()).hexdigest()
+    count = COUNTS.get(key)
+    if count is None:
+        count = queryset.count()
+        if count >= threshold:
+            COUNTS.set(key, count)
+    return count
+
+
+class EstimatedCountPaginator(Paginator):
+    @cached_property
+    def count(self):
+        if isinstance(self.object_list, QuerySet):
+            return estimated_count(self.object_list)
+        return len(self.object_list)
+
+
+class PageSizeMixin:
+    page_size_query_param = "page_size"
+
+    @property
+    def max_page_size(self):
+        return max_page_size()
+
+
+class EstimatedCountPageNumberPagination(PageSizeMixin, PageNumberPagination):
+    django_paginator_class = EstimatedCountPaginator
+
+
+def _value(row, field):
+    """
+    Read an ordering value from a model instance or a .values() dict.
+    """
+    if isinstance(row, dict):
+        return row[field]
+    for attr in field.split("__"):
+        row = getattr(row, "pk" if attr == "pk" else attr)
+    return row
+
+
+def _jsonable(value):
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    if isinstance(value, (int, float, str)) or value is None:
+        return value
+    return str(value)
+
+
+class KeysetPagination(PageSizeMixin, BasePagination):
+    """
+    Cursor pagination over a (possibly multi-column) ordering.
+
+    The ordering comes from the view's `keyset_ordering`, else the
+    queryset's own ordering; the primary key is appended as a tie-breaker
+    so every position is unique. Ordering columns must be non-null.
+    """
+    cursor_query_param = "cursor"
+    page_size = api_settings.PAGE_SIZE
+    invalid_cursor_message = "Invalid cursor"
+
+    def get_page_size(self, request):
+        try:
+            return _positive_int(
+                request.query_params[self.page_size_query_param],
+                strict=True,
+                cutoff=self.max_page_size,
+            )
+        except (KeyError, ValueError):
+            return self.page_size
+
+    def get_ordering(self, queryset, view):
+        ordering = list(
+            getattr(view, "keyset_ordering", None)
+            or queryset.query.order_by
+            or queryset.model._meta.ordering
+            or ["-pk"]
+        )
+        if not all(isinstance(f, str) for f in ordering):
+            ordering = ["-pk"]
+        names = {f.lstrip("-") for f in ordering}
+        if not names & {"pk", "id", queryset.model._meta.pk.name}:
+            ordering.append("-pk" if ordering[0].startswith("-") else "pk")
+        return ordering
+
+    @staticmethod
+    def _after(ordering, values, backwards):
+        """
+        Q matching rows strictly after `values` in `ordering`
+        (strictly before when paging backwards).
+        """
+        condition = Q()
+        equal = Q()
+        for field, value in zip(ordering, values):
+            name = field.lstrip("-")
+            descending = field.startswith("-") != backwards
+            condition |= equal & Q(**{f"{name}__{'lt' if descending else 'gt'}": value})
+            equal &= Q(**{name: value})
+        return condition
+
+    def encode_cursor(self, row, backwards):
+        position = {"v": [_jsonable(_value(row, f.lstrip("-"))) for f in self.ordering]}
+        if backwards:
+            position["b"] = 1
+        raw = json.dumps(position, separators=(",", ":")).encode()
+        encoded = base64.urlsafe_b64encode(raw).decode().rstrip("=")
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            raw = base64.urlsafe_b64decode(encoded + "=" * (-len(encoded) % 4))
+            position = json.loads(raw)
+            values = position["v"]
+            if len(values) != len(self.ordering):
+                raise ValueError
+        except (TypeError, ValueError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+        return values, bool(position.get("b"))
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(queryset, view)
+
+        values, backwards = self.decode_cursor(request)
+        if values is not None:
+            queryset = queryset.filter(self._after(self.ordering, values, backwards))
+        if backwards:
+            order = [f[1:] if f.startswith("-") else f"-{f}" for f in self.ordering]
+        else:
+            order = self.ordering
+        rows = list(queryset.order_by(*order)[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if backwards:
+            rows.reverse()
+
+        if backwards:
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, values is not None
+        self.first_row = rows[0] if rows else None
+        self.last_row = rows[-1] if rows else None
+        return rows
+
+    def get_next_link(self):
+        if not (self.has_next and self.last_row is not None):
+            return None
+        return self.encode_cursor(self.last_row, backwards=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if self.first_row is None:
+            return replace_query_param(self.base_url, self.cursor_query_param, "")
+        return self.encode_cursor(self.first_row, backwards=True)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ("next", self.get_next_link()),
+            ("previous", self.get_previous_link()),
+            ("results", data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+
+class HybridPagination(BasePagination):
+    """
+    Keyset pagination when the request carries `?cursor=`, page numbers
+    (with an estimated/cached count) otherwise.
+    """
+    cursor_query_param = KeysetPagination.cursor_query_param
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.cursor_query_param in request.query_params:
+            self.delegate = KeysetPagination()
+        else:
+            self.delegate = EstimatedCountPageNumberPagination()
+        return self.delegate.paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return self.delegate.get_paginated_response(data)
+
+    def get_paginated_response_schema(self, schema):
+        return EstimatedCountPageNumberPagination().get_paginated_response_schema(schema)
+
+    def get_schema_operation_parameters(self, view):
+        return EstimatedCountPageNumberPagination().get_schema_operation_parameters(view) + [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Keyset cursor; send it empty to start cursor pagination.",
+                "schema": {"type": "string"},
+            },
+        ]
@@ -0,0 +1,126 @@
+# edenites_be/renderers.py
+"""
+Faster JSON rendering/parsing and an optional MessagePack format.
+
+FastJSONRenderer / FastJSONParser use orjson when it is installed and
+otherwise behave exactly like DRF's JSONRenderer / JSONParser. Output is
+kept byte-identical to DRF's: compact separators, UTF-8 rather than \\uXXXX
+escapes, U+2028/U+2029 escaped, and every type orjson would format
+differently (datetime/date/time, Decimal, UUID, lazy strings, …) is handed
+to DRF's own JSONEncoder. Two deliberate exceptions, both still valid JSON:
+floats in exponent form are written 1e-7 rather than 1e-07, and NaN or
+infinite floats become null instead of raising. Indented output (the
+browsable API, `; indent=N`) and non-default UNICODE_JSON / COMPACT_JSON /
+STRICT_JSON settings go through the stdlib path.
+
+MessagePackRenderer / MessagePackParser (`application/msgpack`,
+`?format=msgpack`) are registered in settings when msgpack is installed;
+the mobile app asks for them with an Accept header.
+"""
+import json
+
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser, JSONParser
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is in requirements.txt
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover
+    msgpack = None
+
+_encoder = JSONEncoder()
+
+if orjson is not None:
+    ORJSON_OPTIONS = (
+        orjson.OPT_NON_STR_KEYS
+        | orjson.OPT_PASSTHROUGH_DATETIME
+        | orjson.OPT_PASSTHROUGH_DATACLASS
+    )
+    LINE_SEPARATORS = ((b"\xe2\x80\xa8", b"\\u2028"), (b"\xe2\x80\xa9", b"\\u2029"))
+
+
+def _default(obj):
+    """
+    Types passed through by orjson (or unknown to msgpack) are converted
+    by DRF's encoder, exactly as the stdlib renderer would.
+    """
+    return _encoder.default(obj)
+
+
+class FastJSONRenderer(JSONRenderer):
+    def _use_orjson(self, accepted_media_type, renderer_context):
+        return (
+            orjson is not None
+            and not self.ensure_ascii
+            and self.compact
+            and self.strict
+            and self.get_indent(accepted_media_type, renderer_context or {}) is None
+        )
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        if not self._use_orjson(accepted_media_type, renderer_context):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data, default=_default, option=ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            # e.g. integers beyond 64 bits, or a type DRF can't encode either
+            # (in which case the stdlib path raises the usual TypeError).
+            return super().render(data, accepted_media_type, renderer_context)
+        for raw, escaped in LINE_SEPARATORS:
+            if raw in ret:
+                ret = ret.replace(raw, escaped)
+        return ret
+
+
+class FastJSONParser(JSONParser):
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", "utf-8")
+        if orjson is None or not self.strict or encoding.lower().replace("-", "") != "utf8":
+            return super().parse(stream, media_type, parser_context)
+        body = stream.read()
+        try:
+            return orjson.loads(body)
+        except orjson.JSONDecodeError as exc:
+            try:
+                # orjson rejects what the stdlib accepts beyond 64-bit ints.
+                return json.loads(body.decode(encoding), parse_constant=_reject_constant)
+            except ValueError:
+                raise ParseError("JSON parse error - %s" % str(exc))
+
+
+def _reject_constant(value):
+    raise ValueError(f"Out of range float values are not JSON compliant: {value}")
+
+
+class MessagePackRenderer(BaseRenderer):
+    media_type = "application/msgpack"
+    format = "msgpack"
+    charset = None
+    render_style = "binary"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return msgpack.packb(data, default=_default, use_bin_type=True)
+
+
+class MessagePackParser(BaseParser):
+    media_type = "application/msgpack"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return msgpack.unpackb(stream.read(), raw=False, strict_map_key=False)
+        except (ValueError, msgpack.ExtraData, msgpack.FormatError, msgpack.StackError) as exc:
+            raise ParseError("MessagePack parse error - %s" % str(exc))
+
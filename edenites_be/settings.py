@@ -1,5 +1,6 @@
 # edenites_be/settings.py
 
+import importlib.util
 import os
 from datetime import timedelta
 from pathlib import Path
@@ -60,6 +61,7 @@ INSTALLED_APPS = [
     'jamb',
     'testimonials',
     'payment',
+    'sync',
 ]
 
 # ────────────────────────────────────────────────────────────────────────────────
@@ -73,6 +75,9 @@ MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
 
+    # br/gzip for API responses (whitenoise serves its own precompressed files)
+    "edenites_be.compression.CompressionMiddleware",
+
     # Built‐in Django middleware
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -136,6 +141,40 @@ else:
         )
     }
 
+# ─────────────────────────────────────────────────────────────────────────────
+# CACHE CONFIGURATION (L2 behind the in-process L1 in edenites_be/cache.py)
+# ─────────────────────────────────────────────────────────────────────────────
+cache_url = os.getenv("CACHE_URL", "").strip()
+if cache_url.startswith(("redis://", "rediss://")):
+    # Shared by every worker/dyno in production
+    CACHES = {"default": {"BACKEND": "django.core.cache.backends.redis.RedisCache", "LOCATION": cache_url}}
+else:
+    # Local: shared by the workers of one machine
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": os.getenv("CACHE_DIR", str(BASE_DIR / ".cache")),
+            "OPTIONS": {"MAX_ENTRIES": 10_000},
+        }
+    }
+
+# L1: entries kept per worker and for how long at most; how long a worker
+# trusts a namespace version before re-reading it (the window in which it
+# may miss another worker's invalidation); default L2 lifetime.
+CACHE_L1_MAX_ENTRIES  = 1000
+CACHE_L1_SECONDS      = 30
+CACHE_VERSION_SECONDS = 2
+CACHE_DEFAULT_TIMEOUT = 60 * 10
+
+# Stampede protection: how long the last value of a key is kept to serve
+# while one worker rebuilds it; how long that worker may hold the rebuild
+# lock and others wait when there is nothing stale to serve; XFetch early
+# refresh eagerness (0 disables it).
+CACHE_STALE_SECONDS     = 60 * 60 * 24
+CACHE_LOCK_SECONDS      = 30
+CACHE_LOCK_WAIT_SECONDS = 5
+CACHE_XFETCH_BETA       = 1.0
+
 # ────────────────────────────────────────────────────────────────────────────────
 # 9) PAYMENT KEYS / DOMAIN
 # ────────────────────────────────────────────────────────────────────────────────
@@ -163,10 +202,22 @@ else:
 # ────────────────────────────────────────────────────────────────────────────────
 # 10) AUTHENTICATION BACKENDS & SETTINGS
 # ────────────────────────────────────────────────────────────────────────────────
+# One backend: it already subclasses ModelBackend, and a second one would
+# repeat the user lookup (and the password hash) on every failed login.
 AUTHENTICATION_BACKENDS = [
     "accounts.auth_backends.EmailOrUsernameBackend",
-    "django.contrib.auth.backends.ModelBackend",
 ]
+# GET /api/auth/dashboard/: entries per list, and how long a user's
+# payload is cached (enrollment/progress/order changes drop it sooner).
+DASHBOARD_ITEMS         = 10
+DASHBOARD_CACHE_SECONDS = 60 * 5
+# At most this many logins per process hash a password at once; the rest
+# get 503 + Retry-After instead of tying up more request threads
+# (accounts/login.py).
+LOGIN_HASHER_THREADS = int(os.getenv("LOGIN_HASHER_THREADS", 2))
+# Notification fan-out (accounts/notifications.py) inserts this many rows
+# per bulk_create / transaction.
+NOTIFICATION_BATCH_SIZE = int(os.getenv("NOTIFICATION_BATCH_SIZE", 1000))
 AUTH_USER_MODEL = "accounts.User"
 AUTH_PASSWORD_VALIDATORS = [
     {"NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator"},
@@ -193,6 +244,33 @@ STATICFILES_STORAGE = "whitenoise.storage.CompressedStaticFilesStorage"
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Resumable chunked uploads: part files live next to MEDIA_ROOT so that
+# finalizing is a rename rather than a copy.
+CHUNKED_UPLOAD_DIR       = MEDIA_ROOT / "chunked_uploads"
+CHUNKED_UPLOAD_MAX_SIZE  = 4 * 1024 ** 3   # 4 GB per file
+CHUNKED_UPLOAD_MAX_CHUNK = 8 * 1024 ** 2   # 8 MB per PUT
+CHUNKED_UPLOAD_EXPIRY    = timedelta(hours=24)
+
+# Lesson videos, submissions and certificates are served through signed
+# links (/api/media/…) that stay valid for between one and two TTLs.
+MEDIA_URL_TTL = 60 * 60
+
+# GDPR exports (accounts/gdpr.py): ZIPs are written here, outside
+# MEDIA_ROOT so they are only ever served to their owner, and deleted by
+# `manage.py run_pending_jobs` this long after they are built.
+GDPR_EXPORT_DIR = os.getenv("GDPR_EXPORT_DIR", str(BASE_DIR / "exports"))
+GDPR_EXPORT_TTL = timedelta(days=7)
+# Account erasure deletes the user's rows this many per transaction.
+GDPR_ERASE_BATCH_SIZE = int(os.getenv("GDPR_ERASE_BATCH_SIZE", 500))
+
+# Background jobs (edenites_be/jobs.py): worker threads per process, or
+# run each job inline when its transaction commits.
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", 2))
+JOBS_INLINE = False
+# A running job renews its lease at least every half of this; the worker
+# process only restarts a RUNNING job whose lease has run out.
+JOB_LEASE_SECONDS = int(os.getenv("JOB_LEASE_SECONDS", 120))
+
 # ────────────────────────────────────────────────────────────────────────────────
 # 13) CORS CONFIGURATION
 # ────────────────────────────────────────────────────────────────────────────────
@@ -204,17 +282,103 @@ CSRF_TRUSTED_ORIGINS = os.getenv("CSRF_TRUSTED_ORIGINS", "").split(",")
 # ────────────────────────────────────────────────────────────────────────────────
 # 14) Django REST Framework
 # ────────────────────────────────────────────────────────────────────────────────
+# orjson-backed JSON (same bytes as DRF's renderer, see edenites_be/renderers.py)
+# plus MessagePack for the mobile app when msgpack is installed.
+_HAS_MSGPACK = importlib.util.find_spec("msgpack") is not None
+
 REST_FRAMEWORK = {
+    "DEFAULT_RENDERER_CLASSES": [
+        "edenites_be.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+        *(["edenites_be.renderers.MessagePackRenderer"] if _HAS_MSGPACK else []),
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "edenites_be.renderers.FastJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+        *(["edenites_be.renderers.MessagePackParser"] if _HAS_MSGPACK else []),
+    ],
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        # JWTAuthentication without the per-request user query; see
+        # accounts/authentication.py.
+        "accounts.authentication.StatelessJWTAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": (
         "rest_framework.permissions.IsAuthenticated",
     ),
-    "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
+    # ?page=N for existing clients, ?cursor= for keyset pagination
+    "DEFAULT_PAGINATION_CLASS": "edenites_be.pagination.HybridPagination",
     "PAGE_SIZE": 10,
+    # No-ops unless the view sets throttle_scope; rates in THROTTLE_RATES
+    "DEFAULT_THROTTLE_CLASSES": (
+        "edenites_be.throttling.ScopedThrottle",
+        "edenites_be.throttling.ScopedIPThrottle",
+    ),
+}
+
+# Sliding-window limits per throttle_scope (edenites_be/throttling.py):
+# "<scope>" per user (per IP when anonymous), "<scope>_ip" per IP.
+THROTTLE_RATES = {
+    "login":         os.getenv("THROTTLE_LOGIN", "10/min"),
+    "login_account": os.getenv("THROTTLE_LOGIN_ACCOUNT", "5/min"),
+    "register":      os.getenv("THROTTLE_REGISTER", "5/hour"),
+    "grading":       os.getenv("THROTTLE_GRADING", "30/min"),
+    "grading_ip":    os.getenv("THROTTLE_GRADING_IP", "120/min"),
+    "purchase":      os.getenv("THROTTLE_PURCHASE", "10/min"),
+    "purchase_ip":   os.getenv("THROTTLE_PURCHASE_IP", "30/min"),
 }
 
+# Pagination: opt-in ?page_size= cap, and when COUNT(*) is estimated
+# (unfiltered Postgres tables) or cached instead of run on every page.
+PAGINATION_MAX_PAGE_SIZE        = 100
+PAGINATION_ESTIMATE_THRESHOLD   = 10_000
+PAGINATION_COUNT_CACHE_SECONDS  = 60
+
+# Full-text catalog search: upper bound on ranked matches per query.
+CATALOG_SEARCH_MAX_RESULTS = 1000
+
+# In-memory autocomplete index: full rebuild interval of its background
+# thread (picks up other workers' edits and fresh popularity weights).
+# The thread only runs where AUTOCOMPLETE_BACKGROUND_REFRESH=True is set in
+# the environment — the Procfile's web process — not in management commands.
+AUTOCOMPLETE_REFRESH_SECONDS = 300
+AUTOCOMPLETE_BACKGROUND_REFRESH = os.getenv("AUTOCOMPLETE_BACKGROUND_REFRESH", "False") == "True"
+
+# Category listing (with course counts / price ranges) is cached whole and
+# dropped whenever a course or category changes.
+CATEGORY_LISTING_CACHE_SECONDS = 60 * 60
+
+# "Students who took this also took…": neighbours stored and served per
+# course (rebuild with `manage.py build_related_courses`).
+RELATED_COURSES_TOP_K = 20
+
+# Conditional GET: how long CDNs/browsers may reuse public catalog responses
+# before revalidating with If-None-Match / If-Modified-Since.
+CONDITIONAL_GET_MAX_AGE = 60
+
+# Response compression: bodies below this many bytes go out as-is; the
+# compressed bytes of public ETag'd responses are cached this long.
+COMPRESSION_MIN_SIZE = 1024
+COMPRESSION_CACHE_SECONDS = 60 * 60 * 24
+
+# Delta sync (/api/sync/): rows per page, the hard cap on ?limit=, how far
+# behind "now" the feed stays so in-flight transactions are not skipped
+# (saves committing later than half of it are re-stamped; see sync/delta.py),
+# and how long delete tombstones are kept (older watermarks must resync).
+SYNC_PAGE_SIZE                = 500
+SYNC_MAX_PAGE_SIZE            = 2000
+SYNC_SAFETY_LAG_SECONDS       = int(os.getenv("SYNC_SAFETY_LAG_SECONDS", 60))
+SYNC_TOMBSTONE_RETENTION_DAYS = 90
+
+# Trending courses / exam papers: buffered counters are written only by a
+# background thread, every TRENDING_FLUSH_SECONDS (woken early when
+# TRENDING_FLUSH_SIZE keys are waiting); `decay_trending` halves scores
+# every TRENDING_HALF_LIFE_HOURS and drops those below TRENDING_MIN_SCORE.
+TRENDING_FLUSH_SECONDS   = 30
+TRENDING_FLUSH_SIZE      = 500
+TRENDING_HALF_LIFE_HOURS = 72
+TRENDING_MIN_SCORE       = 0.01
+
 # ────────────────────────────────────────────────────────────────────────────────
 # 15) SIMPLE JWT SETTINGS
 # ────────────────────────────────────────────────────────────────────────────────
@@ -223,7 +387,20 @@ SIMPLE_JWT = {
     "REFRESH_TOKEN_LIFETIME": timedelta(days=1),
     "ROTATE_REFRESH_TOKENS":  True,
     "BLACKLIST_AFTER_ROTATION": True,
+    # Rejects refresh tokens revoked by a token_version bump.
+    "TOKEN_REFRESH_SERIALIZER": "accounts.serializers.VersionedTokenRefreshSerializer",
 }
+# How long a user's current token_version is cached for
+# StatelessJWTAuthentication; saving the user drops it.
+TOKEN_VERSION_CACHE_SECONDS = int(os.getenv("TOKEN_VERSION_CACHE_SECONDS", 60 * 60))
+# Refresh-token blacklist checks go through a per-worker Bloom filter of
+# blacklisted JTIs, rebuilt this often and topped up with newly blacklisted
+# rows every SYNC seconds (capped at a tenth of ACCESS_TOKEN_LIFETIME): the
+# longest another worker can miss a logout whose cache mark was evicted.
+# Prune with `manage.py prune_tokens`.
+TOKEN_BLACKLIST_BLOOM_SECONDS      = int(os.getenv("TOKEN_BLACKLIST_BLOOM_SECONDS", 60 * 5))
+TOKEN_BLACKLIST_BLOOM_SYNC_SECONDS = int(os.getenv("TOKEN_BLACKLIST_BLOOM_SYNC_SECONDS", 10))
+TOKEN_BLACKLIST_BLOOM_ERROR_RATE   = float(os.getenv("TOKEN_BLACKLIST_BLOOM_ERROR_RATE", 0.001))
 
 # ────────────────────────────────────────────────────────────────────────────────
 # 16) SECURITY HARDENING
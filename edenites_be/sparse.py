@@ -0,0 +1,149 @@
+# edenites_be/sparse.py
+"""
+Sparse fieldsets (?fields=) and relation expansion (?expand=) for GETs.
+
+    GET /api/exams/past-questions/?fields=id,year,question_text
+    GET /api/courses/?expand=category,instructor
+
+Serializers opt in with SparseFieldsMixin:
+
+  • `expandable_fields` maps a field name to a (serializer class, kwargs)
+    pair used instead of the default representation when expanded;
+  • `prefetch_fields` maps a nested many-field to the prefetch lookups it
+    needs, so they are only prefetched when the field is sent;
+  • `sparse_required` lists model columns to_representation() reads even
+    when they are not in the output.
+
+Views opt in with SparseQuerysetMixin, which narrows the queryset to the
+fields actually serialized: only() on the columns, select_related() on
+the forward relations and prefetch_related() on the nested lists, so
+unrequested fields are never read from the database.
+"""
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+
+FIELDS_PARAM = "fields"
+EXPAND_PARAM = "expand"
+
+
+def _param_set(request, name):
+    if request is None or request.method not in ("GET", "HEAD"):
+        return None
+    raw = request.query_params.get(name)
+    if raw is None:
+        return None
+    return {part.strip() for part in raw.split(",") if part.strip()}
+
+
+class SparseFieldsMixin:
+    expandable_fields = {}
+    prefetch_fields   = {}
+    sparse_required   = ()
+
+    def _is_root(self):
+        parent = self.parent
+        if isinstance(parent, serializers.ListSerializer):
+            parent = parent.parent
+        return parent is None
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if not self._is_root():
+            return fields
+        request = self.context.get("request")
+
+        for name in (_param_set(request, EXPAND_PARAM) or set()) & set(self.expandable_fields):
+            if name in fields:
+                serializer_class, kwargs = self.expandable_fields[name]
+                fields[name] = serializer_class(read_only=True, **kwargs)
+
+        wanted = _param_set(request, FIELDS_PARAM)
+        if wanted:
+            for name in list(fields):
+                if name not in wanted:
+                    del fields[name]
+        return fields
+
+
+def _forward_relation(field):
+    return field.is_relation and (field.many_to_one or field.one_to_one) and field.concrete
+
+
+def sparse_queryset(queryset, serializer):
+    """
+    Narrow `queryset` to what `serializer` (or its list child) will read.
+    Falls back to loading full rows when a field's source can't be mapped
+    to a column (e.g. SerializerMethodField or a model property).
+    """
+    if isinstance(serializer, serializers.ListSerializer):
+        serializer = serializer.child
+    model = queryset.model
+    columns, select, prefetch = {model._meta.pk.name}, set(), []
+    restrict = True
+
+    for name, field in serializer.fields.items():
+        if name in getattr(serializer, "prefetch_fields", {}):
+            prefetch.extend(serializer.prefetch_fields[name])
+            continue
+        attrs = field.source_attrs
+        if not attrs:
+            restrict = False
+            continue
+        try:
+            model_field = model._meta.get_field(attrs[0])
+        except FieldDoesNotExist:
+            if attrs[0] not in queryset.query.annotations:
+                restrict = False
+            continue
+        if not model_field.is_relation:
+            columns.add(model_field.name)
+        elif _forward_relation(model_field):
+            columns.add(model_field.name)
+            pk_only = isinstance(field, serializers.PrimaryKeyRelatedField) and len(attrs) == 1
+            if not pk_only:
+                select.add(model_field.name)
+                if len(attrs) > 1:
+                    columns.add("__".join(attrs))
+                elif isinstance(field, serializers.SlugRelatedField):
+                    columns.add(f"{model_field.name}__{field.slug_field}")
+        else:
+            prefetch.append(model_field.name)
+
+    columns.update(getattr(serializer, "sparse_required", ()))
+    # Keyset pagination reads the ordering columns from each row.
+    for term in queryset.query.order_by or model._meta.ordering:
+        if isinstance(term, str) and "__" not in term.lstrip("-") and term.lstrip("-") != "?":
+            try:
+                columns.add(model._meta.get_field(term.lstrip("-")).name)
+            except FieldDoesNotExist:
+                pass
+    if isinstance(queryset.query.select_related, dict):
+        columns.update(queryset.query.select_related)
+
+    if select:
+        queryset = queryset.select_related(*select)
+    if restrict:
+        # A relation loaded through select_related() keeps all its columns
+        # unless one was named explicitly above.
+        for relation in select:
+            if not any(c.startswith(f"{relation}__") for c in columns):
+                columns.update(
+                    f"{relation}__{f.name}"
+                    for f in model._meta.get_field(relation).related_model._meta.concrete_fields
+                )
+        queryset = queryset.only(*columns)
+    if prefetch:
+        queryset = queryset.prefetch_related(*prefetch)
+    return queryset
+
+
+class SparseQuerysetMixin:
+    """
+    ViewSet mixin: list/retrieve querysets only load the serialized fields.
+    """
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.request.method in ("GET", "HEAD") and self.action in ("list", "retrieve"):
+            queryset = sparse_queryset(queryset, self.get_serializer())
+        return queryset
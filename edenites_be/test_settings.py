@@ -0,0 +1,18 @@
+# edenites_be/test_settings.py
+"""
+Settings for test runs: the project settings with the overrides a test run
+needs. pytest picks them up from pytest.ini; run Django's runner with
+`python manage.py test --settings=edenites_be.test_settings`.
+"""
+from .settings import *  # noqa: F401,F403
+
+# A private, empty cache per run
+CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+# Every test request comes from one IP; tests that exercise a limit set it
+# with override_settings.
+THROTTLE_RATES = {}
+
+# Jobs run inline when their transaction commits, so tests can assert on
+# their results.
+JOBS_INLINE = True
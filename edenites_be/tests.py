@@ -0,0 +1,249 @@
+# edenites_be/tests.py
+
+import datetime
+import gzip
+import io
+import json
+import threading
+import time
+import uuid
+from decimal import Decimal
+from unittest import mock, skipUnless
+
+from django.test import SimpleTestCase, override_settings
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+from rest_framework.utils.serializer_helpers import ReturnDict
+
+from testimonials.models import Testimonial
+from . import cache, compression, renderers, throttling
+
+
+class FastJSONTests(SimpleTestCase):
+    payload = {
+        "results": [ReturnDict({"id": 1, "title": "Física – 1\u2028line", "price": "10.00"}, serializer=None)],
+        "aware": datetime.datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=datetime.timezone.utc),
+        "naive": datetime.datetime(2024, 5, 1, 12, 30),
+        "lagos": timezone.make_aware(datetime.datetime(2024, 5, 1, 8, 0), datetime.timezone(datetime.timedelta(hours=1))),
+        "date": datetime.date(2024, 5, 1),
+        "time": datetime.time(9, 15, 0, 500000),
+        "decimal": Decimal("12.50"),
+        "uuid": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+        "lazy": gettext_lazy("Enroll to view."),
+        "duration": datetime.timedelta(minutes=90),
+        "numbers": [0, -7, 2 ** 53, 0.1, 3.5, True, None],
+        "int_keys": {1: "a", 2: "b"},
+        "big": 2 ** 70,
+    }
+
+    @skipUnless(renderers.orjson, "orjson not installed")
+    def test_output_matches_drf_renderer_byte_for_byte(self):
+        expected = JSONRenderer().render(self.payload)
+        self.assertEqual(renderers.FastJSONRenderer().render(self.payload), expected)
+        self.assertIn(b"\\u2028", expected)
+
+    def test_indent_falls_back_to_stdlib(self):
+        rendered = renderers.FastJSONRenderer().render({"a": [1]}, "application/json; indent=2")
+        self.assertEqual(rendered, b'{\n  "a": [\n    1\n  ]\n}')
+
+    def test_parser(self):
+        parser = renderers.FastJSONParser()
+        self.assertEqual(parser.parse(io.BytesIO('{"q": "Ọ̀rọ̀", "n": 1.5}'.encode())), {"q": "Ọ̀rọ̀", "n": 1.5})
+        self.assertEqual(parser.parse(io.BytesIO(b'{"big": 1180591620717411303424}')), {"big": 2 ** 70})
+        for body in (b'{"a": NaN}', b"{oops"):
+            with self.assertRaises(ParseError):
+                parser.parse(io.BytesIO(body))
+
+    @skipUnless(renderers.msgpack, "msgpack not installed")
+    def test_msgpack_round_trip(self):
+        data = {"id": 1, "when": datetime.date(2024, 5, 1), "price": Decimal("2.5")}
+        packed = renderers.MessagePackRenderer().render(data)
+        self.assertEqual(
+            renderers.MessagePackParser().parse(io.BytesIO(packed)),
+            {"id": 1, "when": "2024-05-01", "price": 2.5},
+        )
+
+
+class CompressionTests(APITestCase):
+    url = "/api/testimonials/"
+
+    def setUp(self):
+        for n in range(20):
+            Testimonial.objects.create(name=f"Student {n}", role="Student", quote="Great course! " * 5, rating=5)
+
+    def test_negotiation(self):
+        self.assertEqual(compression.negotiate("gzip, deflate"), "gzip")
+        self.assertEqual(compression.negotiate("br;q=0, gzip;q=0.5"), "gzip")
+        self.assertIsNone(compression.negotiate("identity, gzip;q=0"))
+        self.assertIsNone(compression.negotiate(""))
+        self.assertEqual(compression.negotiate("*"), "br" if compression.brotli else "gzip")
+        self.assertEqual(compression.negotiate("br, gzip", allow_brotli=False), "gzip")
+
+    def test_public_payload_is_compressed_once(self):
+        plain = self.client.get(self.url)
+        self.assertNotIn("Content-Encoding", plain)
+        self.assertIn("Accept-Encoding", plain["Vary"])
+
+        with mock.patch.object(compression, "compress", wraps=compression.compress) as spy:
+            first = self.client.get(self.url, HTTP_ACCEPT_ENCODING="gzip")
+            second = self.client.get(self.url, HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(spy.call_count, 1)
+        self.assertEqual(first["Content-Encoding"], "gzip")
+        self.assertEqual(first.content, second.content)
+        self.assertEqual(gzip.decompress(second.content), plain.content)
+        self.assertEqual(int(first["Content-Length"]), len(first.content))
+
+    def test_small_and_streamed_responses(self):
+        small = self.client.get("/api/testimonials/1/", HTTP_ACCEPT_ENCODING="gzip")
+        self.assertNotIn("Content-Encoding", small)
+
+        with override_settings(SYNC_SAFETY_LAG_SECONDS=0):
+            streamed = self.client.get("/api/sync/", HTTP_ACCEPT_ENCODING="gzip")
+            raw = b"".join(streamed.streaming_content)
+        self.assertEqual(streamed["Content-Encoding"], "gzip")
+        self.assertFalse(streamed.has_header("Content-Length"))
+        body = json.loads(gzip.decompress(raw))
+        self.assertEqual(len(body["changes"]), 20)
+
+    @skipUnless(compression.brotli, "brotli is not installed")
+    def test_brotli(self):
+        resp = self.client.get(self.url, HTTP_ACCEPT_ENCODING="gzip, br")
+        self.assertEqual(resp["Content-Encoding"], "br")
+        self.assertEqual(compression.brotli.decompress(resp.content), self.client.get(self.url).content)
+
+
+class TwoTierCacheTests(APITestCase):
+    url = "/api/testimonials/"
+
+    def setUp(self):
+        cache.clear()
+        Testimonial.objects.create(name="Ada", role="Student", quote="Great!", rating=5)
+
+    def test_lru_is_bounded_and_expires(self):
+        lru = cache.LRUCache()
+        with self.settings(CACHE_L1_MAX_ENTRIES=2):
+            lru.set("a", 1, 60)
+            lru.set("b", 2, 60)
+            lru.get("a")
+            lru.set("c", 3, 60)
+        self.assertIs(lru.get("b"), cache.MISSING)
+        self.assertEqual((lru.get("a"), lru.get("c")), (1, 3))
+        lru.set("d", 4, -1)
+        self.assertIs(lru.get("d"), cache.MISSING)
+
+    def test_tiers_and_metrics(self):
+        namespace = cache.TESTIMONIALS
+        namespace.set("k", [1, 2])
+        self.assertEqual(namespace.get("k"), [1, 2])
+        cache.l1.clear()  # as seen from another worker
+        self.assertEqual(namespace.get("k"), [1, 2])
+        self.assertIsNone(namespace.get("other"))
+        stats = cache.metrics()["namespaces"]["testimonials"]
+        self.assertEqual((stats["l1_hits"], stats["l2_hits"], stats["misses"]), (1, 1, 1))
+
+    def test_responses_cached_until_a_model_signal(self):
+        self.client.get(self.url)
+        with self.assertNumQueries(0):
+            resp = self.client.get(self.url)
+        self.assertEqual(resp.data["count"], 1)
+
+        Testimonial.objects.create(name="Bola", role="Parent", quote="Helpful", rating=4)
+        self.assertEqual(self.client.get(self.url).data["count"], 2)
+        Testimonial.objects.get(name="Ada").delete()
+        self.assertEqual([t["name"] for t in self.client.get(self.url).data["results"]], ["Bola"])
+
+
+class StampedeTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        cache.l2.clear()  # locmem under tests
+        self.namespace = cache.Namespace("stampede-test")
+        self.calls = 0
+
+    def compute(self, seconds=0.0):
+        self.calls += 1
+        time.sleep(seconds)
+        return f"value {self.calls}"
+
+    def test_concurrent_misses_compute_once(self):
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(self.namespace.get_or_set("k", lambda: self.compute(0.2))))
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(results, ["value 1"] * 5)
+
+    def test_stale_value_served_while_another_worker_rebuilds(self):
+        self.namespace.get_or_set("k", self.compute)
+        self.namespace.invalidate()
+        # Simulate another worker holding the rebuild lock.
+        cache.l2.add(f"lock:{self.namespace.key('k')}", 1)
+        self.assertEqual(self.namespace.get_or_set("k", self.compute), "value 1")
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(cache.metrics()["namespaces"]["stampede-test"]["stale"], 1)
+
+    def test_deleted_key_is_never_served_stale(self):
+        self.namespace.get_or_set("k", self.compute)
+        self.namespace.delete("k")
+        cache.l2.add(f"lock:{self.namespace.key('k')}", 1)
+        with self.settings(CACHE_LOCK_WAIT_SECONDS=0.05):
+            self.assertEqual(self.namespace.get_or_set("k", self.compute), "value 2")
+
+    def test_namespace_without_stale_serving_waits_or_computes(self):
+        strict = cache.Namespace("stampede-strict", stale=False)
+        strict.get_or_set("k", self.compute)
+        strict.invalidate()
+        cache.l2.add(f"lock:{strict.key('k')}", 1)
+        with self.settings(CACHE_LOCK_WAIT_SECONDS=0.05):
+            self.assertEqual(strict.get_or_set("k", self.compute), "value 2")
+        self.assertFalse(cache.TOKEN_VERSIONS.stale or cache.ENTITLEMENTS.stale)
+
+    def test_early_refresh(self):
+        self.namespace.get_or_set("k", self.compute)
+        self.namespace.get_or_set("k", self.compute)
+        self.assertEqual(self.calls, 1)
+        with self.settings(CACHE_XFETCH_BETA=1e12):
+            self.assertEqual(self.namespace.get_or_set("k", self.compute), "value 2")
+        self.assertEqual(self.namespace.get("k"), "value 2")
+
+
+class ThrottleTests(APITestCase):
+    def setUp(self):
+        cache.l2.clear()
+
+    def test_parse_rate(self):
+        self.assertEqual(throttling.parse_rate("10/min"), (10, 60))
+        self.assertEqual(throttling.parse_rate("100/15m"), (100, 900))
+        self.assertEqual(throttling.parse_rate("5/hours"), (5, 3600))
+        with self.assertRaises(ValueError):
+            throttling.parse_rate("often")
+
+    def test_sliding_window(self):
+        start = 600.0  # a window boundary for a 60s period
+        for _ in range(3):
+            self.assertEqual(throttling.hit("k", 3, 60, now=start), 0)
+        # The previous window's 3 hits weigh 3 × (1 - 20/60) = 2 at +80s.
+        self.assertEqual(throttling.hit("k", 3, 60, now=start + 1), 79)
+        self.assertEqual(throttling.hit("k", 3, 60, now=start + 70), 10)
+        self.assertEqual(throttling.hit("k", 3, 60, now=start + 80), 0)
+        # Denied requests weren't counted.
+        self.assertEqual(throttling.hit("k", 3, 60, now=start + 110), 0)
+
+    @override_settings(THROTTLE_RATES={"grading": "2/min"})
+    def test_scoped_endpoint_returns_429_with_retry_after(self):
+        url = "/api/exams/past-questions/quiz/"
+        for _ in range(2):
+            self.assertEqual(self.client.post(url, {}, format="json").status_code, 400)
+        resp = self.client.post(url, {}, format="json")
+        self.assertEqual(resp.status_code, 429)
+        self.assertGreater(int(resp["Retry-After"]), 0)
+        # Unscoped endpoints are never limited.
+        self.assertEqual(self.client.get("/api/exams/past-questions/").status_code, 200)
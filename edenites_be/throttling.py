@@ -0,0 +1,133 @@
+# edenites_be/throttling.py
+"""
+Sliding-window rate limits for abuse-prone endpoints.
+
+Views opt in with `throttle_scope` (login, register, grading, purchase);
+THROTTLE_RATES maps a scope to a rate such as "10/min" or "100/15m":
+
+  ScopedThrottle    "<scope>"     per user, per IP for anonymous clients
+  ScopedIPThrottle  "<scope>_ip"  per IP, whoever is logged in
+
+Scopes or rates that aren't configured don't limit anything.
+
+Each limit is a sliding-window counter (the scheme Cloudflare describes):
+one integer per client per fixed window, in the shared L2 cache, and a
+request is allowed while
+
+    previous_window_count × (share of the window still overlapping) + current_count ≤ limit
+
+A check is one atomic cache.incr() plus one get() — O(1) in time and
+space however many requests a client has made, unlike DRF's
+SimpleRateThrottle, which keeps and rewrites a list of timestamps. Denied
+requests are taken back out of the count and get a Retry-After for when
+one more request would fit. Counters bypass L1 (edenites_be/cache.py):
+they must be shared and atomic. incr() is atomic on Redis and locmem;
+the file cache used locally only approximates it.
+
+`python manage.py benchmark_throttle` measures the per-check cost.
+"""
+import math
+import re
+import time
+
+from django.conf import settings
+from django.core.cache import cache as l2
+from rest_framework.throttling import BaseThrottle
+
+UNITS = {"s": 1, "sec": 1, "m": 60, "min": 60, "h": 3600, "hour": 3600, "d": 86400, "day": 86400}
+RATE_RE = re.compile(r"^\s*(\d+)\s*/\s*(\d*)\s*([a-z]+)\s*$")
+
+_parsed = {}
+
+
+def rates():
+    return getattr(settings, "THROTTLE_RATES", {})
+
+
+def parse_rate(rate):
+    """
+    "10/min" → (10, 60); "100/15m" → (100, 900).
+    """
+    if rate not in _parsed:
+        match = RATE_RE.match(rate)
+        unit = match and (UNITS.get(match.group(3)) or UNITS.get(match.group(3).rstrip("s")))
+        if not unit:
+            raise ValueError(f"Invalid throttle rate {rate!r}")
+        _parsed[rate] = (int(match.group(1)), int(match.group(2) or 1) * unit)
+    return _parsed[rate]
+
+
+def _retry_after(previous, count, limit, period, offset):
+    if count < limit and previous:
+        # Fits in this window once enough of the previous one slides out.
+        share = 1 - (limit - count - 1) / previous
+        wait = share * period - offset
+    else:
+        # Not before the next window, where this window's count decays.
+        wait = period - offset + (1 - (limit - 1) / count) * period if count else period - offset
+    return max(1, math.ceil(round(wait, 6)))
+
+
+def hit(key, limit, period, now=None):
+    """
+    Count one request for `key`: 0 if it is allowed, otherwise the
+    seconds until one more would be.
+    """
+    now = time.time() if now is None else now
+    window, offset = divmod(now, period)
+    current = f"throttle:{key}:{int(window)}"
+    try:
+        count = l2.incr(current)
+    except ValueError:
+        count = 1 if l2.add(current, 1, 2 * period) else l2.incr(current)
+    previous = l2.get(f"throttle:{key}:{int(window) - 1}", 0)
+    if previous * (1 - offset / period) + count <= limit:
+        return 0
+    l2.decr(current)
+    return _retry_after(previous, count - 1, limit, period, offset)
+
+
+def throttle(scope, ident):
+    """
+    hit() against the configured rate of `scope`; 0 when it has none.
+    """
+    rate = rates().get(scope)
+    if not rate:
+        return 0
+    return hit(f"{scope}:{ident}", *parse_rate(rate))
+
+
+class ScopedThrottle(BaseThrottle):
+    """
+    THROTTLE_RATES[view.throttle_scope] per user (per IP when anonymous).
+    """
+    suffix = ""
+
+    def __init__(self):
+        self.wait_seconds = None
+
+    def client(self, request):
+        user = getattr(request, "user", None)
+        if user is not None and user.is_authenticated:
+            return f"user:{user.pk}"
+        return f"ip:{self.get_ident(request)}"
+
+    def allow_request(self, request, view):
+        scope = getattr(view, "throttle_scope", None)
+        if not scope:
+            return True
+        self.wait_seconds = throttle(scope + self.suffix, self.client(request))
+        return not self.wait_seconds
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class ScopedIPThrottle(ScopedThrottle):
+    """
+    THROTTLE_RATES[view.throttle_scope + "_ip"] per client IP.
+    """
+    suffix = "_ip"
+
+    def client(self, request):
+        return f"ip:{self.get_ident(request)}"
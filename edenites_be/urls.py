@@ -8,10 +8,12 @@ from django.views.generic import RedirectView
 from django.conf import settings
 from django.conf.urls.static import static
 
-from courses.views     import CategoryViewSet, CourseViewSet
+from courses.views     import CategoryViewSet, CourseViewSet, ChunkedUploadViewSet
+from courses.media     import SignedMediaView
 from enrollments.views import EnrollmentViewSet
 from exams.views       import PastQuestionViewSet
 from .api_overview     import api_plaintext_overview
+from .cache            import CacheMetricsView
 
 from jamb.views         import JAMBSubjectViewSet, JAMBQuestionViewSet, StrategyViewSet
 from testimonials.views import TestimonialViewSet
@@ -41,6 +43,8 @@ router.register(r"jamb/questions",  JAMBQuestionViewSet, basename="jamb-question
 router.register(r"jamb/strategies", StrategyViewSet,     basename="jamb-strategy")
 # Testimonials
 router.register(r"testimonials", TestimonialViewSet, basename="testimonial")
+# Resumable chunked uploads (lesson videos, exam submissions)
+router.register(r"uploads", ChunkedUploadViewSet, basename="chunked-upload")
 
 
 urlpatterns = [
@@ -48,6 +52,8 @@ urlpatterns = [
     path("", RedirectView.as_view(url="/api/", permanent=False)),
     # Admin site
     path("admin/", admin.site.urls),
+    # Signed, expiring media downloads (no DB access)
+    path("api/media/<path:name>", SignedMediaView.as_view(), name="signed-media"),
     # API root & all registered ViewSets
     path("api/", include(router.urls)),
     path("api/courses/", include("courses.urls")),
@@ -58,6 +64,10 @@ urlpatterns = [
     # A plain-text overview of the API
     path("api/overview/", api_plaintext_overview, name="api_plaintext_overview"),
     path("api/exams/", include("exams.urls")),
+    # Delta sync for mobile clients
+    path("api/sync/", include("sync.urls")),
+    # Per-worker cache hit/miss counters (staff only)
+    path("api/cache/metrics/", CacheMetricsView.as_view(), name="cache-metrics"),
 ]
 
 # Serve media files in DEBUG
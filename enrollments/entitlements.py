@@ -0,0 +1,56 @@
+# enrollments/entitlements.py
+"""
+Per-user entitlement cache for paid-course access checks.
+
+A user's enrolled course ids are loaded with one query into a frozenset
+and cached; every later check is a set lookup. Enrollment signals drop the
+cached set. Because the cache may be local to one worker, a *negative*
+answer is always confirmed against the database before access is refused,
+so a purchase completed on another worker is honoured immediately, while
+the common case (an enrolled student polling lessons) never queries.
+The sets live in the ENTITLEMENTS namespace of edenites_be/cache.py.
+"""
+from edenites_be.cache import ENTITLEMENTS
+
+from .models import Enrollment
+
+
+def enrolled_course_ids(user_id):
+    """
+    Return a frozenset of the course ids the user is enrolled in.
+    """
+    return ENTITLEMENTS.get_or_set(
+        user_id,
+        lambda: frozenset(
+            Enrollment.objects.filter(student_id=user_id).values_list("course_id", flat=True)
+        ),
+    )
+
+
+def invalidate(user_id):
+    ENTITLEMENTS.delete(user_id)
+
+
+def is_enrolled(user, course_id):
+    if not (user and user.is_authenticated):
+        return False
+    if course_id in enrolled_course_ids(user.id):
+        return True
+    if Enrollment.objects.filter(student_id=user.id, course_id=course_id).exists():
+        invalidate(user.id)
+        return True
+    return False
+
+
+def has_course_access(user, course):
+    """
+    Free courses are open to everyone; paid ones to their instructor,
+    staff and enrolled students.
+    """
+    if course.is_free:
+        return True
+    if not (user and user.is_authenticated):
+        return False
+    if user.is_staff or course.instructor_id == user.id:
+        return True
+    return is_enrolled(user, course.id)
@@ -0,0 +1,45 @@
+# Generated by Django 4.2.20 on 2026-10-19 01:13
+
+from django.conf import settings
+from django.db import migrations
+
+
+def merge_duplicate_enrollments(apps, schema_editor):
+    """
+    Keep the oldest enrollment per (student, course), re-pointing any
+    lesson progress recorded against the duplicates before removing them.
+    """
+    Enrollment = apps.get_model("enrollments", "Enrollment")
+    LessonProgress = apps.get_model("enrollments", "LessonProgress")
+
+    kept = {}
+    duplicates = []
+    for pk, student_id, course_id in (
+        Enrollment.objects.order_by("id").values_list("id", "student_id", "course_id")
+    ):
+        key = (student_id, course_id)
+        if key in kept:
+            duplicates.append((pk, kept[key]))
+        else:
+            kept[key] = pk
+
+    for duplicate_id, keep_id in duplicates:
+        LessonProgress.objects.filter(enrollment_id=duplicate_id).update(enrollment_id=keep_id)
+    Enrollment.objects.filter(id__in=[pk for pk, _ in duplicates]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('courses', '0003_chunkedupload'),
+        ('enrollments', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_enrollments, migrations.RunPython.noop),
+        migrations.AlterUniqueTogether(
+            name='enrollment',
+            unique_together={('student', 'course')},
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.20 on 2026-10-19 01:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('enrollments', '0002_enrollment_unique_student_course'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='enrollment',
+            index=models.Index(fields=['student', '-enrolled_at', '-id'], name='enroll_student_date_idx'),
+        ),
+    ]
@@ -8,6 +8,12 @@ class Enrollment(models.Model):
     course = models.ForeignKey("courses.Course", on_delete=models.CASCADE)
     enrolled_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        unique_together = ("student", "course")
+        indexes = [
+            models.Index(fields=["student", "-enrolled_at", "-id"], name="enroll_student_date_idx"),
+        ]
+
 class LessonProgress(models.Model):
     enrollment = models.ForeignKey(Enrollment, on_delete=models.CASCADE)
     lesson = models.ForeignKey(Lesson, on_delete=models.CASCADE)
@@ -0,0 +1,34 @@
+# enrollments/signals.py
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from courses import recommendations, trending
+from edenites_be import jobs
+from . import entitlements
+from .models import Enrollment
+
+
+@receiver(post_save, sender=Enrollment)
+@receiver(post_delete, sender=Enrollment)
+def drop_cached_entitlements(sender, instance, **kwargs):
+    user_id = instance.student_id
+    transaction.on_commit(lambda: entitlements.invalidate(user_id))
+
+
+@receiver(post_save, sender=Enrollment)
+def refresh_related_courses_on_enroll(sender, instance, created, **kwargs):
+    if created:
+        jobs.enqueue(recommendations.refresh_for_enrollment, instance.student_id, instance.course_id)
+
+
+@receiver(post_delete, sender=Enrollment)
+def refresh_related_courses_on_leave(sender, instance, **kwargs):
+    jobs.enqueue(recommendations.refresh_for_enrollment, instance.student_id, instance.course_id)
+
+
+@receiver(post_save, sender=Enrollment)
+def count_trending_enrollment(sender, instance, created, **kwargs):
+    if created:
+        course_id = instance.course_id
+        transaction.on_commit(lambda: trending.record_course(course_id, trending.ENROLLMENT))
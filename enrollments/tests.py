@@ -1,3 +1,57 @@
-from django.test import TestCase
+# enrollments/tests.py
 
-# Create your tests here.
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from rest_framework.test import APITestCase
+
+from courses.models import Category, Course
+from .models import Enrollment
+from . import entitlements
+
+User = get_user_model()
+
+
+class EntitlementTests(APITestCase):
+    def setUp(self):
+        instructor = User.objects.create_user(
+            username="teach", email="teach@example.com", password="pass1234", is_instructor=True
+        )
+        self.student = User.objects.create_user(
+            username="learn", email="learn@example.com", password="pass1234"
+        )
+        category = Category.objects.create(name="Science")
+        self.course = Course.objects.create(
+            title="Physics", description="Motion", category=category,
+            instructor=instructor, price="100.00"
+        )
+        entitlements.invalidate(self.student.id)
+
+    def test_enrolled_checks_are_served_from_cache(self):
+        Enrollment.objects.create(student=self.student, course=self.course)
+        self.assertTrue(entitlements.is_enrolled(self.student, self.course.id))
+        with self.assertNumQueries(0):
+            self.assertTrue(entitlements.has_course_access(self.student, self.course))
+
+    def test_negative_answers_are_confirmed_against_the_database(self):
+        self.assertFalse(entitlements.is_enrolled(self.student, self.course.id))
+        # Simulate an enrollment recorded by another worker: no local signal.
+        Enrollment.objects.bulk_create([Enrollment(student=self.student, course=self.course)])
+        self.assertTrue(entitlements.is_enrolled(self.student, self.course.id))
+
+    def test_duplicate_enrollment_is_rejected(self):
+        self.client.force_authenticate(self.student)
+        first = self.client.post("/api/enrollments/", {"course": self.course.id}, format="json")
+        second = self.client.post("/api/enrollments/", {"course": self.course.id}, format="json")
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual(second.status_code, 400)
+
+    def test_enrollment_racing_past_the_check_is_rejected(self):
+        self.client.force_authenticate(self.student)
+        # Another request enrolled the student after this one's check ran.
+        Enrollment.objects.create(student=self.student, course=self.course)
+        with mock.patch("enrollments.views.is_enrolled", return_value=False):
+            resp = self.client.post("/api/enrollments/", {"course": self.course.id}, format="json")
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(resp.data["course"], "You are already enrolled in this course.")
+        self.assertEqual(Enrollment.objects.count(), 1)
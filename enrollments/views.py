@@ -1,10 +1,13 @@
 # Enrollment/views.py
+from django.db import IntegrityError, transaction
 from django.shortcuts import get_object_or_404
 from rest_framework import viewsets, permissions, status
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 
 from .models import Enrollment, LessonProgress, Answer
 from .serializers import EnrollmentSerializer, LessonProgressSerializer, AnswerSerializer
+from .entitlements import is_enrolled
 
 class EnrollmentViewSet(viewsets.ModelViewSet):
     serializer_class = EnrollmentSerializer
@@ -19,10 +22,19 @@ class EnrollmentViewSet(viewsets.ModelViewSet):
         return [permissions.IsAdminUser()]
 
     def get_queryset(self):
-        return Enrollment.objects.filter(student=self.request.user)
+        return Enrollment.objects.filter(student=self.request.user).order_by("-enrolled_at", "-id")
 
     def perform_create(self, serializer):
-        serializer.save(student=self.request.user)
+        already_enrolled = ValidationError({"course": "You are already enrolled in this course."})
+        if is_enrolled(self.request.user, serializer.validated_data["course"].id):
+            raise already_enrolled
+        # The check above is only a fast path: a concurrent request can insert
+        # between it and the save, and the unique constraint has the last word.
+        try:
+            with transaction.atomic():
+                serializer.save(student=self.request.user)
+        except IntegrityError:
+            raise already_enrolled
 
 
 class LessonProgressViewSet(viewsets.ModelViewSet):
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.20 on 2026-10-19 01:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exams', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='pastquestion',
+            options={'ordering': ['-year', 'id']},
+        ),
+        migrations.AddIndex(
+            model_name='pastquestion',
+            index=models.Index(fields=['-year', 'id'], name='pastq_year_id_idx'),
+        ),
+    ]
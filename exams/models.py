@@ -9,8 +9,9 @@ class ExamSubject(models.Model):
     A “subject” (e.g. English Language, Mathematics, etc.) for PastQuestions.
     Similar in spirit to JAMBSubject, but scoped to this exams app.
     """
-    name = models.CharField(max_length=100, unique=True)
-    slug = models.SlugField(max_length=100, unique=True)
+    name       = models.CharField(max_length=100, unique=True)
+    slug       = models.SlugField(max_length=100, unique=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self):
         return self.name
@@ -54,11 +55,15 @@ class PastQuestion(models.Model):
         help_text="If True, more than one choice may be correct."
     )
     created_at      = models.DateTimeField(auto_now_add=True)
+    updated_at      = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         # Ensure no duplicates for the same exam_type/year/subject/question_text
         unique_together = ("exam_type", "year", "subject", "question_text")
-        ordering = ["-year"]
+        ordering = ["-year", "id"]
+        indexes = [
+            models.Index(fields=["-year", "id"], name="pastq_year_id_idx"),
+        ]
 
     def __str__(self):
         return f"{self.exam_type} {self.year} – {self.subject.slug} (Q#{self.id})"
@@ -78,6 +83,7 @@ class PastOption(models.Model):
     label      = models.CharField(max_length=1, choices=LABEL_CHOICES)
     text       = models.CharField(max_length=255)
     is_correct = models.BooleanField(default=False)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         unique_together = ("question", "label")
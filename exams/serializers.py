@@ -1,5 +1,7 @@
 # exams/serializers.py
 from rest_framework import serializers
+
+from edenites_be.sparse import SparseFieldsMixin
 from .models import (
     ExamSubject,
     PastQuestion,
@@ -30,13 +32,15 @@ class PastOptionSerializer(serializers.ModelSerializer):
 #
 # ─── PastQuestionSerializer ────────────────────────────────────────────────────────
 #
-class PastQuestionSerializer(serializers.ModelSerializer):
+class PastQuestionSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     subject = serializers.SlugRelatedField(
         slug_field="slug",
         queryset=ExamSubject.objects.all()
     )
     options = PastOptionSerializer(many=True)
 
+    expandable_fields = {"subject": (ExamSubjectSerializer, {})}
+
     class Meta:
         model = PastQuestion
         fields = [
@@ -0,0 +1,9 @@
+# exams/signals.py
+from edenites_be import cache
+from .models import ExamSubject, PastOption, PastQuestion
+
+
+#
+# ─── View caches (past-question lists, conditional versions) ─────────────────────
+#
+cache.connect_invalidation(ExamSubject, PastQuestion, PastOption)
@@ -1,3 +1,177 @@
-from django.test import TestCase
+# exams/tests.py
 
-# Create your tests here.
+from unittest import mock
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+
+from jamb.models import JAMBQuestion, JAMBSubject
+from testimonials.models import Testimonial
+from testimonials.views import TestimonialViewSet
+from jamb.views import JAMBQuestionViewSet
+from .models import ExamSubject, PastOption, PastQuestion
+from .views import PastQuestionViewSet
+
+
+class PaginationTests(APITestCase):
+    def setUp(self):
+        subject = ExamSubject.objects.create(name="Mathematics")
+        for year in (2020, 2021, 2022):
+            for n in range(4):
+                PastQuestion.objects.create(
+                    exam_type=PastQuestion.JAMB, year=year, subject=subject,
+                    question_text=f"Q{n}", solution_text="…",
+                )
+        self.expected = list(PastQuestion.objects.order_by("-year", "id").values_list("id", flat=True))
+
+    def test_cursor_walks_forwards_and_backwards(self):
+        url, seen, pages = "/api/exams/past-questions/?cursor=&page_size=5", [], []
+        while url:
+            resp = self.client.get(url)
+            self.assertNotIn("count", resp.data)
+            pages.append(resp.data)
+            seen += [q["id"] for q in resp.data["results"]]
+            url = resp.data["next"]
+        self.assertEqual(seen, self.expected)
+        self.assertEqual(len(pages), 3)
+        self.assertIsNone(pages[0]["previous"])
+
+        resp = self.client.get(pages[2]["previous"])
+        self.assertEqual([q["id"] for q in resp.data["results"]], self.expected[5:10])
+
+    def test_page_numbers_still_work_and_page_size_is_capped(self):
+        resp = self.client.get("/api/exams/past-questions/", {"page": 2, "page_size": 5})
+        self.assertEqual(resp.data["count"], 12)
+        self.assertEqual([q["id"] for q in resp.data["results"]], self.expected[5:10])
+
+        with self.settings(PAGINATION_MAX_PAGE_SIZE=3):
+            resp = self.client.get("/api/exams/past-questions/", {"cursor": "", "page_size": 50})
+        self.assertEqual(len(resp.data["results"]), 3)
+
+    def test_invalid_cursor_is_404(self):
+        resp = self.client.get("/api/exams/past-questions/", {"cursor": "garbage"})
+        self.assertEqual(resp.status_code, 404)
+
+
+class ConditionalGetTests(APITestCase):
+    url = "/api/exams/past-questions/"
+
+    def setUp(self):
+        subject = ExamSubject.objects.create(name="Physics")
+        self.questions = [
+            PastQuestion.objects.create(
+                exam_type=PastQuestion.WAEC, year=2023, subject=subject,
+                question_text=f"Q{n}", solution_text="…",
+            )
+            for n in range(2)
+        ]
+
+    def test_matching_etag_short_circuits(self):
+        resp = self.client.get(self.url)
+        etag = resp["ETag"]
+        self.assertIn("public", resp["Cache-Control"])
+
+        # The version (three MAX(updated_at) probes and a tombstone probe) is
+        # cached in the exams namespace, so a revalidation runs no queries.
+        with self.assertNumQueries(0):
+            resp = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 304)
+        self.assertEqual(resp.content, b"")
+
+        resp = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=resp["Last-Modified"])
+        self.assertEqual(resp.status_code, 304)
+
+    def test_updates_and_deletes_change_the_etag(self):
+        etag = self.client.get(self.url)["ETag"]
+        self.questions[0].question_text = "Edited"
+        self.questions[0].save()
+        resp = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 200)
+
+        etag = resp["ETag"]
+        self.questions[1].delete()
+        resp = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.data["count"], 1)
+
+
+class SparseFieldsetTests(APITestCase):
+    url = "/api/exams/past-questions/"
+
+    def setUp(self):
+        subject = ExamSubject.objects.create(name="Chemistry")
+        question = PastQuestion.objects.create(
+            exam_type=PastQuestion.NECO, year=2022, subject=subject,
+            question_text="H2O is?", solution_text="Water, as explained at length…",
+        )
+        PastOption.objects.create(question=question, label="A", text="Water", is_correct=True)
+
+    def test_unrequested_fields_are_not_loaded(self):
+        with CaptureQueriesContext(connection) as queries:
+            resp = self.client.get(self.url, {"fields": "id,year,question_text"})
+        self.assertEqual(list(resp.data["results"][0]), ["id", "year", "question_text"])
+        # The list query is the last one; no options prefetch follows it.
+        sql = queries.captured_queries[-1]["sql"]
+        self.assertIn('"exams_pastquestion"."question_text"', sql)
+        self.assertNotIn("solution_text", sql)
+
+    def test_default_payload_and_expansion(self):
+        question = self.client.get(self.url).data["results"][0]
+        self.assertEqual(question["subject"], "chemistry")
+        self.assertEqual(question["options"][0]["text"], "Water")
+
+        question = self.client.get(self.url, {"expand": "subject", "fields": "id,subject"}).data["results"][0]
+        self.assertEqual(question["subject"], {"id": question["subject"]["id"], "name": "Chemistry", "slug": "chemistry"})
+
+
+class FastListTests(APITestCase):
+    def setUp(self):
+        physics = ExamSubject.objects.create(name="Physics")
+        for year in (2021, 2022):
+            question = PastQuestion.objects.create(
+                exam_type=PastQuestion.WAEC, year=year, subject=physics,
+                question_text=f"Unit of force ({year})?", solution_text="Newton.",
+            )
+            for label, text in (("B", "Joule"), ("A", "Newton")):
+                PastOption.objects.create(question=question, label=label, text=text, is_correct=label == "A")
+        PastQuestion.objects.create(
+            exam_type=PastQuestion.NECO, year=2020, subject=physics,
+            question_text="No options yet", solution_text="…",
+        )
+        english = JAMBSubject.objects.create(name="English", slug="english", topics=12, duration="2 hours")
+        JAMBQuestion.objects.create(
+            subject=english, question_text="Pick the noun", option_a="run", option_b="dog",
+            option_c="red", option_d="fast", correct_choice="B",
+        )
+        Testimonial.objects.create(name="Ada", role="Student", quote="Great!", rating=5)
+
+    def assertSameAsSerializer(self, viewset, url, params=None):
+        fast = self.client.get(url, params)
+        with mock.patch.object(viewset, "fast_list", False):
+            slow = self.client.get(url, params)
+        self.assertEqual(fast.status_code, 200)
+        self.assertEqual(fast.content, slow.content)
+        return fast
+
+    def test_identical_json(self):
+        url = "/api/exams/past-questions/"
+        resp = self.assertSameAsSerializer(PastQuestionViewSet, url)
+        self.assertEqual([o["label"] for o in resp.data["results"][0]["options"]], ["A", "B"])
+        self.assertEqual(resp.data["results"][2]["options"], [])
+        self.assertSameAsSerializer(PastQuestionViewSet, url, {"expand": "subject"})
+        self.assertSameAsSerializer(PastQuestionViewSet, url, {"fields": "id,year,options"})
+        resp = self.assertSameAsSerializer(PastQuestionViewSet, url, {"cursor": "", "page_size": 2})
+        self.assertSameAsSerializer(PastQuestionViewSet, resp.data["next"])
+
+        self.assertSameAsSerializer(JAMBQuestionViewSet, "/api/jamb/questions/")
+        self.assertSameAsSerializer(JAMBQuestionViewSet, "/api/jamb/questions/", {"expand": "subject"})
+        self.assertSameAsSerializer(TestimonialViewSet, "/api/testimonials/")
+
+    def test_nested_options_are_one_query_per_page(self):
+        url = "/api/exams/past-questions/"
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(url, {"cursor": ""})
+        options = [q for q in queries.captured_queries if "exams_pastoption" in q["sql"] and "MAX" not in q["sql"]]
+        self.assertEqual(len(options), 1)
@@ -7,6 +7,11 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
 
+from courses import trending
+from edenites_be import cache
+from edenites_be.conditional import ConditionalGetMixin
+from edenites_be.fastpath import FastListMixin
+from edenites_be.sparse import SparseQuerysetMixin
 from .models import ExamSubject, PastQuestion
 from .serializers import (
     ExamSubjectSerializer,
@@ -22,17 +27,20 @@ def _letter_grade(pct: float) -> str:
     if pct >= 50: return "E"
     return "F"
 
-class PastQuestionViewSet(viewsets.ModelViewSet):
+class PastQuestionViewSet(ConditionalGetMixin, FastListMixin, SparseQuerysetMixin, viewsets.ModelViewSet):
     """
     CRUD + drill-down helpers + quiz/practice endpoints.
     """
-    queryset          = PastQuestion.objects.all().order_by("-year")
+    queryset          = PastQuestion.objects.all().order_by("-year", "id")
     serializer_class  = PastQuestionSerializer
     filterset_fields  = ["exam_type", "year", "subject__slug"]
     search_fields     = ["subject__name"]
+    conditional_models = ("exams.pastquestion", "exams.pastoption", "exams.examsubject")
+    cache_namespace    = cache.EXAMS
+    throttle_scope     = None  # set per action below
 
     def get_permissions(self):
-        public = ["list","retrieve","types","subjects","years","quiz_mode","practice_mode"]
+        public = ["list","retrieve","types","subjects","years","popular","quiz_mode","practice_mode"]
         if self.action in public:
             return [AllowAny()]
         if self.action in ["create","update","partial_update","destroy"]:
@@ -86,7 +94,19 @@ class PastQuestionViewSet(viewsets.ModelViewSet):
         yrs = qs.values_list("year", flat=True).distinct().order_by("year")
         return Response(list(yrs))
 
-    @action(detail=False, methods=["post"], url_path="quiz")
+    @action(detail=False, methods=["get"], url_path="popular")
+    def popular(self, request):
+        """
+        GET /api/exams/past-questions/popular/?limit=10
+        Most attempted papers lately (time-decayed), from the trending table.
+        """
+        try:
+            limit = min(max(int(request.query_params.get("limit", 10)), 1), 50)
+        except ValueError:
+            limit = 10
+        return Response(trending.popular_papers(limit))
+
+    @action(detail=False, methods=["post"], url_path="quiz", throttle_scope="grading")
     def quiz_mode(self, request):
         top = QuizInputSerializer(data=request.data)
         top.is_valid(raise_exception=True)
@@ -103,6 +123,7 @@ class PastQuestionViewSet(viewsets.ModelViewSet):
         if total == 0:
             return Response({"detail":"No questions found."},
                             status=status.HTTP_400_BAD_REQUEST)
+        trending.record_paper(data["exam_type"], data["year"], subj.slug)
 
         correct = 0
         details = []
@@ -130,7 +151,7 @@ class PastQuestionViewSet(viewsets.ModelViewSet):
             "details":       details,
         })
 
-    @action(detail=False, methods=["post"], url_path="practice")
+    @action(detail=False, methods=["post"], url_path="practice", throttle_scope="grading")
     def practice_mode(self, request):
         top = QuizInputSerializer(data=request.data)
         top.is_valid(raise_exception=True)
@@ -146,6 +167,7 @@ class PastQuestionViewSet(viewsets.ModelViewSet):
         if not mapping:
             return Response({"detail":"No questions found."},
                             status=status.HTTP_400_BAD_REQUEST)
+        trending.record_paper(data["exam_type"], data["year"], subj.slug)
 
         out = []
         for ans in data["answers"]:
@@ -11,6 +11,7 @@ class JAMBSubject(models.Model):
     slug     = models.SlugField(max_length=100, unique=True)
     topics   = models.PositiveIntegerField(default=0)      # e.g. 30
     duration = models.CharField(max_length=50, blank=True) # e.g. "45 hours"
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self):
         return self.name
@@ -48,6 +49,7 @@ class JAMBQuestion(models.Model):
         help_text="Select A, B, C, or D as the correct answer.",
         null = True
     )
+    updated_at     = models.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self):
         # e.g. "math Q#12 (A)"
@@ -71,6 +73,7 @@ class JAMBOption(models.Model):
         default=False,
         help_text="Mark True for the correct answer"
     )
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self):
         return f"{self.label}. {self.text}"
@@ -82,6 +85,7 @@ class Strategy(models.Model):
     """
     category = models.CharField(max_length=100)   # e.g. "Time Management Tips"
     content  = models.TextField()                 # long text with bullet points or paragraphs
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self):
         return self.category
@@ -1,6 +1,8 @@
 # jamb/serializers.py
 
 from rest_framework import serializers
+
+from edenites_be.sparse import SparseFieldsMixin
 from .models import JAMBSubject, JAMBQuestion, Strategy
 
 class JAMBSubjectSerializer(serializers.ModelSerializer):
@@ -9,10 +11,12 @@ class JAMBSubjectSerializer(serializers.ModelSerializer):
         fields = ("id", "name", "slug", "topics", "duration")
 
 
-class JAMBQuestionSerializer(serializers.ModelSerializer):
+class JAMBQuestionSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """
     This serializer now exposes the four option fields and the single-letter correct_choice.
     """
+    expandable_fields = {"subject": (JAMBSubjectSerializer, {})}
+
     class Meta:
         model = JAMBQuestion
         fields = (
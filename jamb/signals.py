@@ -0,0 +1,9 @@
+# jamb/signals.py
+from edenites_be import cache
+from .models import JAMBQuestion, JAMBSubject, Strategy
+
+
+#
+# ─── View caches (subjects, questions, strategies) ────────────────────────────────
+#
+cache.connect_invalidation(JAMBSubject, JAMBQuestion, Strategy)
@@ -1,34 +1,45 @@
 # jamb/views.py
 
 from rest_framework import viewsets, permissions, filters
+
+from edenites_be import cache
+from edenites_be.conditional import ConditionalGetMixin
+from edenites_be.fastpath import FastListMixin
+from edenites_be.sparse import SparseQuerysetMixin
 from .models import JAMBSubject, JAMBQuestion, Strategy
 from .serializers import JAMBSubjectSerializer, JAMBQuestionSerializer, StrategySerializer
 
-class JAMBSubjectViewSet(viewsets.ModelViewSet):
+class JAMBSubjectViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset         = JAMBSubject.objects.all().order_by("name")
     serializer_class = JAMBSubjectSerializer
     filter_backends   = [filters.SearchFilter]
     search_fields     = ["name", "slug"]
+    conditional_models = ("jamb.jambsubject",)
+    cache_namespace = cache.JAMB
 
     def get_permissions(self):
         if self.action in ["list", "retrieve"]:
             return [permissions.AllowAny()]
         return [permissions.IsAuthenticatedOrReadOnly()]
 
-class JAMBQuestionViewSet(viewsets.ModelViewSet):
+class JAMBQuestionViewSet(ConditionalGetMixin, FastListMixin, SparseQuerysetMixin, viewsets.ModelViewSet):
     queryset         = JAMBQuestion.objects.select_related("subject").all().order_by("subject__name","id")
     serializer_class = JAMBQuestionSerializer
+    conditional_models = ("jamb.jambquestion", "jamb.jambsubject")
+    cache_namespace = cache.JAMB
 
     def get_permissions(self):
         if self.action in ["list", "retrieve"]:
             return [permissions.AllowAny()]
         return [permissions.IsAuthenticated()]
 
-class StrategyViewSet(viewsets.ModelViewSet):
+class StrategyViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset          = Strategy.objects.all().order_by("category")
     serializer_class  = StrategySerializer
     filter_backends   = [filters.SearchFilter]
     search_fields     = ["category"]
+    conditional_models = ("jamb.strategy",)
+    cache_namespace   = cache.JAMB
 
     def get_permissions(self):
         if self.action in ["list", "retrieve"]:
@@ -12,6 +12,7 @@ from enrollments.models import Enrollment
 
 class InitializePaymentView(APIView):
     permission_classes = [permissions.IsAuthenticated]
+    throttle_scope     = "purchase"
 
     def post(self, request):
         email    = request.data.get("email", request.user.email)
@@ -0,0 +1,128 @@
+# sync/delta.py
+"""
+Change feed behind /api/sync/.
+
+A watermark is the position of the last change a client has seen:
+(timestamp, model index, primary key). Each synced table is read in
+(updated_at, pk) order from just after that position, and tombstones in
+(deleted_at, id) order; the streams are merged so one page interleaves
+all tables in time order, and the last row's position becomes the next
+watermark. An up-to-date client costs one indexed range probe per table.
+
+Only rows older than SYNC_SAFETY_LAG_SECONDS are served, so a transaction
+that is still committing cannot slip in behind a watermark already handed
+out. The lag only has to cover ordinary commit latency: a save that commits
+later than half of it is re-stamped after the commit (sync/signals.py), so
+it reappears after every watermark issued in the meantime.
+"""
+import base64
+import heapq
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import Tombstone
+from .registry import SYNCED_MODELS, scoped_queryset, sync_fields, synced_models
+
+TOMBSTONES = len(SYNCED_MODELS)
+
+
+class InvalidWatermark(ValueError):
+    pass
+
+
+def page_size():
+    return getattr(settings, "SYNC_PAGE_SIZE", 500)
+
+
+def max_page_size():
+    return getattr(settings, "SYNC_MAX_PAGE_SIZE", 2000)
+
+
+def safety_lag():
+    return timedelta(seconds=getattr(settings, "SYNC_SAFETY_LAG_SECONDS", 60))
+
+
+def retention():
+    return timedelta(days=getattr(settings, "SYNC_TOMBSTONE_RETENTION_DAYS", 90))
+
+
+def encode_watermark(position):
+    stamp, index, pk = position
+    raw = json.dumps([stamp.isoformat(), index, pk], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_watermark(token):
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        stamp, index, pk = json.loads(raw)
+        stamp = parse_datetime(stamp)
+        if stamp is None or not isinstance(index, int) or not isinstance(pk, int):
+            raise ValueError
+    except (TypeError, ValueError):
+        raise InvalidWatermark(token)
+    return stamp, index, pk
+
+
+def is_expired(position, now=None):
+    """
+    True when tombstones older than the watermark may have been pruned;
+    the client must then start again from an empty watermark.
+    """
+    return position is not None and position[0] < (now or timezone.now()) - retention()
+
+
+def _after(position, index, column):
+    """
+    Rows of table `index` strictly after `position` in (time, index, pk) order.
+    """
+    stamp, at_index, pk = position
+    if index < at_index:
+        return Q(**{f"{column}__gt": stamp})
+    if index > at_index:
+        return Q(**{f"{column}__gte": stamp})
+    return Q(**{f"{column}__gt": stamp}) | Q(**{column: stamp, "pk__gt": pk})
+
+
+def _rows(index, model, position, horizon, user, limit):
+    label = model._meta.label_lower
+    fields = sync_fields(model)
+    queryset = scoped_queryset(model, user).filter(updated_at__lte=horizon)
+    if position is not None:
+        queryset = queryset.filter(_after(position, index, "updated_at"))
+    rows = queryset.order_by("updated_at", "pk").values(*fields)[:limit]
+    for row in rows.iterator(chunk_size=min(limit, 1000)):
+        yield row["updated_at"], index, row["id"], {"model": label, "op": "upsert", "id": row["id"], "data": row}
+
+
+def _tombstones(position, horizon, limit):
+    queryset = Tombstone.objects.filter(_after(position, TOMBSTONES, "deleted_at"), deleted_at__lte=horizon)
+    rows = queryset.order_by("deleted_at", "pk").values_list("pk", "deleted_at", "model", "object_id")[:limit]
+    for pk, deleted_at, model, object_id in rows.iterator(chunk_size=min(limit, 1000)):
+        yield deleted_at, TOMBSTONES, pk, {"model": model, "op": "delete", "id": object_id}
+
+
+def changes(position, user, limit, now=None):
+    """
+    Yield (position, change) pairs after `position` (None for a full sync),
+    in time order, at most `limit + 1` of them so callers can tell whether
+    another page follows.
+    """
+    horizon = (now or timezone.now()) - safety_lag()
+    streams = [
+        _rows(index, model, position, horizon, user, limit + 1)
+        for index, model in enumerate(synced_models())
+    ]
+    if position is not None:
+        # A full sync has nothing to delete.
+        streams.append(_tombstones(position, horizon, limit + 1))
+    merged = heapq.merge(*streams, key=lambda item: item[:3])
+    for count, (stamp, index, pk, change) in enumerate(merged):
+        if count > limit:
+            return
+        yield (stamp, index, pk), change
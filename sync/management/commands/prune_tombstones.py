@@ -0,0 +1,16 @@
+# sync/management/commands/prune_tombstones.py
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from sync import delta
+from sync.models import Tombstone
+
+
+class Command(BaseCommand):
+    help = "Delete sync tombstones older than SYNC_TOMBSTONE_RETENTION_DAYS."
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - delta.retention()
+        deleted, _ = Tombstone.objects.filter(deleted_at__lt=cutoff).delete()
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} tombstone(s)."))
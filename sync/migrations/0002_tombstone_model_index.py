@@ -0,0 +1,17 @@
+# Generated by Django 4.2.20 on 2026-10-19 01:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sync', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='tombstone',
+            index=models.Index(fields=['model', '-deleted_at'], name='tombstone_model_deleted_idx'),
+        ),
+    ]
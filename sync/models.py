@@ -0,0 +1,22 @@
+# sync/models.py
+
+from django.db import models
+from django.utils import timezone
+
+
+class Tombstone(models.Model):
+    """
+    Records the deletion of a synced row so delta-sync clients can drop it.
+    """
+    model      = models.CharField(max_length=100, help_text='Model label, e.g. "courses.lesson".')
+    object_id  = models.PositiveBigIntegerField()
+    deleted_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    class Meta:
+        indexes = [
+            # Newest delete per model, for conditional GET versions
+            models.Index(fields=["model", "-deleted_at"], name="tombstone_model_deleted_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.model}#{self.object_id} deleted {self.deleted_at:%Y-%m-%d %H:%M}"
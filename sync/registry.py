@@ -0,0 +1,60 @@
+# sync/registry.py
+"""
+Models exposed through /api/sync/.
+
+The position of each model in SYNCED_MODELS is part of the sync watermark,
+so new models must be appended, never inserted or reordered.
+"""
+from django.apps import apps
+from django.db.models import FileField, Q
+
+SYNCED_MODELS = [
+    "courses.category",
+    "courses.course",
+    "courses.lesson",
+    "exams.examsubject",
+    "exams.pastquestion",
+    "exams.pastoption",
+    "jamb.jambsubject",
+    "jamb.jambquestion",
+    "jamb.jamboption",
+    "jamb.strategy",
+    "testimonials.testimonial",
+]
+
+
+def synced_models():
+    return [apps.get_model(label) for label in SYNCED_MODELS]
+
+
+def sync_fields(model):
+    """
+    Column names sent for a model: every concrete field except files, which
+    are only handed out as signed URLs by the regular endpoints.
+    """
+    return [f.attname for f in model._meta.concrete_fields if not isinstance(f, FileField)]
+
+
+def _visible_lessons(user):
+    from enrollments.entitlements import enrolled_course_ids
+
+    if user.is_authenticated and user.is_staff:
+        return Q()
+    visible = Q(is_free=True) | Q(course__is_free=True)
+    if user.is_authenticated:
+        visible |= Q(course__instructor_id=user.id) | Q(course_id__in=enrolled_course_ids(user.id))
+    return visible
+
+
+# Per-model row filters for the requesting user; models not listed are public.
+SCOPES = {
+    "courses.lesson": _visible_lessons,
+}
+
+
+def scoped_queryset(model, user):
+    queryset = model._default_manager.order_by()
+    scope = SCOPES.get(model._meta.label_lower)
+    if scope is not None:
+        queryset = queryset.filter(scope(user))
+    return queryset
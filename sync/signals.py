@@ -0,0 +1,37 @@
+# sync/signals.py
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.utils import timezone
+
+from . import delta
+from .models import Tombstone
+from .registry import synced_models
+
+
+def _restamp_if_late(queryset, column, stamp):
+    """
+    After commit: if the row became visible later than half the safety lag
+    after its timestamp (the other half covers clock skew between workers),
+    a sync may already have handed out a watermark past it. Move it to now.
+    """
+    now = timezone.now()
+    if now - stamp > delta.safety_lag() / 2:
+        queryset.filter(**{column: stamp}).update(**{column: now})
+
+
+def record_tombstone(sender, instance, **kwargs):
+    # Written in the deleting transaction: the tombstone exists iff the delete commits.
+    tombstone = Tombstone.objects.create(model=sender._meta.label_lower, object_id=instance.pk)
+    rows = Tombstone.objects.filter(pk=tombstone.pk)
+    transaction.on_commit(lambda: _restamp_if_late(rows, "deleted_at", tombstone.deleted_at))
+
+
+def watch_commit_latency(sender, instance, **kwargs):
+    rows = sender._default_manager.filter(pk=instance.pk)
+    transaction.on_commit(lambda: _restamp_if_late(rows, "updated_at", instance.updated_at))
+
+
+for model in synced_models():
+    label = model._meta.label_lower
+    post_save.connect(watch_commit_latency, sender=model, dispatch_uid=f"sync-latency-{label}")
+    post_delete.connect(record_tombstone, sender=model, dispatch_uid=f"sync-tombstone-{label}")
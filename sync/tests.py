@@ -0,0 +1,97 @@
+# sync/tests.py
+
+import json
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from courses.models import Category, Course, Lesson
+from testimonials.models import Testimonial
+from .models import Tombstone
+
+User = get_user_model()
+
+
+@override_settings(SYNC_SAFETY_LAG_SECONDS=0)
+class DeltaSyncTests(APITestCase):
+    def setUp(self):
+        instructor = User.objects.create_user(
+            username="teach", email="teach@example.com", password="pass1234", is_instructor=True
+        )
+        category = Category.objects.create(name="Science")
+        self.course = Course.objects.create(
+            title="Physics", description="…", category=category, instructor=instructor, price="10.00"
+        )
+        Lesson.objects.create(course=self.course, title="Preview", content="…", order=1, is_free=True)
+        Lesson.objects.create(course=self.course, title="Paid", content="…", order=2)
+        self.testimonial = Testimonial.objects.create(name="Ada", role="Student", quote="Great")
+
+    def sync(self, **params):
+        resp = self.client.get("/api/sync/", params)
+        self.assertEqual(resp.status_code, 200)
+        return json.loads(b"".join(resp.streaming_content))
+
+    def test_full_then_delta_sync(self):
+        body = self.sync()
+        self.assertFalse(body["has_more"])
+        seen = {(c["model"], c["data"].get("title") or c["data"].get("name")) for c in body["changes"]}
+        self.assertIn(("courses.lesson", "Preview"), seen)
+        self.assertNotIn(("courses.lesson", "Paid"), seen)
+        self.assertEqual(len(body["changes"]), 4)
+
+        # Up to date: nothing comes back and the watermark stays put.
+        again = self.sync(since=body["watermark"])
+        self.assertEqual((again["changes"], again["watermark"]), ([], body["watermark"]))
+
+        self.course.title = "Physics II"
+        self.course.save()
+        testimonial_id = self.testimonial.id
+        self.testimonial.delete()
+        delta = self.sync(since=body["watermark"])
+        self.assertEqual(
+            [(c["model"], c["op"], c["id"]) for c in delta["changes"]],
+            [("courses.course", "upsert", self.course.id),
+             ("testimonials.testimonial", "delete", testimonial_id)],
+        )
+
+    def test_pages_follow_the_watermark(self):
+        ids, since, pages = [], "", 0
+        while True:
+            body = self.sync(since=since, limit=1)
+            ids += [(c["model"], c["id"]) for c in body["changes"]]
+            since, pages = body["watermark"], pages + 1
+            if not body["has_more"]:
+                break
+        self.assertEqual(len(ids), 4)
+        self.assertEqual(len(set(ids)), 4)
+        self.assertEqual(pages, 4)
+
+    def test_bad_watermark(self):
+        self.assertEqual(self.client.get("/api/sync/", {"since": "nope"}).status_code, 400)
+
+    @override_settings(SYNC_SAFETY_LAG_SECONDS=60)
+    def test_late_commits_are_restamped_past_issued_watermarks(self):
+        def commit_after(seconds, write):
+            with self.captureOnCommitCallbacks() as callbacks:
+                write()
+            later = timezone.now() + timedelta(seconds=seconds)
+            with mock.patch("sync.signals.timezone.now", return_value=later):
+                for callback in callbacks:
+                    callback()
+            return later
+
+        # Within half the lag: left alone.
+        commit_after(10, self.course.save)
+        self.course.refresh_from_db()
+        self.assertLess(self.course.updated_at, timezone.now())
+
+        # A commit slower than that moves the row (and a tombstone) to "now".
+        later = commit_after(45, self.course.save)
+        self.course.refresh_from_db()
+        self.assertEqual(self.course.updated_at, later)
+        later = commit_after(45, self.testimonial.delete)
+        self.assertEqual(Tombstone.objects.get().deleted_at, later)
@@ -0,0 +1,61 @@
+# sync/views.py
+
+import json
+
+from django.http import StreamingHttpResponse
+from rest_framework import permissions, status
+from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework.views import APIView
+
+from . import delta
+
+
+class SyncView(APIView):
+    """
+    GET /api/sync/?since={watermark}&limit={n}
+
+    Rows of the synced catalog tables created, updated or deleted after
+    `since` (omit it for a full download), streamed as
+
+        {"changes": [{"model", "op": "upsert"|"delete", "id", "data"?}, …],
+         "watermark": "…", "has_more": bool}
+
+    Keep calling with the returned watermark while `has_more` is true.
+    Paid lessons are only included for users who can access them; after
+    enrolling, fetch the course's lessons once from the lessons endpoint.
+    """
+    permission_classes = [permissions.AllowAny]
+
+    def get(self, request):
+        token = request.query_params.get("since") or None
+        try:
+            position = delta.decode_watermark(token) if token else None
+        except delta.InvalidWatermark:
+            return Response({"detail": "Invalid watermark."}, status=status.HTTP_400_BAD_REQUEST)
+        if delta.is_expired(position):
+            return Response(
+                {"detail": "Watermark too old; sync again without `since`.", "resync": True},
+                status=status.HTTP_410_GONE,
+            )
+        try:
+            limit = min(max(int(request.query_params.get("limit", delta.page_size())), 1), delta.max_page_size())
+        except ValueError:
+            limit = delta.page_size()
+
+        stream = self.stream(delta.changes(position, request.user, limit), token, limit)
+        return StreamingHttpResponse(stream, content_type="application/json")
+
+    @staticmethod
+    def stream(changes, token, limit):
+        encoder = JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+        watermark, count, has_more = token, 0, False
+        yield '{"changes":['
+        for position, change in changes:
+            if count == limit:
+                # `changes` yields one extra row to announce the next page.
+                has_more = True
+                break
+            yield ("," if count else "") + encoder.encode(change)
+            watermark, count = delta.encode_watermark(position), count + 1
+        yield '],"watermark":%s,"has_more":%s}' % (json.dumps(watermark), json.dumps(has_more))
@@ -11,6 +11,7 @@ class Testimonial(models.Model):
     avatar_url = models.URLField(blank=True)        # e.g. "https://randomuser.me/…/men/32.jpg"
     quote      = models.TextField()
     rating     = models.PositiveSmallIntegerField(default=0)  # 1..5 stars
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self):
         return f"{self.name} ({self.rating}★)"
@@ -0,0 +1,9 @@
+# testimonials/signals.py
+from edenites_be import cache
+from .models import Testimonial
+
+
+#
+# ─── View caches ──────────────────────────────────────────────────────────────────
+#
+cache.connect_invalidation(Testimonial)
@@ -5,7 +5,11 @@ from .models import Testimonial
 from .serializers import TestimonialSerializer
 from rest_framework.permissions import AllowAny
 
-class TestimonialViewSet(viewsets.ReadOnlyModelViewSet):
+from edenites_be import cache
+from edenites_be.conditional import ConditionalGetMixin
+from edenites_be.fastpath import FastListMixin
+
+class TestimonialViewSet(ConditionalGetMixin, FastListMixin, viewsets.ReadOnlyModelViewSet):
     """
     GET /api/testimonials/
     GET /api/testimonials/{pk}/
@@ -13,3 +17,5 @@ class TestimonialViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = Testimonial.objects.all().order_by("id")
     serializer_class = TestimonialSerializer
     permission_classes = [AllowAny]
+    conditional_models = ("testimonials.testimonial",)
+    cache_namespace = cache.TESTIMONIALS